@@ -0,0 +1,28 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:20
+
+import apps.core.utils.uuid7
+from django.db import migrations, models
+
+
+# Значение по умолчанию вычисляется в Python и в схеме базы не хранится:
+# меняется только состояние моделей. AlterField пересоздал бы таблицы
+# в SQLite ради изменения, которого в базе нет
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0004_alter_contactmessage_message'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='contactmessage',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+            ],
+        ),
+    ]
@@ -5,10 +5,12 @@ Views для приложения контактов.
 from django.views.generic import CreateView
 from django.contrib import messages
 from django.urls import reverse_lazy
+from django.db import transaction
 from django.http import JsonResponse
 from loguru import logger
 from apps.contacts.models import ContactMessage
-from apps.main.utils.telegram import send_telegram_message, format_contact_message
+from apps.main.utils.outbox import enqueue_notification
+from apps.main.utils.telegram import format_contact_message
 
 
 class ContactFormView(CreateView):
@@ -55,11 +57,21 @@ class ContactFormView(CreateView):
             else:
                 form.instance.message = service_context
         
-        # Сохраняем сообщение
-        self.object = form.save()
+        is_callback = self.request.POST.get('is_callback') == 'true'
+        
+        # Сохраняем сообщение и уведомление в Telegram одной транзакцией:
+        # уведомление отправит deliver_notifications, ответ не ждёт Telegram API
+        with transaction.atomic():
+            self.object = form.save()
+            enqueue_notification(format_contact_message(
+                name=form.cleaned_data['name'],
+                phone=form.cleaned_data['phone'],
+                email=form.cleaned_data.get('email', ''),
+                message=form.instance.message,
+                is_callback=is_callback
+            ))
         
         # Логируем новое обращение
-        is_callback = self.request.POST.get('is_callback') == 'true'
         callback_type = 'заказ звонка' if is_callback else 'сообщение'
         
         log_message = f'Новое обращение ({callback_type}) от {form.cleaned_data["name"]}, телефон: {form.cleaned_data["phone"]}'
@@ -68,19 +80,6 @@ class ContactFormView(CreateView):
         
         logger.info(log_message)
         
-        # Отправляем уведомление в Telegram
-        try:
-            telegram_message = format_contact_message(
-                name=form.cleaned_data['name'],
-                phone=form.cleaned_data['phone'],
-                email=form.cleaned_data.get('email', ''),
-                message=form.instance.message,
-                is_callback=is_callback
-            )
-            send_telegram_message(telegram_message)
-        except Exception as e:
-            logger.error(f'Ошибка отправки в Telegram: {e}')
-        
         # Если это AJAX запрос (модалка), возвращаем JSON
         if self.request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
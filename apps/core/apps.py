@@ -11,4 +11,14 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'Базовые настройки'
-
+    
+    def ready(self):
+        """Подключение сигналов."""
+        from apps.core.images.metadata import connect_metadata_signals
+        from apps.core.images.registry import connect_image_signals
+        from apps.core.signals import connect_page_cache_signals
+        from apps.core.sqlite import connect_sqlite_signals
+        connect_page_cache_signals()
+        connect_sqlite_signals()
+        connect_image_signals()
+        connect_metadata_signals()
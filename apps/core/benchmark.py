@@ -0,0 +1,50 @@
+"""
+Утилиты для бенчмарков в management командах.
+"""
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable
+from django.db import connections
+
+
+@contextmanager
+def temporary_database(alias: str = 'default'):
+    """
+    Временная база данных на время бенчмарка.
+
+    Создаётся так же, как тестовая база (с применением миграций),
+    и удаляется после выхода из блока. Для SQLite база создаётся
+    в файле, а не в памяти, чтобы замеры отражали работу с диском.
+    """
+    connection = connections[alias]
+    old_name = connection.settings_dict['NAME']
+    old_test_name = connection.settings_dict['TEST'].get('NAME')
+    temp_dir = None
+    if connection.vendor == 'sqlite':
+        temp_dir = tempfile.mkdtemp(prefix='benchmark-')
+        connection.settings_dict['TEST']['NAME'] = os.path.join(temp_dir, 'benchmark.sqlite3')
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        connection.settings_dict['TEST']['NAME'] = old_test_name
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def measure(func: Callable, repeat: int = 20) -> float:
+    """Медианное время выполнения функции в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
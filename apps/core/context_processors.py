@@ -2,39 +2,17 @@
 Context processors для добавления глобальных переменных в шаблоны.
 """
 
-from apps.main.models import SiteSettings
 from loguru import logger
-
-
-def format_phone(phone):
-    """
-    Форматирует телефонный номер в формат +7 (8142) 28-09-03
-    """
-    if not phone:
-        return phone
-    
-    # Удаляем все нецифровые символы кроме плюса
-    phone_digits = ''.join(filter(str.isdigit, str(phone).replace('+', '')))
-    
-    # Если номер начинается с 8, заменяем на 7
-    if phone_digits.startswith('8'):
-        phone_digits = '7' + phone_digits[1:]
-    
-    # Если номер не начинается с 7, добавляем 7
-    if not phone_digits.startswith('7'):
-        phone_digits = '7' + phone_digits
-    
-    # Форматируем: +7 (8142) 28-09-03
-    if len(phone_digits) >= 11:
-        return f"+7 ({phone_digits[1:5]}) {phone_digits[5:7]}-{phone_digits[7:9]}-{phone_digits[9:11]}"
-    
-    return phone
+from apps.core.site_settings import format_phone, get_site_settings
 
 
 def site_settings(request):
     """
     Добавляет настройки сайта во все шаблоны.
     
+    Настройки берутся из снимка в памяти процесса,
+    запрос к базе выполняется только после их изменения.
+    
     Использование:
         {{ settings.site_name }}
         {{ settings.phone }}
@@ -43,14 +21,7 @@ def site_settings(request):
         и т.д.
     """
     try:
-        settings = SiteSettings.objects.filter(is_active=True).first()
-        if settings:
-            # Добавляем отформатированный телефон
-            settings.phone_formatted = format_phone(settings.phone) if settings.phone else ''
-        return {'settings': settings}
+        return {'settings': get_site_settings(request)}
     except Exception as e:
         logger.error(f'Ошибка при загрузке настроек сайта: {e}')
         return {'settings': None}
-
-
-
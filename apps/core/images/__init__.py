@@ -0,0 +1,25 @@
+"""
+Изображения разных размеров и форматов для адаптивной вёрстки.
+
+Именованные размеры описаны в settings.IMAGE_SIZES, варианты
+создаёт sorl-thumbnail (файлы в MEDIA_ROOT/cache/), а шаблонные теги
+{% responsive_image %} и {% background_image %} выводят <picture>
+с AVIF/WebP и запасным JPEG/PNG.
+"""
+
+from apps.core.images.metadata import ImageMetadata, get_metadata
+from apps.core.images.sizes import ImageSize, get_modern_formats, get_size
+from apps.core.images.variants import FALLBACK, MIME_TYPES, Variant, get_all_variants, get_variants
+
+__all__ = [
+    'FALLBACK',
+    'MIME_TYPES',
+    'ImageMetadata',
+    'ImageSize',
+    'Variant',
+    'get_all_variants',
+    'get_metadata',
+    'get_modern_formats',
+    'get_size',
+    'get_variants',
+]
@@ -0,0 +1,41 @@
+"""
+Backend sorl-thumbnail с поддержкой AVIF.
+
+sorl знает расширения только для JPEG, PNG, GIF и WEBP;
+AVIF сохраняет Pillow 11.3+, но имя файла нужно с расширением .avif.
+"""
+
+from sorl.thumbnail.base import EXTENSIONS, ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings, settings
+from sorl.thumbnail.helpers import serialize, tokey
+from sorl.thumbnail.images import ImageFile
+
+
+FORMAT_EXTENSIONS = {**EXTENSIONS, 'AVIF': 'avif'}
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    """Backend с расширением .avif для формата AVIF."""
+    
+    def _get_thumbnail_filename(self, source, geometry_string, options):
+        key = tokey(source.key, geometry_string, serialize(options))
+        path = f'{key[:2]}/{key[2:4]}/{key}'
+        return f'{settings.THUMBNAIL_PREFIX}{path}.{FORMAT_EXTENSIONS[options["format"]]}'
+    
+    def get_thumbnail_name(self, file_, geometry_string, **options) -> str:
+        """
+        Имя файла миниатюры без её создания и без обращения к файлам.
+        
+        Опции дополняются так же, как в get_thumbnail, поэтому имя
+        совпадает с именем миниатюры, которую создаст get_thumbnail.
+        """
+        source = ImageFile(file_)
+        if settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return self._get_thumbnail_filename(source, geometry_string, options)
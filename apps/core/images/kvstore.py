@@ -0,0 +1,32 @@
+"""
+Хранилище ключей sorl-thumbnail в кеше Django.
+
+Стандартное хранилище sorl пишет каждую миниатюру в таблицу базы.
+Здесь ключи живут только в кеше: при вытеснении ключа sorl проверит
+наличие файла миниатюры на диске и восстановит запись без пересоздания.
+"""
+
+from django.core.cache import caches
+from sorl.thumbnail.conf import settings
+from sorl.thumbnail.kvstores.base import KVStoreBase
+
+
+class CacheKVStore(KVStoreBase):
+    """Хранилище ключей sorl-thumbnail в кеше settings.THUMBNAIL_CACHE."""
+    
+    @property
+    def cache(self):
+        return caches[settings.THUMBNAIL_CACHE]
+    
+    def _get_raw(self, key):
+        return self.cache.get(key)
+    
+    def _set_raw(self, key, value):
+        self.cache.set(key, value, settings.THUMBNAIL_CACHE_TIMEOUT)
+    
+    def _delete_raw(self, *keys):
+        self.cache.delete_many(keys)
+    
+    def _find_keys_raw(self, prefix):
+        # Кеш не умеет перечислять ключи: thumbnail cleanup здесь ничего не делает
+        return []
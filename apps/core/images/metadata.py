@@ -0,0 +1,156 @@
+"""
+Хранимые размеры изображений и размытые заглушки (LQIP).
+
+Для полей из IMAGE_METADATA_FIELDS рядом с изображением хранятся
+<поле>_width, <поле>_height и <поле>_placeholder - крошечная копия
+в data URI. Шаблоны выводят по ним атрибуты width/height (место
+под изображение резервируется до загрузки) и размытый фон.
+
+Значения вычисляются один раз после сохранения нового файла;
+для уже загруженных - командой backfill_image_metadata.
+Стандартные width_field/height_field не используются: они читают
+файл при каждой загрузке объекта, у которого размеры ещё не заполнены,
+и падают на отсутствующем файле.
+"""
+
+import base64
+from io import BytesIO
+from typing import NamedTuple, Optional
+from django.apps import apps
+from django.db.models.signals import post_save, pre_save
+from loguru import logger
+from PIL import Image, ImageOps, features
+
+
+# Модель -> поля изображений с хранимыми размерами и заглушкой
+IMAGE_METADATA_FIELDS = {
+    'portfolio.PortfolioItem': ('image',),
+    'main.Slider': ('image',),
+}
+
+# Длинная сторона заглушки в пикселях: браузер растягивает её с размытием
+PLACEHOLDER_SIZE = 16
+
+# Теги EXIF Orientation, при которых ширина и высота меняются местами
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+class ImageMetadata(NamedTuple):
+    """Размеры изображения (с учётом поворота по EXIF) и заглушка."""
+    
+    width: int
+    height: int
+    placeholder: str
+
+
+def make_placeholder(image) -> str:
+    """Заглушка: изображение PLACEHOLDER_SIZE пикселей в data URI."""
+    image = image.convert('RGB')
+    image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    if features.check('webp'):
+        image.save(buffer, 'WEBP', quality=40)
+        mime_type = 'image/webp'
+    else:
+        image.save(buffer, 'JPEG', quality=40)
+        mime_type = 'image/jpeg'
+    return f'data:{mime_type};base64,{base64.b64encode(buffer.getvalue()).decode()}'
+
+
+def read_metadata(file_object) -> ImageMetadata:
+    """
+    Размеры и заглушка изображения из файла.
+    
+    JPEG декодируется в уменьшенном виде (draft), поэтому даже
+    крупная фотография читается быстро.
+    """
+    with Image.open(file_object) as image:
+        width, height = image.size
+        if image.getexif().get(0x0112, 1) in TRANSPOSED_ORIENTATIONS:
+            width, height = height, width
+        image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        placeholder = make_placeholder(ImageOps.exif_transpose(image))
+    return ImageMetadata(width, height, placeholder)
+
+
+def read_field_metadata(image) -> Optional[ImageMetadata]:
+    """Метаданные значения ImageField или None, если файла нет или он не читается."""
+    if not image or not image.name:
+        return None
+    try:
+        with image.storage.open(image.name, 'rb') as file_object:
+            return read_metadata(file_object)
+    except Exception as e:
+        logger.warning(f'Не удалось прочитать изображение {image.name}: {e}')
+        return None
+
+
+def metadata_values(field_name: str, metadata: Optional[ImageMetadata]) -> dict:
+    """Значения полей модели для метаданных (пустые, если метаданных нет)."""
+    return {
+        f'{field_name}_width': metadata.width if metadata else None,
+        f'{field_name}_height': metadata.height if metadata else None,
+        f'{field_name}_placeholder': metadata.placeholder if metadata else '',
+    }
+
+
+def handle_metadata_pre_save(sender, instance, raw=False, **kwargs):
+    """Запоминает поля с новым (ещё не сохранённым) файлом."""
+    if raw:
+        return
+    pending = set()
+    for field_name in IMAGE_METADATA_FIELDS.get(sender._meta.label, ()):
+        image = getattr(instance, field_name)
+        if image and not image._committed:
+            pending.add(field_name)
+        elif not image and getattr(instance, f'{field_name}_width') is not None:
+            # Изображение удалено - сбрасываем метаданные вместе с ним
+            for name, value in metadata_values(field_name, None).items():
+                setattr(instance, name, value)
+    instance._image_metadata_pending = pending
+
+
+def handle_metadata_post_save(sender, instance, raw=False, **kwargs):
+    """
+    Вычисляет метаданные сохранённого файла.
+    
+    Файл уже записан хранилищем (после нормализации), поэтому размеры
+    соответствуют тому, что отдаёт сайт. Значения записываются
+    отдельным UPDATE без повторного вызова save() и сигналов.
+    """
+    if raw:
+        return
+    pending = getattr(instance, '_image_metadata_pending', set())
+    values = {}
+    for field_name in IMAGE_METADATA_FIELDS.get(sender._meta.label, ()):
+        image = getattr(instance, field_name)
+        missing = image and getattr(instance, f'{field_name}_width') is None
+        if field_name in pending or missing:
+            values.update(metadata_values(field_name, read_field_metadata(image)))
+    instance._image_metadata_pending = set()
+    if not values:
+        return
+    for name, value in values.items():
+        setattr(instance, name, value)
+    sender._base_manager.filter(pk=instance.pk).update(**values)
+
+
+def connect_metadata_signals():
+    """Подключает вычисление метаданных к моделям из IMAGE_METADATA_FIELDS."""
+    for label in IMAGE_METADATA_FIELDS:
+        model = apps.get_model(label)
+        pre_save.connect(handle_metadata_pre_save, sender=model, dispatch_uid=f'image_metadata_pre_{label}')
+        post_save.connect(handle_metadata_post_save, sender=model, dispatch_uid=f'image_metadata_post_{label}')
+
+
+def get_metadata(image) -> Optional[ImageMetadata]:
+    """Хранимые метаданные значения ImageField (без чтения файла)."""
+    instance = getattr(image, 'instance', None)
+    field = getattr(image, 'field', None)
+    if instance is None or field is None:
+        return None
+    width = getattr(instance, f'{field.name}_width', None)
+    height = getattr(instance, f'{field.name}_height', None)
+    if not width or not height:
+        return None
+    return ImageMetadata(width, height, getattr(instance, f'{field.name}_placeholder', ''))
@@ -0,0 +1,124 @@
+"""
+Нормализация загружаемых изображений.
+
+Фотографии с телефона (5-10 МБ, 4000+ пикселей, повёрнутые через EXIF)
+приводятся к виду, пригодному для сайта:
+    - поворот по EXIF Orientation применяется к пикселям;
+    - метаданные (EXIF с GPS, XMP, комментарии) удаляются,
+      цветовой профиль ICC сохраняется;
+    - длинная сторона уменьшается до settings.IMAGE_UPLOAD_MAX_EDGE;
+    - файл перекодируется в том же формате с качеством
+      settings.IMAGE_UPLOAD_QUALITY.
+
+Анимированные, векторные и неизвестные Pillow файлы не изменяются.
+"""
+
+from io import BytesIO
+from typing import NamedTuple, Optional, Tuple
+from django.conf import settings
+from PIL import Image, ImageOps
+
+
+# Формат файла -> формат, в котором он сохраняется после нормализации
+# (MPO - JPEG с дополнительными кадрами глубины, так снимают iPhone)
+NORMALIZED_FORMATS = {
+    'JPEG': 'JPEG',
+    'MPO': 'JPEG',
+    'PNG': 'PNG',
+    'WEBP': 'WEBP',
+}
+
+# Ключи Image.info с метаданными, которые не нужны на сайте
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop', 'iptc')
+
+EXIF_ORIENTATION = 0x0112
+
+
+class NormalizedImage(NamedTuple):
+    """Результат нормализации: новое содержимое и что было изменено."""
+    
+    content: bytes
+    width: int
+    height: int
+    original_bytes: int
+    changes: Tuple[str, ...]
+    
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - len(self.content)
+
+
+def should_normalize(name: str) -> bool:
+    """Нужно ли нормализовать файл с таким именем в хранилище."""
+    if not getattr(settings, 'IMAGE_NORMALIZE_UPLOADS', True):
+        return False
+    return name.replace('\\', '/').startswith(tuple(getattr(settings, 'IMAGE_UPLOAD_PATHS', ())))
+
+
+def has_metadata(image) -> bool:
+    if any(image.info.get(key) for key in METADATA_KEYS):
+        return True
+    # Текстовые блоки PNG (tEXt/iTXt)
+    return bool(getattr(image, 'text', None))
+
+
+def normalize_image(file_object, max_edge: Optional[int] = None,
+                    quality: Optional[int] = None) -> Optional[NormalizedImage]:
+    """
+    Нормализует изображение.
+    
+    Args:
+        file_object: Файл (читается целиком, позиция возвращается в начало)
+        max_edge: Предел длинной стороны (по умолчанию IMAGE_UPLOAD_MAX_EDGE)
+        quality: Качество JPEG/WebP (по умолчанию IMAGE_UPLOAD_QUALITY)
+    
+    Returns:
+        NormalizedImage или None, если файл не изображение
+        или уже не требует изменений
+    """
+    max_edge = max_edge or getattr(settings, 'IMAGE_UPLOAD_MAX_EDGE', 2560)
+    quality = quality or getattr(settings, 'IMAGE_UPLOAD_QUALITY', 85)
+    
+    file_object.seek(0)
+    data = file_object.read()
+    file_object.seek(0)
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return None
+    
+    format_name = NORMALIZED_FORMATS.get(image.format)
+    if format_name is None:
+        return None
+    if image.format != 'MPO' and getattr(image, 'n_frames', 1) > 1:
+        return None
+    
+    changes = []
+    if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+        changes.append('orientation')
+    if has_metadata(image):
+        changes.append('metadata')
+    if max(image.size) > max_edge:
+        changes.append('resize')
+    if not changes:
+        return None
+    
+    icc_profile = image.info.get('icc_profile')
+    result = ImageOps.exif_transpose(image)
+    if 'resize' in changes:
+        result.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+    
+    options = {'optimize': True}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    if format_name == 'JPEG':
+        if result.mode not in ('RGB', 'L', 'CMYK'):
+            result = result.convert('RGB')
+        options.update(quality=quality, progressive=True)
+    elif format_name == 'WEBP':
+        options.update(quality=quality)
+    
+    buffer = BytesIO()
+    result.save(buffer, format_name, **options)
+    return NormalizedImage(buffer.getvalue(), result.width, result.height, len(data), tuple(changes))
@@ -0,0 +1,154 @@
+"""
+Перцептивный хеш изображений и поиск близких хешей.
+
+dHash (difference hash): изображение уменьшается до 9x8 в оттенках
+серого, каждый бит - "левый пиксель ярче правого". Пересжатие,
+изменение размера и небольшое кадрирование меняют лишь несколько бит,
+поэтому похожие фотографии находятся по расстоянию Хэмминга.
+
+HammingIndex находит все хеши в радиусе r без полного перебора:
+проверяются только объекты, у которых совпадает (с точностью до
+нескольких бит) хотя бы одна из четырёх 16-битных частей хеша.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Tuple
+from PIL import Image, ImageOps
+
+
+HASH_SIZE = 8
+
+
+def dhash(image) -> int:
+    """64-битный dHash изображения PIL (с учётом поворота по EXIF)."""
+    image = ImageOps.exif_transpose(image).convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(image.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        for column in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + column]
+            right = pixels[row * (HASH_SIZE + 1) + column + 1]
+            value = (value << 1) | int(left > right)
+    return value
+
+
+def dhash_file(file_object) -> str:
+    """
+    dHash файла изображения в виде 16 шестнадцатеричных символов.
+    
+    JPEG декодируется в уменьшенном виде (draft), позиция файла
+    возвращается в начало.
+    """
+    file_object.seek(0)
+    with Image.open(file_object) as image:
+        image.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        value = dhash(image)
+    file_object.seek(0)
+    return format_hash(value)
+
+
+def format_hash(value: int) -> str:
+    return f'{value:016x}'
+
+
+def parse_hash(value: str) -> int:
+    return int(value, 16)
+
+
+def hamming(a: int, b: int) -> int:
+    """Количество различающихся бит."""
+    return (a ^ b).bit_count()
+
+
+class HammingIndex:
+    """
+    Индекс хешей для поиска по расстоянию Хэмминга (multi-index hashing).
+    
+    Хеш делится на segments частей, для каждой части - словарь
+    "значение части -> объекты". Если расстояние между хешами не больше r,
+    то хотя бы одна часть отличается не больше чем на r // segments бит
+    (принцип Дирихле). Поэтому поиск перебирает только значения частей
+    в этом малом радиусе и проверяет найденных кандидатов полностью.
+    """
+    
+    def __init__(self, items: Iterable[Tuple[Hashable, int]] = (), segments: int = 4):
+        self.segments = segments
+        self.bits = HASH_SIZE * HASH_SIZE // segments
+        self.mask = (1 << self.bits) - 1
+        self.tables: List[Dict[int, List[Tuple[int, Hashable]]]] = [{} for _ in range(segments)]
+        self.size = 0
+        for key, value in items:
+            self.add(key, value)
+    
+    def add(self, key: Hashable, value: int) -> None:
+        """Добавляет объект с хешем."""
+        self.size += 1
+        for index, table in enumerate(self.tables):
+            part = (value >> (index * self.bits)) & self.mask
+            table.setdefault(part, []).append((value, key))
+    
+    def search(self, value: int, radius: int) -> List[Tuple[int, Hashable]]:
+        """
+        Объекты с хешем на расстоянии не больше radius.
+        
+        Returns:
+            Пары (расстояние, ключ) по возрастанию расстояния
+        """
+        flips = _flip_masks(self.bits, radius // self.segments)
+        found = []
+        seen = set()
+        for index, table in enumerate(self.tables):
+            part = (value >> (index * self.bits)) & self.mask
+            for flip in flips:
+                for other, key in table.get(part ^ flip, ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    distance = hamming(value, other)
+                    if distance <= radius:
+                        found.append((distance, key))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(bits: int, radius: int) -> Tuple[int, ...]:
+    """Маски, меняющие не больше radius бит из bits (включая пустую)."""
+    return tuple(
+        sum(1 << position for position in positions)
+        for count in range(min(radius, bits) + 1)
+        for positions in combinations(range(bits), count)
+    )
+
+
+def group_similar(items: Dict[Hashable, int], radius: int) -> List[List[Hashable]]:
+    """
+    Группы похожих объектов (связные компоненты по расстоянию <= radius).
+    
+    Args:
+        items: Ключ объекта -> хеш
+        radius: Максимальное расстояние Хэмминга
+    
+    Returns:
+        Группы из двух и более ключей
+    """
+    index = HammingIndex(items.items())
+    parent = {key: key for key in items}
+    
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+    
+    for key, value in items.items():
+        for _, other in index.search(value, radius):
+            root, other_root = find(key), find(other)
+            if root != other_root:
+                parent[other_root] = root
+    
+    groups = {}
+    for key in items:
+        groups.setdefault(find(key), []).append(key)
+    return [group for group in groups.values() if len(group) > 1]
@@ -0,0 +1,92 @@
+"""
+Поля изображений, для которых варианты создаются при загрузке.
+"""
+
+from typing import Iterable, Iterator, Optional
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save
+from loguru import logger
+from apps.core.images.workers import ImageJob, enqueue
+
+
+# Модель -> поле изображения -> именованные размеры, в которых оно выводится
+IMAGE_FIELDS = {
+    'portfolio.PortfolioItem': {'image': ('grid', 'modal')},
+    'services.Service': {'icon': ('icon', 'grid'), 'image': ('album',)},
+    'main.Slider': {'image': ('hero',)},
+    'main.AboutUs': {'image': ('album',)},
+    'main.Testimonial': {'avatar': ('icon',)},
+}
+
+
+def iter_images(instance):
+    """Пары (изображение, размер) объекта по IMAGE_FIELDS."""
+    fields = IMAGE_FIELDS.get(instance._meta.label, {})
+    for field_name, size_names in fields.items():
+        image = getattr(instance, field_name)
+        if image and image.name:
+            for size_name in size_names:
+                yield image, size_name
+
+
+def iter_jobs(instance) -> Iterator[ImageJob]:
+    """Задачи создания вариантов для изображений объекта."""
+    for image, size_name in iter_images(instance):
+        yield ImageJob(instance._meta.label, image.field.name, image.name, size_name)
+
+
+def collect_jobs(labels: Optional[Iterable[str]] = None,
+                 sizes: Optional[Iterable[str]] = None) -> Iterator[ImageJob]:
+    """
+    Задачи для всех изображений из IMAGE_FIELDS.
+    
+    Из базы читаются только имена файлов, без загрузки объектов.
+    
+    Args:
+        labels: Только эти модели ('portfolio.PortfolioItem')
+        sizes: Только эти именованные размеры
+    """
+    labels = set(labels) if labels else None
+    sizes = set(sizes) if sizes else None
+    for label, fields in IMAGE_FIELDS.items():
+        if labels is not None and label not in labels:
+            continue
+        model = apps.get_model(label)
+        for field_name, size_names in fields.items():
+            size_names = [name for name in size_names if sizes is None or name in sizes]
+            if not size_names:
+                continue
+            names = (
+                model._base_manager
+                .exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .order_by(field_name)
+                .values_list(field_name, flat=True)
+                .distinct()
+            )
+            for name in names.iterator(chunk_size=1000):
+                for size_name in size_names:
+                    yield ImageJob(label, field_name, name, size_name)
+
+
+def handle_image_save(sender, instance, raw=False, **kwargs):
+    """Постановка вариантов в очередь после сохранения объекта с изображением."""
+    if raw:
+        return
+    
+    def schedule():
+        try:
+            enqueue(iter_jobs(instance))
+        except Exception as e:
+            logger.error(f'Ошибка постановки вариантов изображений {sender.__name__} ({instance.pk}): {e}')
+    
+    # Файл загружен и запись видна другим запросам только после коммита
+    transaction.on_commit(schedule)
+
+
+def connect_image_signals():
+    """Подключает создание вариантов к моделям с изображениями."""
+    for label in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        post_save.connect(handle_image_save, sender=model, dispatch_uid=f'image_variants_{label}')
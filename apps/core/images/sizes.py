@@ -0,0 +1,81 @@
+"""
+Именованные размеры изображений.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from PIL import features
+
+
+@dataclass(frozen=True)
+class ImageSize:
+    """
+    Именованный размер изображения.
+    
+    Атрибуты:
+        name: Имя размера (grid, album, modal, hero, icon)
+        widths: Ширины вариантов для srcset по возрастанию
+        sizes: Значение атрибута sizes (ширина изображения в вёрстке)
+        quality: Качество JPEG
+        budget_kb: Предел размера самого широкого варианта в КБ
+            (для узких вариантов уменьшается пропорционально площади)
+        formats: Качество по современным форматам {'AVIF': 50, 'WEBP': 75}
+    """
+    
+    name: str
+    widths: Tuple[int, ...]
+    sizes: str
+    quality: int = 80
+    budget_kb: Optional[int] = None
+    formats: Dict[str, int] = field(default_factory=dict)
+    
+    def budget_for(self, width: int) -> Optional[int]:
+        """Предел размера варианта заданной ширины в байтах."""
+        if not self.budget_kb:
+            return None
+        return int(self.budget_kb * 1024 * (width / self.widths[-1]) ** 2)
+    
+    @property
+    def signature(self) -> str:
+        """Строка параметров размера: меняется при изменении пресета."""
+        formats = ','.join(f'{name}:{quality}' for name, quality in self.formats.items())
+        return f'{self.name}|{self.widths}|{self.quality}|{self.budget_kb}|{formats}'
+
+
+def get_modern_formats() -> Dict[str, int]:
+    """
+    Современные форматы из settings.IMAGE_FORMATS, которые умеет Pillow.
+    
+    Returns:
+        Формат и качество по умолчанию в порядке предпочтения (AVIF раньше WebP)
+    """
+    return {
+        name: quality
+        for name, quality in getattr(settings, 'IMAGE_FORMATS', {}).items()
+        if features.check(name.lower())
+    }
+
+
+def get_size(name: str) -> ImageSize:
+    """
+    Именованный размер из settings.IMAGE_SIZES.
+    
+    Raises:
+        KeyError: Если размер не описан в настройках
+    """
+    options = settings.IMAGE_SIZES[name]
+    formats = get_modern_formats()
+    formats.update({
+        format_name: quality
+        for format_name, quality in options.get('formats', {}).items()
+        if format_name in formats
+    })
+    return ImageSize(
+        name=name,
+        widths=tuple(sorted(options['widths'])),
+        sizes=options['sizes'],
+        quality=options.get('quality', 80),
+        budget_kb=options.get('budget_kb'),
+        formats=formats,
+    )
@@ -0,0 +1,115 @@
+"""
+Хранилище медиафайлов с нормализацией загружаемых изображений
+и именами по содержимому.
+
+Через хранилище проходят и поля ImageField моделей, и загрузки
+CKEditor, поэтому нормализация выполняется в одном месте для всех.
+
+Файлы в каталогах MEDIA_CONTENT_ADDRESSED_PATHS сохраняются под именем
+из SHA-256 содержимого: portfolio/%Y/%m/photo.jpg становится
+portfolio/3f/3f9c...e1.jpg. Содержимое файла с таким именем никогда
+не меняется (URL можно кешировать навсегда), а одинаковые загрузки
+хранятся на диске один раз.
+"""
+
+import os
+import re
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from loguru import logger
+from apps.core.images.normalize import normalize_image, should_normalize
+from apps.core.utils.hashing import content_hash
+
+
+CONTENT_NAME_RE = re.compile(r'(^|/)([0-9a-f]{2})/\2[0-9a-f]{62}\.\w+$')
+
+
+def uses_content_names(name: str) -> bool:
+    """Сохраняется ли файл с таким путём под именем по содержимому."""
+    if not getattr(settings, 'MEDIA_CONTENT_ADDRESSED', False):
+        return False
+    return name.replace('\\', '/').startswith(tuple(settings.MEDIA_CONTENT_ADDRESSED_PATHS))
+
+
+def is_content_name(name: str) -> bool:
+    """Имя уже построено по содержимому (<каталог>/<ab>/<sha256>.<ext>)."""
+    return bool(CONTENT_NAME_RE.search(name.replace('\\', '/')))
+
+
+def content_name(name: str, digest: str) -> str:
+    """
+    Имя по содержимому для файла name.
+    
+    Каталог upload_to сохраняется без частей даты:
+    services/icons/2024/05/icon.png -> services/icons/<ab>/<sha256>.png.
+    """
+    directory, filename = os.path.split(name.replace('\\', '/'))
+    parts = directory.split('/') if directory else []
+    while parts and parts[-1].isdigit():
+        parts.pop()
+    extension = os.path.splitext(filename)[1].lower()
+    return '/'.join(parts + [digest[:2], digest + extension])
+
+
+class MediaStorage(FileSystemStorage):
+    """
+    FileSystemStorage, который нормализует изображения при сохранении.
+    
+    Обрабатываются файлы в каталогах settings.IMAGE_UPLOAD_PATHS.
+    Если задан settings.IMAGE_ORIGINALS_ROOT, исходный файл сохраняется
+    туда под тем же именем (холодная копия, сайтом не отдаётся).
+    Файлы в каталогах settings.MEDIA_CONTENT_ADDRESSED_PATHS получают
+    имя по содержимому (см. save_by_content).
+    """
+    
+    def _save(self, name, content):
+        if not should_normalize(name):
+            return self.save_file(name, content)
+        
+        try:
+            normalized = normalize_image(content)
+        except Exception as e:
+            # Непредвиденная ошибка Pillow: файл сохраняется как есть
+            logger.error(f'Ошибка нормализации изображения {name}: {e}')
+            normalized = None
+        if normalized is None:
+            return self.save_file(name, content)
+        
+        name = self.save_file(name, ContentFile(normalized.content))
+        self.keep_original(name, content)
+        logger.info(
+            f'Изображение {name} нормализовано ({", ".join(normalized.changes)}): '
+            f'{normalized.original_bytes} -> {len(normalized.content)} байт'
+        )
+        return name
+    
+    def save_file(self, name, content) -> str:
+        """Сохраняет файл без обработки (по содержимому - если это включено для каталога)."""
+        if uses_content_names(name):
+            return self.save_by_content(name, content)
+        return super()._save(name, content)
+    
+    def save_by_content(self, name, content) -> str:
+        """
+        Сохраняет файл под именем из хеша содержимого.
+        
+        Если такой файл уже есть, он не перезаписывается: файл с тем же
+        именем - это тот же файл, и объекты начинают ссылаться на него.
+        """
+        name = content_name(name, content_hash(content))
+        if self.exists(name):
+            logger.info(f'Файл {name} уже сохранён, повторная загрузка не записывается')
+            return name
+        return super()._save(name, content)
+    
+    def keep_original(self, name: str, content) -> None:
+        """Сохраняет исходный файл в IMAGE_ORIGINALS_ROOT (если задан)."""
+        root = getattr(settings, 'IMAGE_ORIGINALS_ROOT', None)
+        if not root:
+            return
+        try:
+            content.seek(0)
+            FileSystemStorage(location=root).save(name, content)
+        except Exception as e:
+            logger.error(f'Не удалось сохранить оригинал {name} в {root}: {e}')
@@ -0,0 +1,209 @@
+"""
+Варианты изображений: ширины из именованного размера в исходном
+формате (JPEG/PNG) и в современных форматах (AVIF, WebP).
+
+Набор вариантов одного изображения для одного размера хранится
+в базе (ImageVariantJob) и в кеше одной записью, поэтому вывод <picture>
+стоит одного обращения к кешу. База нужна потому, что кеш по умолчанию
+у каждого процесса свой: набор, созданный командой
+generate_image_variants, веб-процесс берёт оттуда. Ключ зависит от
+параметров размера: после изменения пресета варианты создаются заново.
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from django.conf import settings
+from django.core.cache import cache
+from loguru import logger
+from sorl.thumbnail import default, get_thumbnail
+from apps.core.images.sizes import ImageSize, get_size
+from apps.core.models import ImageVariantJob
+
+
+# Форматы, которые Pillow не растрирует - отдаются как есть
+PASSTHROUGH_EXTENSIONS = ('.svg', '.gif')
+
+# Ключ исходного формата в наборе вариантов
+FALLBACK = 'FALLBACK'
+
+# Набор вариантов битого файла не кешируется надолго: файл могут заменить
+ERROR_TIMEOUT = 60
+
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+}
+
+
+class Variant(NamedTuple):
+    """Вариант изображения: адрес, ширина и размер файла (None, если неизвестны)."""
+    
+    url: str
+    width: Optional[int]
+    bytes: Optional[int] = None
+
+
+def variants_key(image, size: ImageSize) -> str:
+    """Ключ кеша набора вариантов."""
+    digest = hashlib.md5(f'{image.storage.__class__.__name__}|{image.name}|{size.signature}'.encode()).hexdigest()
+    return f'image_variants:{digest}'
+
+
+def render_variant(image, width: int, format_name: Optional[str], quality: int, budget: Optional[int]) -> Variant:
+    """
+    Создаёт (или находит готовый) вариант с учётом предела размера.
+    
+    Если файл больше предела, качество снижается шагами до
+    settings.IMAGE_MIN_QUALITY. PNG и GIF не сжимаются качеством.
+    """
+    min_quality = getattr(settings, 'IMAGE_MIN_QUALITY', 40)
+    while True:
+        options = {'quality': quality, 'upscale': False}
+        if format_name:
+            options['format'] = format_name
+        thumbnail = get_thumbnail(image, str(width), **options)
+        size_bytes = thumbnail.storage.size(thumbnail.name)
+        lossless = thumbnail.name.lower().endswith(('.png', '.gif'))
+        if budget is None or lossless or size_bytes <= budget or quality - 10 < min_quality:
+            return Variant(thumbnail.url, thumbnail.width, size_bytes)
+        quality -= 10
+
+
+def variant_names(image, size_name: str) -> Iterator[str]:
+    """
+    Имена файлов всех вариантов, которые могут быть созданы для размера.
+    
+    Файлы не читаются и не создаются. Для вариантов с пределом размера
+    перечисляются все ступени качества (как в render_variant).
+    Нужны для поиска неиспользуемых файлов в MEDIA_ROOT.
+    """
+    if not image or not image.name or image.name.lower().endswith(PASSTHROUGH_EXTENSIONS):
+        return
+    size = get_size(size_name)
+    min_quality = getattr(settings, 'IMAGE_MIN_QUALITY', 40)
+    formats = [(None, size.quality)] + list(size.formats.items())
+    for format_name, quality in formats:
+        for width in size.widths:
+            step_quality = quality
+            while True:
+                options = {'quality': step_quality, 'upscale': False}
+                if format_name:
+                    options['format'] = format_name
+                yield default.backend.get_thumbnail_name(image, str(width), **options)
+                if size.budget_for(width) is None or step_quality - 10 < min_quality:
+                    break
+                step_quality -= 10
+
+
+def static_variant_name(path: str, format_name: str) -> str:
+    """
+    Имя файла в современном формате рядом с картинкой из static
+    (About.jpg -> About.webp, создаёт команда convert_static_images).
+    """
+    return f'{os.path.splitext(path)[0]}.{format_name.lower()}'
+
+
+def build_variants(image, size: ImageSize) -> Dict[str, List[Variant]]:
+    """
+    Создаёт все варианты изображения для размера.
+    
+    Returns:
+        Варианты по форматам: FALLBACK (исходный формат), AVIF, WEBP
+    """
+    result = {}
+    formats = [(FALLBACK, None, size.quality)] + [(name, name, quality) for name, quality in size.formats.items()]
+    for key, format_name, quality in formats:
+        variants = []
+        for width in size.widths:
+            variant = render_variant(image, width, format_name, quality, size.budget_for(width))
+            variants.append(variant)
+            # Ширины больше оригинала не создаются
+            if variant.width < width:
+                break
+        result[key] = variants
+    return result
+
+
+def dump_variants(result: Dict[str, List[Variant]]) -> Dict[str, List[list]]:
+    """Набор вариантов для JSON поля."""
+    return {key: [list(variant) for variant in variants] for key, variants in result.items()}
+
+
+def load_variants(data: Dict[str, List[list]]) -> Dict[str, List[Variant]]:
+    """Набор вариантов из JSON поля."""
+    return {key: [Variant(*variant) for variant in variants] for key, variants in data.items()}
+
+
+def save_variants(image, size_name: str, result: Dict[str, List[Variant]]) -> None:
+    """Сохраняет готовый набор в базу и кеш (задача в очереди - выполнена)."""
+    key = variants_key(image, get_size(size_name))
+    ImageVariantJob.objects.update_or_create(key=key, defaults={
+        'label': image.field.model._meta.label,
+        'field_name': image.field.name,
+        'name': image.name,
+        'size_name': size_name,
+        'status': ImageVariantJob.Status.DONE,
+        'variants': dump_variants(result),
+        'last_error': '',
+        'claimed_until': None,
+    })
+    cache.set(key, result, None)
+
+
+def get_all_variants(image, size_name: str, generate: bool = True) -> Dict[str, List[Variant]]:
+    """
+    Варианты изображения по форматам (из кеша, из базы или созданные заново).
+    
+    Args:
+        image: Значение ImageField
+        size_name: Имя размера из settings.IMAGE_SIZES
+        generate: Создавать варианты, если их ещё нет
+    
+    Returns:
+        Пустой словарь, если изображения нет (или generate=False и набор
+        ещё не создан)
+    """
+    if not image or not image.name:
+        return {}
+    if image.name.lower().endswith(PASSTHROUGH_EXTENSIONS):
+        return {FALLBACK: [Variant(image.url, None)]}
+    
+    size = get_size(size_name)
+    key = variants_key(image, size)
+    result = cache.get(key)
+    if result is not None:
+        return result
+    
+    data = (
+        ImageVariantJob.objects
+        .filter(key=key, status=ImageVariantJob.Status.DONE)
+        .values_list('variants', flat=True)
+        .first()
+    )
+    if data is not None:
+        result = load_variants(data)
+        cache.set(key, result, None)
+        return result
+    if not generate:
+        return {}
+    
+    try:
+        result = build_variants(image, size)
+        save_variants(image, size_name, result)
+    except Exception as e:
+        # Битый или отсутствующий файл не должен ломать страницу
+        logger.error(f'Ошибка создания вариантов {image.name} ({size_name}): {e}')
+        result = {FALLBACK: [Variant(image.url, None)]}
+        cache.set(key, result, ERROR_TIMEOUT)
+    return result
+
+
+def get_variants(image, size_name: str, format_name: str = FALLBACK) -> List[Variant]:
+    """
+    Варианты изображения одного формата по возрастанию ширины.
+    
+    Если формат недоступен, возвращаются варианты в исходном формате.
+    """
+    variants = get_all_variants(image, size_name)
+    return variants.get(format_name) or variants.get(FALLBACK, [])
@@ -0,0 +1,298 @@
+"""
+Очередь создания вариантов изображений.
+
+Кодирование AVIF/WebP занимает основное время, поэтому веб-процесс
+варианты не создаёт: сохранение объекта только ставит задачи в очередь -
+строки ImageVariantJob в базе. Создаёт их команда generate_image_variants
+(постоянно - с --watch, image-variants.service) в пуле процессов
+(ProcessPoolExecutor, по умолчанию по процессу на ядро -
+settings.IMAGE_WORKERS). Задача - пара (изображение, размер): процесс
+пула создаёт файлы и возвращает набор вариантов, а основной процесс
+записывает его в базу (и в свой кеш). Состояние задач хранится в базе,
+поэтому прерванный запуск продолжается с того же места, а готовый набор
+видят все воркеры сайта.
+
+Готовый набор повторно не создаётся. Ключ зависит от параметров
+размера, поэтому после изменения пресета все изображения снова
+считаются неготовыми. Шаблонные теги берут только готовые наборы
+(get_ready_variants): для неготового выводится оригинал, а задача
+ставится в очередь.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.core.images.sizes import get_size
+from apps.core.images.variants import FALLBACK, Variant, build_variants, get_all_variants, save_variants, variants_key
+from apps.core.models import ImageVariantJob
+
+
+# На это время задачи заняты процессом, который их выполняет; если процесс
+# упадёт, задачи снова станут доступны после него
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# На это время (в секундах) процесс сайта запоминает, что набор ещё
+# не готов, и не обращается за ним к базе на каждом просмотре
+PENDING_TIMEOUT = 60
+
+
+class ImageJob(NamedTuple):
+    """Задача: файл из поля модели и именованный размер."""
+    
+    label: str
+    field_name: str
+    name: str
+    size_name: str
+    
+    def image(self):
+        """Значение поля (FieldFile) без загрузки объекта из базы."""
+        field = apps.get_model(self.label)._meta.get_field(self.field_name)
+        return field.attr_class(None, field, self.name)
+    
+    @property
+    def key(self) -> str:
+        return variants_key(self.image(), get_size(self.size_name))
+    
+    @classmethod
+    def from_row(cls, row: ImageVariantJob) -> 'ImageJob':
+        return cls(row.label, row.field_name, row.name, row.size_name)
+
+
+def get_worker_count() -> int:
+    """Количество процессов пула (0 или 1 - создавать варианты в текущем процессе)."""
+    workers = getattr(settings, 'IMAGE_WORKERS', None)
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(int(workers), 0)
+
+
+def init_worker():
+    """
+    Подготовка процесса пула.
+    
+    При запуске через fork Django уже настроен; при spawn/forkserver
+    его нужно настроить заново. С базой процессы не работают: всё
+    нужное передаётся в задаче, а соединения родителя трогать нельзя.
+    """
+    if not apps.ready:
+        import django
+        django.setup()
+
+
+def render_job(job: ImageJob) -> Dict[str, List[Variant]]:
+    """Создаёт варианты в процессе пула."""
+    return build_variants(job.image(), get_size(job.size_name))
+
+
+def store_result(job: ImageJob, result: Dict[str, List[Variant]]) -> None:
+    """Сохраняет набор вариантов: задача выполнена."""
+    save_variants(job.image(), job.size_name, result)
+
+
+def store_error(job: ImageJob, error: Exception) -> None:
+    """
+    Записывает ошибку задачи.
+    
+    Задача со статусом FAILED из очереди не берётся; её повторит
+    следующий полный запуск generate_image_variants или повторное
+    сохранение объекта.
+    """
+    key = job.key
+    values = {
+        'status': ImageVariantJob.Status.FAILED,
+        'last_error': str(error),
+        'claimed_until': None,
+    }
+    updated = ImageVariantJob.objects.filter(key=key).update(attempts=F('attempts') + 1, **values)
+    if not updated:
+        ImageVariantJob.objects.create(key=key, **job._asdict(), attempts=1, **values)
+
+
+def missing_jobs(jobs: Iterable[ImageJob], chunk_size: int = 500) -> Iterator[ImageJob]:
+    """
+    Задачи, наборы которых ещё не созданы.
+    
+    Готовые наборы ищутся в базе пачками; одинаковые файлы в разных
+    объектах дают одну задачу.
+    """
+    seen = set()
+    chunk = []
+    
+    def flush():
+        found = set(
+            ImageVariantJob.objects
+            .filter(key__in=[key for key, _ in chunk], status=ImageVariantJob.Status.DONE)
+            .values_list('key', flat=True)
+        )
+        return [job for key, job in chunk if key not in found]
+    
+    for job in jobs:
+        key = job.key
+        if key in seen:
+            continue
+        seen.add(key)
+        chunk.append((key, job))
+        if len(chunk) >= chunk_size:
+            yield from flush()
+            chunk = []
+    if chunk:
+        yield from flush()
+
+
+def run_jobs(jobs: Iterable[ImageJob], workers: int,
+             window: int = 4) -> Iterator[Tuple[ImageJob, Optional[Exception]]]:
+    """
+    Выполняет задачи и отдаёт их по мере завершения.
+    
+    Готовый набор (или ошибка) сразу записывается в базу, поэтому
+    прерванный запуск продолжается с того же места. В очереди пула
+    держится не больше workers * window задач.
+    
+    Args:
+        jobs: Задачи
+        workers: Количество процессов (0 или 1 - в текущем процессе)
+        window: Задач в очереди на процесс
+    
+    Yields:
+        Пары (задача, ошибка или None)
+    """
+    if workers <= 1:
+        for job in jobs:
+            try:
+                store_result(job, render_job(job))
+            except Exception as e:
+                store_error(job, e)
+                yield job, e
+            else:
+                yield job, None
+        return
+    
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = {}
+        try:
+            while True:
+                for job in jobs:
+                    pending[executor.submit(render_job, job)] = job
+                    if len(pending) >= workers * window:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        store_result(job, future.result())
+                    else:
+                        store_error(job, error)
+                    yield job, error
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def enqueue(jobs: Iterable[ImageJob]) -> int:
+    """
+    Ставит задачи в очередь (строки ImageVariantJob).
+    
+    Готовые наборы пропускаются, задачи с ошибкой ставятся заново.
+    Варианты здесь не создаются: это делает generate_image_variants.
+    
+    Returns:
+        Количество поставленных задач
+    """
+    jobs = list(missing_jobs(jobs))
+    if not jobs:
+        return 0
+    rows = [ImageVariantJob(key=job.key, **job._asdict()) for job in jobs]
+    ImageVariantJob.objects.bulk_create(rows, ignore_conflicts=True)
+    ImageVariantJob.objects.filter(
+        key__in=[row.key for row in rows],
+        status=ImageVariantJob.Status.FAILED
+    ).update(status=ImageVariantJob.Status.PENDING, last_error='', claimed_until=None)
+    return len(jobs)
+
+
+def claim_jobs(limit: int) -> List[ImageJob]:
+    """
+    Занимает до limit задач из очереди.
+    
+    Задача занимается условным UPDATE (claimed_until сдвигается на
+    CLAIM_TIMEOUT), поэтому несколько процессов не берут одну задачу.
+    Задачи упавшего процесса снова доступны по окончании занятия.
+    """
+    now = timezone.now()
+    candidates = list(
+        ImageVariantJob.objects
+        .filter(status=ImageVariantJob.Status.PENDING)
+        .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+        .order_by('updated_at')
+        .values_list('key', 'claimed_until')[:limit * 2]
+    )
+    lease = now + CLAIM_TIMEOUT
+    claimed = []
+    for key, claimed_until in candidates:
+        updated = ImageVariantJob.objects.filter(
+            key=key,
+            status=ImageVariantJob.Status.PENDING,
+            claimed_until=claimed_until
+        ).update(claimed_until=lease)
+        if updated:
+            claimed.append(key)
+            if len(claimed) >= limit:
+                break
+    rows = ImageVariantJob.objects.filter(key__in=claimed).order_by('updated_at')
+    return [ImageJob.from_row(row) for row in rows]
+
+
+def process_queue(workers: int, batch_size: int = 20) -> Iterator[Tuple[ImageJob, Optional[Exception]]]:
+    """
+    Выполняет задачи из очереди, пока она не опустеет.
+    
+    Задачи занимаются пачками по мере того, как пул их разбирает;
+    пул на весь вызов один.
+    
+    Args:
+        workers: Количество процессов (0 или 1 - в текущем процессе)
+        batch_size: Задач, занимаемых за раз
+    
+    Yields:
+        Пары (задача, ошибка или None)
+    """
+    def claimed():
+        while True:
+            jobs = claim_jobs(batch_size)
+            if not jobs:
+                return
+            yield from jobs
+    
+    yield from run_jobs(claimed(), workers)
+
+
+def get_ready_variants(image, size_name: str) -> Dict[str, List[Variant]]:
+    """
+    Готовые варианты изображения для вывода на странице.
+    
+    Варианты в запросе не создаются. Если набор ещё не готов, задача
+    ставится в очередь (готовые и упавшие задачи не трогаются), а до её
+    выполнения выводится оригинал.
+    
+    Returns:
+        Пустой словарь, если изображения нет
+    """
+    result = get_all_variants(image, size_name, generate=False)
+    if result or not image or not image.name:
+        return result
+    job = ImageJob(image.field.model._meta.label, image.field.name, image.name, size_name)
+    key = job.key
+    ImageVariantJob.objects.bulk_create([ImageVariantJob(key=key, **job._asdict())], ignore_conflicts=True)
+    result = {FALLBACK: [Variant(image.url, None)]}
+    cache.set(key, result, PENDING_TIMEOUT)
+    return result
@@ -0,0 +1,124 @@
+"""
+Management command: заполнение размеров и заглушек уже загруженных изображений.
+
+Для полей из IMAGE_METADATA_FIELDS читает файлы объектов, у которых
+размеры ещё не заполнены (с --force - всех), и записывает
+<поле>_width, <поле>_height и <поле>_placeholder пачками через
+bulk_update. Файлы читаются в пуле процессов. Заполненные объекты
+пропускаются, поэтому прерванный запуск можно повторить.
+
+Использование:
+    python manage.py backfill_image_metadata
+    python manage.py backfill_image_metadata --force --workers 4
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from apps.core.images.metadata import (
+    IMAGE_METADATA_FIELDS, ImageMetadata, metadata_values, read_field_metadata
+)
+from apps.core.images.workers import get_worker_count, init_worker
+
+
+def read_file(label: str, field_name: str, name: str) -> Optional[ImageMetadata]:
+    """Метаданные файла (выполняется в процессе пула, без обращения к базе)."""
+    field = apps.get_model(label)._meta.get_field(field_name)
+    return read_field_metadata(field.attr_class(None, field, name))
+
+
+class Command(BaseCommand):
+    """Заполнение размеров и заглушек изображений."""
+    
+    help = 'Заполняет размеры и размытые заглушки уже загруженных изображений'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересчитать и уже заполненные объекты'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Объектов в одной пачке (по умолчанию 200)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов (по умолчанию IMAGE_WORKERS или число ядер)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        workers = options['workers'] if options['workers'] is not None else get_worker_count()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker) if workers > 1 else None
+        try:
+            for label, field_names in IMAGE_METADATA_FIELDS.items():
+                model = apps.get_model(label)
+                for field_name in field_names:
+                    self.backfill(model, field_name, options, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def backfill(self, model, field_name: str, options: dict, executor):
+        """Заполняет метаданные одного поля."""
+        queryset = model._base_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+        if not options['force']:
+            queryset = queryset.filter(**{f'{field_name}_width__isnull': True})
+        total = queryset.count()
+        title = f'{model.__name__}.{field_name}'
+        if not total:
+            self.stdout.write(f'{title}: заполнять нечего')
+            return
+        
+        self.stdout.write(f'{title}: {total} объектов')
+        update_fields = list(metadata_values(field_name, None))
+        done = failed = 0
+        last_pk = None
+        
+        # Пачки по первичному ключу: обновления не сдвигают выборку
+        queryset = queryset.only('pk', field_name).order_by('pk')
+        while True:
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(page[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            failed += self.process_batch(model, field_name, batch, update_fields, executor)
+            done += len(batch)
+            self.stdout.write(f'  [{done}/{total}]')
+        
+        self.stdout.write(self.style.SUCCESS(f'  Заполнено: {done - failed} из {total}'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'  Не прочитано файлов: {failed} (отсутствуют или повреждены)'))
+    
+    def process_batch(self, model, field_name: str, batch: list, update_fields: list, executor) -> int:
+        """
+        Читает файлы пачки и сохраняет метаданные.
+        
+        Returns:
+            Количество непрочитанных файлов
+        """
+        names = [getattr(instance, field_name).name for instance in batch]
+        label = model._meta.label
+        if executor is not None:
+            results = list(executor.map(read_file, [label] * len(names), [field_name] * len(names), names))
+        else:
+            results = [read_file(label, field_name, name) for name in names]
+        
+        changed = []
+        for instance, metadata in zip(batch, results):
+            if metadata is None:
+                continue
+            for name, value in metadata_values(field_name, metadata).items():
+                setattr(instance, name, value)
+            changed.append(instance)
+        if changed:
+            model._base_manager.bulk_update(changed, update_fields)
+        return len(batch) - len(changed)
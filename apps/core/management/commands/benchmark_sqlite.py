@@ -0,0 +1,157 @@
+"""
+Management command для нагрузочного сравнения настроек SQLite.
+
+Читатели в потоках открывают страницу портфолио, писатели в это же
+время отправляют форму обратной связи. Замер выполняется дважды
+на отдельных временных базах: с настройками SQLite по умолчанию
+и с PRAGMA из settings.SQLITE_PRAGMAS.
+
+Использование:
+    python manage.py benchmark_sqlite
+    python manage.py benchmark_sqlite --readers 8 --writers 4 --duration 20
+"""
+
+import statistics
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from apps.core.benchmark import temporary_database
+from apps.portfolio.models import PortfolioItem
+from apps.services.models import Service
+
+
+class Command(BaseCommand):
+    """Бенчмарк конкурентных чтений и записей в SQLite."""
+    
+    help = 'Сравнивает SQLite по умолчанию и с настройками SQLITE_PRAGMAS под конкурентной нагрузкой'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument('--readers', type=int, default=8, help='Потоков, открывающих портфолио')
+        parser.add_argument('--writers', type=int, default=2, help='Потоков, отправляющих форму')
+        parser.add_argument('--duration', type=float, default=10, help='Длительность замера, секунд')
+        parser.add_argument('--items', type=int, default=300, help='Количество работ в портфолио')
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк предназначен для SQLite')
+        if not settings.SQLITE_PRAGMAS:
+            raise CommandError('SQLITE_PRAGMAS пусты (SQLITE_TUNING=False), сравнивать не с чем')
+        
+        results = []
+        for name, pragmas in (('по умолчанию', {}), ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS)):
+            self.stdout.write(f'\n[*] {name}: {options["readers"]} читателей, {options["writers"]} писателей, '
+                              f'{options["duration"]:.0f} с...')
+            with override_settings(
+                SQLITE_PRAGMAS=pragmas,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                PAGE_CACHE_ENABLED=False,
+                TELEGRAM_BOT_TOKEN='',
+                STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+            ):
+                with temporary_database():
+                    self.create_portfolio(options['items'])
+                    # Соединение основного потока не должно держать базу во время замера
+                    connection.close()
+                    results.append((name, self.run(options)))
+        
+        self.stdout.write('')
+        self.stdout.write(
+            f'{"Режим":<16}{"чтений/с":>10}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"записей/с":>11}{"p50, мс":>10}{"p95, мс":>10}{"ошибок":>8}'
+        )
+        for name, stats in results:
+            reads, writes = stats['read'], stats['write']
+            self.stdout.write(
+                f'{name:<16}{reads["rate"]:>10.1f}{reads["p50"]:>10.1f}{reads["p95"]:>10.1f}'
+                f'{writes["rate"]:>11.1f}{writes["p50"]:>10.1f}{writes["p95"]:>10.1f}'
+                f'{reads["errors"] + writes["errors"]:>8}'
+            )
+        self.stdout.write(self.style.SUCCESS('Готово'))
+    
+    def create_portfolio(self, count: int):
+        """Наполняет портфолио работами по нескольким услугам."""
+        services = [
+            Service.objects.create(name=f'Услуга {index}', description='', is_featured=True)
+            for index in range(6)
+        ]
+        PortfolioItem.objects.bulk_create([
+            PortfolioItem(
+                title=f'Работа {index}',
+                description='<p>Описание работы</p>',
+                image='portfolio/work.jpg',
+                service=services[index % len(services)],
+            )
+            for index in range(count)
+        ])
+    
+    def run(self, options) -> dict:
+        """Запускает потоки и собирает задержки."""
+        stop = threading.Event()
+        timings = {'read': [], 'write': []}
+        errors = {'read': [], 'write': []}
+        lock = threading.Lock()
+        portfolio_url = reverse('portfolio:list')
+        contact_url = reverse('contacts:contact_form')
+        
+        def worker(kind: str):
+            client = Client(raise_request_exception=False)
+            index = 0
+            try:
+                while not stop.is_set():
+                    index += 1
+                    start = time.perf_counter()
+                    try:
+                        if kind == 'read':
+                            response = client.get(portfolio_url)
+                        else:
+                            response = client.post(
+                                contact_url,
+                                {
+                                    'name': f'Клиент {threading.get_ident()} {index}',
+                                    'phone': '+7 (999) 123-45-67',
+                                    'message': 'Нужна вывеска',
+                                    'privacy_policy': 'on',
+                                },
+                                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+                            )
+                        ok = response.status_code == 200
+                        error = None if ok else f'HTTP {response.status_code}'
+                    except Exception as e:
+                        ok, error = False, str(e)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        if ok:
+                            timings[kind].append(elapsed)
+                        else:
+                            errors[kind].append(error)
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=worker, args=('read',)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write',)) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        
+        for kind in ('read', 'write'):
+            if errors[kind]:
+                self.stdout.write(self.style.WARNING(f'  Ошибки ({kind}): {len(errors[kind])}, например: {errors[kind][0]}'))
+        return {kind: self.summarize(timings[kind], len(errors[kind]), options['duration']) for kind in timings}
+    
+    def summarize(self, values: list, errors: int, duration: float) -> dict:
+        """Пропускная способность и перцентили задержки."""
+        if len(values) >= 2:
+            quantiles = statistics.quantiles(values, n=20)
+            p50, p95 = statistics.median(values), quantiles[18]
+        else:
+            p50 = p95 = values[0] if values else 0.0
+        return {'rate': len(values) / duration, 'p50': p50, 'p95': p95, 'errors': errors}
@@ -0,0 +1,163 @@
+"""
+Management command для сравнения первичных ключей UUID v4 и UUID v7.
+
+Для каждого генератора ключей наполняет отдельную временную базу
+сообщениями ContactMessage и работами PortfolioItem и замеряет
+вставку, размер базы, выборку по ключам и выборку работ услуги
+через ForeignKey.
+
+Использование:
+    python manage.py benchmark_uuid
+    python manage.py benchmark_uuid --rows 100000 --repeat 10
+"""
+
+import os
+import random
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.contacts.models import ContactMessage
+from apps.core.benchmark import measure, temporary_database
+from apps.core.utils.uuid7 import uuid7
+from apps.portfolio.models import PortfolioItem
+from apps.services.models import Service
+
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+BATCH_SIZE = 5000
+SERVICES_COUNT = 50
+
+
+class Command(BaseCommand):
+    """Бенчмарк вставки и чтения с ключами UUID v4 и v7."""
+    
+    help = 'Сравнивает вставку и выборки с первичными ключами UUID v4 и UUID v7'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000000,
+            help='Количество записей каждой модели'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов каждой выборки'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        results = []
+        for name, generator in GENERATORS.items():
+            random.seed(42)
+            self.stdout.write(f'\n[*] {name}: наполнение временной базы ({options["rows"]} записей на модель)...')
+            with temporary_database():
+                results.extend(self.run(name, generator, options['rows'], options['repeat']))
+        
+        self.stdout.write('')
+        self.stdout.write(
+            f'{"Модель":<16}{"ключ":<8}{"вставка, с":>12}{"строк/с":>10}'
+            f'{"по ключу, мс":>14}{"новые, мс":>12}{"по услуге, мс":>15}{"база, МБ":>10}'
+        )
+        for row in results:
+            self.stdout.write(
+                f'{row["model"]:<16}{row["key"]:<8}{row["insert"]:>12.1f}{row["rate"]:>10.0f}'
+                f'{row["lookup"]:>14.2f}{row["recent"]:>12.2f}{row["join"]:>15}{row["size"]:>10}'
+            )
+        self.stdout.write(self.style.SUCCESS('Готово'))
+    
+    def run(self, name: str, generator, rows: int, repeat: int) -> list:
+        """Наполнение базы и замеры для одного генератора ключей."""
+        services = [
+            Service(uuid=generator(), name=f'Услуга {index}', slug=f'benchmark-{index}', description='')
+            for index in range(SERVICES_COUNT)
+        ]
+        Service.objects.bulk_create(services)
+        
+        contacts_seconds, contact_keys = self.insert(
+            ContactMessage, rows,
+            lambda index: ContactMessage(
+                uuid=generator(),
+                name=f'Клиент {index}',
+                phone='+7 (999) 123-45-67',
+                message='Нужна вывеска для магазина',
+            )
+        )
+        portfolio_seconds, portfolio_keys = self.insert(
+            PortfolioItem, rows,
+            lambda index: PortfolioItem(
+                uuid=generator(),
+                title=f'Работа {index}',
+                description='',
+                image='portfolio/work.jpg',
+                service=random.choice(services),
+            )
+        )
+        size = self.database_size()
+        size = f'{size / 1024 / 1024:.1f}' if size is not None else '-'
+        
+        service = services[0]
+        results = []
+        for model, seconds, keys, join in (
+            (ContactMessage, contacts_seconds, contact_keys, None),
+            (PortfolioItem, portfolio_seconds, portfolio_keys, service),
+        ):
+            # Обращения чаще всего идут к недавним записям
+            recent_keys = keys[-max(len(keys) // 10, 1):]
+            sample = random.sample(recent_keys, min(1000, len(recent_keys)))
+            lookup_ms = measure(lambda: model.objects.in_bulk(sample), repeat)
+            recent_ms = measure(lambda: list(model.objects.order_by('-created_at')[:50]), repeat)
+            join_ms = '-'
+            if join is not None:
+                queryset = model.objects.filter(service=join).select_related('service').order_by(
+                    '-date_completed', '-created_at', 'uuid'
+                )
+                join_ms = f'{measure(lambda: list(queryset[:100]), repeat):.2f}'
+            results.append({
+                'model': model.__name__,
+                'key': name,
+                'insert': seconds,
+                'rate': rows / seconds if seconds else 0,
+                'lookup': lookup_ms,
+                'recent': recent_ms,
+                'join': join_ms,
+                'size': size,
+            })
+        return results
+    
+    def insert(self, model, rows: int, factory):
+        """
+        Вставка записей пачками.
+        
+        Returns:
+            (время в секундах, ключи в порядке вставки)
+        """
+        keys = []
+        batch = []
+        start = time.perf_counter()
+        for index in range(rows):
+            obj = factory(index)
+            batch.append(obj)
+            keys.append(obj.pk)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_create(batch)
+                batch = []
+                if len(keys) % (BATCH_SIZE * 40) == 0:
+                    self.stdout.write(f'  {model.__name__}: {len(keys)}')
+        if batch:
+            model.objects.bulk_create(batch)
+        return time.perf_counter() - start, keys
+    
+    def database_size(self):
+        """Размер файла SQLite базы в байтах (None для других баз)."""
+        if connection.vendor != 'sqlite':
+            return None
+        return os.path.getsize(connection.settings_dict['NAME'])
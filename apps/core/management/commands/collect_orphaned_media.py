@@ -0,0 +1,309 @@
+"""
+Management command: поиск и удаление неиспользуемых файлов в MEDIA_ROOT.
+
+Удаление объектов (админка, reload_catalog, clear_portfolio) не удаляет
+их файлы, а одинаковые файлы могут использоваться несколькими объектами,
+поэтому файлы удаляются только здесь, после проверки всех ссылок:
+    - значения всех полей FileField/ImageField;
+    - ссылки на MEDIA_URL в HTML полей RichTextField (загрузки CKEditor
+      и их миниатюры *_thumb);
+    - варианты изображений (cache/) для полей из IMAGE_FIELDS: имена
+      вычисляются так же, как при создании вариантов.
+
+MEDIA_ROOT обходится в несколько потоков, строки читаются из базы
+потоком (iterator), в памяти - только список найденных файлов.
+Недавно изменённые файлы (--min-age) не трогаются: файл загрузки
+записывается раньше, чем строка с ним сохраняется в базе.
+
+Вместе с файлами (--delete) удаляются записи о них: ключи sorl-thumbnail
+и задачи ImageVariantJob удалённых изображений. Имена файлов зависят
+от содержимого, поэтому повторная загрузка того же файла получит те же
+имя и ключ задачи, и без этого варианты не создались бы заново.
+
+Использование:
+    python manage.py collect_orphaned_media
+    python manage.py collect_orphaned_media --delete
+"""
+
+import os
+import re
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import unquote
+from ckeditor.fields import RichTextField
+from ckeditor_uploader.utils import get_thumb_filename
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import models
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from apps.core.images.registry import IMAGE_FIELDS
+from apps.core.images.variants import variant_names
+from apps.core.images.workers import ImageJob, get_worker_count, init_worker
+from apps.core.management.commands.image_report import format_bytes
+from apps.core.models import ImageVariantJob
+
+
+def scan_directory(path: str) -> Tuple[List[Tuple[str, int, float]], List[str]]:
+    """
+    Файлы и подкаталоги одного каталога (скрытые пропускаются).
+    
+    Returns:
+        ([(путь, размер, время изменения)], [подкаталоги])
+    """
+    files, directories = [], []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+    return files, directories
+
+
+def batch_variant_names(label: str, field_name: str, names: List[str], size_names: Tuple[str, ...]) -> List[str]:
+    """Имена вариантов для пачки изображений (выполняется в процессе пула)."""
+    return [
+        variant
+        for name in names
+        for size_name in size_names
+        for variant in variant_names(ImageJob(label, field_name, name, size_name).image(), size_name)
+    ]
+
+
+class Command(BaseCommand):
+    """Поиск и удаление неиспользуемых медиафайлов."""
+    
+    help = 'Находит (и с --delete удаляет) файлы в MEDIA_ROOT, на которые нет ссылок'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Удалить найденные файлы (иначе только отчёт)'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help='Не трогать файлы, изменённые менее N часов назад (по умолчанию 24)'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Потоков для обхода MEDIA_ROOT (по умолчанию 8)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Процессов для вычисления имён вариантов (по умолчанию IMAGE_WORKERS или число ядер)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Строк из базы в одной пачке (по умолчанию 1000)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        self.root = os.path.abspath(settings.MEDIA_ROOT)
+        if not os.path.isdir(self.root):
+            self.stdout.write(f'Каталог {self.root} не найден')
+            return
+        self.options = options
+        
+        started = time.perf_counter()
+        self.files, recent = self.scan(options['threads'], time.time() - options['min_age'] * 3600)
+        total_files = len(self.files) + recent
+        total_bytes = sum(self.files.values())
+        self.stdout.write(f'Файлов в {self.root}: {total_files} ({format_bytes(total_bytes)}), недавних: {recent}')
+        
+        self.mark_file_fields()
+        self.mark_rich_text()
+        workers = options['workers'] if options['workers'] is not None else get_worker_count()
+        self.mark_variants(workers)
+        
+        # Всё, что осталось в self.files, не используется
+        orphans = self.files
+        by_directory = defaultdict(lambda: [0, 0])
+        for name, size in orphans.items():
+            row = by_directory[name.split('/', 1)[0] if '/' in name else '.']
+            row[0] += 1
+            row[1] += size
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {name} ({format_bytes(size)})')
+        
+        if not orphans:
+            self.stdout.write(self.style.SUCCESS('Неиспользуемых файлов нет'))
+            return
+        
+        self.stdout.write(f'\n{"Каталог":<20}{"файлов":>10}{"размер":>14}')
+        for directory, (count, size) in sorted(by_directory.items()):
+            self.stdout.write(f'{directory:<20}{count:>10}{format_bytes(size):>14}')
+        orphan_bytes = sum(orphans.values())
+        self.stdout.write('-' * 44)
+        self.stdout.write(f'{"Итого":<20}{len(orphans):>10}{format_bytes(orphan_bytes):>14}')
+        
+        if options['delete']:
+            deleted = self.delete(orphans)
+            self.stdout.write(self.style.SUCCESS(
+                f'\nУдалено файлов: {deleted}, освобождено {format_bytes(orphan_bytes)} '
+                f'за {time.perf_counter() - started:.1f} с'
+            ))
+        else:
+            self.stdout.write('\nДля удаления запустите с --delete')
+    
+    def scan(self, threads: int, cutoff: float) -> Tuple[Dict[str, int], int]:
+        """
+        Обходит MEDIA_ROOT в нескольких потоках.
+        
+        Returns:
+            (имя относительно MEDIA_ROOT -> размер для файлов старше cutoff,
+            количество пропущенных недавних файлов)
+        """
+        files = {}
+        recent = 0
+        with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+            pending = {executor.submit(scan_directory, self.root)}
+            while pending:
+                future = pending.pop()
+                found, directories = future.result()
+                pending.update(executor.submit(scan_directory, directory) for directory in directories)
+                for path, size, modified in found:
+                    if modified > cutoff:
+                        recent += 1
+                        continue
+                    files[os.path.relpath(path, self.root).replace(os.sep, '/')] = size
+        return files, recent
+    
+    def mark_used(self, name: str) -> None:
+        """Отмечает файл используемым (убирает из кандидатов на удаление)."""
+        self.files.pop(name, None)
+    
+    def iter_values(self, model, field_name: str, queryset=None):
+        """Непустые значения поля потоком, без загрузки всех строк."""
+        queryset = queryset if queryset is not None else model._base_manager.all()
+        return (
+            queryset
+            .exclude(**{field_name: ''})
+            .exclude(**{f'{field_name}__isnull': True})
+            .values_list(field_name, flat=True)
+            .iterator(chunk_size=self.options['batch_size'])
+        )
+    
+    def mark_file_fields(self):
+        """Файлы полей FileField/ImageField всех моделей."""
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField):
+                    for name in self.iter_values(model, field.name):
+                        self.mark_used(name)
+    
+    def mark_rich_text(self):
+        """Файлы, на которые ссылается HTML полей RichTextField (загрузки CKEditor)."""
+        pattern = re.compile(re.escape(settings.MEDIA_URL) + r'([^"\'\s<>?#)]+)')
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, RichTextField):
+                    continue
+                queryset = model._base_manager.filter(**{f'{field.name}__contains': settings.MEDIA_URL})
+                for html in self.iter_values(model, field.name, queryset):
+                    for match in pattern.finditer(html):
+                        name = unquote(match.group(1))
+                        self.mark_used(name)
+                        # Миниатюра для окна выбора файлов CKEditor
+                        self.mark_used(get_thumb_filename(name))
+    
+    def mark_variants(self, workers: int):
+        """Варианты изображений (cache/) для полей из IMAGE_FIELDS."""
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker) if workers > 1 else None
+        try:
+            for label, fields in IMAGE_FIELDS.items():
+                model = apps.get_model(label)
+                for field_name, size_names in fields.items():
+                    batches = self.iter_batches(self.iter_values(model, field_name))
+                    if executor is None:
+                        for batch in batches:
+                            self.mark_all(batch_variant_names(label, field_name, batch, size_names))
+                        continue
+                    # Ограниченное окно задач: результаты не копятся в памяти
+                    pending = deque()
+                    for batch in batches:
+                        pending.append(executor.submit(batch_variant_names, label, field_name, batch, size_names))
+                        if len(pending) >= workers * 2:
+                            self.mark_all(pending.popleft().result())
+                    while pending:
+                        self.mark_all(pending.popleft().result())
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def mark_all(self, names: List[str]) -> None:
+        for name in names:
+            self.mark_used(name)
+    
+    def iter_batches(self, values):
+        batch = []
+        for value in values:
+            batch.append(value)
+            if len(batch) >= self.options['batch_size']:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def delete(self, orphans: Dict[str, int]) -> int:
+        """Удаляет файлы, записи о них и опустевшие каталоги."""
+        deleted = []
+        directories = set()
+        for name in orphans:
+            path = os.path.join(self.root, name)
+            try:
+                os.remove(path)
+                deleted.append(name)
+                directories.add(os.path.dirname(path))
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f'  {name}: {e}'))
+        
+        for batch in self.iter_batches(deleted):
+            self.forget(batch)
+        
+        # Опустевшие каталоги - от самых глубоких к корню
+        for directory in sorted(directories, key=len, reverse=True):
+            while directory.startswith(self.root + os.sep):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+        return len(deleted)
+    
+    def forget(self, names: List[str]) -> None:
+        """
+        Удаляет записи об удалённых файлах.
+        
+        sorl-thumbnail не проверяет файл миниатюры, если ключ есть в его
+        хранилище, а generate_image_variants не создаёт наборы с готовой
+        задачей - иначе страницы ссылались бы на удалённые варианты.
+        """
+        for name in names:
+            if name.startswith(thumbnail_settings.THUMBNAIL_PREFIX):
+                default.kvstore.delete(ImageFile(name), delete_thumbnails=False)
+        
+        jobs = list(ImageVariantJob.objects.filter(name__in=names))
+        for job in jobs:
+            default.kvstore.delete(ImageFile(ImageJob.from_row(job).image()), delete_thumbnails=False)
+            cache.delete(job.key)
+        ImageVariantJob.objects.filter(key__in=[job.key for job in jobs]).delete()
@@ -0,0 +1,148 @@
+"""
+Management command: переименование загруженных файлов в имена по содержимому.
+
+Для всех полей FileField/ImageField с хранилищем MediaStorage находит
+значения в каталогах MEDIA_CONTENT_ADDRESSED_PATHS со старыми именами
+(portfolio/2024/05/photo.jpg), копирует файл под имя из SHA-256
+содержимого (portfolio/3f/3f9c...e1.jpg) и обновляет ссылки в базе
+пачками по первичному ключу. Одинаковые файлы сводятся к одному.
+Старые файлы остаются на диске, их можно удалить после проверки сайта.
+Повторный запуск пропускает уже переименованные значения.
+
+Использование:
+    python manage.py content_address_media
+    python manage.py content_address_media --apply
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from apps.core.images.storage import MediaStorage, content_name, is_content_name, uses_content_names
+from apps.core.management.commands.image_report import format_bytes
+from apps.core.page_cache import bump_generation
+from apps.core.utils.hashing import content_hash
+
+
+class Command(BaseCommand):
+    """Переименование медиафайлов в имена по содержимому."""
+    
+    help = 'Переносит загруженные файлы на имена по хешу содержимого и обновляет ссылки в базе'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Скопировать файлы и обновить базу (иначе только отчёт)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Объектов в одной пачке и транзакции (по умолчанию 200)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        if not settings.MEDIA_CONTENT_ADDRESSED:
+            raise CommandError('Имена по содержимому выключены (MEDIA_CONTENT_ADDRESSED)')
+        
+        self.apply = options['apply']
+        # Старое имя -> новое: один файл может быть у нескольких объектов
+        self.renamed = {}
+        self.stored = set()
+        self.stats = {'objects': 0, 'files': 0, 'duplicates': 0, 'duplicate_bytes': 0, 'missing': 0}
+        
+        for model, field in self.file_fields():
+            self.migrate_field(model, field, options['batch_size'])
+        
+        self.stdout.write('\n' + '=' * 50)
+        self.stdout.write(f'Объектов с новыми именами: {self.stats["objects"]}')
+        self.stdout.write(f'Файлов: {self.stats["files"]}')
+        if self.stats['duplicates']:
+            self.stdout.write(
+                f'Одинаковых файлов сведено к одному: {self.stats["duplicates"]} '
+                f'({format_bytes(self.stats["duplicate_bytes"])})'
+            )
+        if self.stats['missing']:
+            self.stdout.write(self.style.WARNING(f'Файлов нет на диске (пропущены): {self.stats["missing"]}'))
+        if self.apply:
+            self.stdout.write(self.style.SUCCESS(
+                'Готово. Для новых имён создайте варианты: python manage.py generate_image_variants'
+            ))
+        elif self.stats['objects']:
+            self.stdout.write('Для переименования запустите с --apply')
+    
+    def file_fields(self):
+        """Поля с файлами в MediaStorage: пары (модель, поле)."""
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField) and isinstance(field.storage, MediaStorage):
+                    yield model, field
+    
+    def migrate_field(self, model, field, batch_size: int):
+        """Переименовывает файлы одного поля пачками."""
+        queryset = (
+            model._base_manager
+            .exclude(**{field.name: ''})
+            .exclude(**{f'{field.name}__isnull': True})
+            .order_by('pk')
+            .values_list('pk', field.name)
+        )
+        changed = 0
+        last_pk = None
+        while True:
+            page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(page[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            
+            updates = []
+            for pk, name in batch:
+                if is_content_name(name) or not uses_content_names(name):
+                    continue
+                new_name = self.rename(field.storage, name)
+                if new_name:
+                    updates.append(model(pk=pk, **{field.attname: new_name}))
+            
+            if updates and self.apply:
+                with transaction.atomic():
+                    model._base_manager.bulk_update(updates, [field.attname])
+            changed += len(updates)
+        
+        if changed:
+            self.stdout.write(f'{model._meta.label}.{field.name}: {changed}')
+            self.stats['objects'] += changed
+            if self.apply:
+                bump_generation(model._meta.label_lower)
+    
+    def rename(self, storage: MediaStorage, name: str):
+        """
+        Новое имя файла (с --apply файл копируется под ним).
+        
+        Returns:
+            Новое имя или None, если файла нет
+        """
+        if name in self.renamed:
+            return self.renamed[name]
+        try:
+            with storage.open(name, 'rb') as file_object:
+                new_name = content_name(name, content_hash(file_object))
+                exists = new_name in self.stored or storage.exists(new_name)
+                if self.apply and not exists:
+                    storage.save_by_content(name, file_object)
+        except OSError:
+            self.stats['missing'] += 1
+            self.renamed[name] = None
+            return None
+        
+        if exists:
+            self.stats['duplicates'] += 1
+            self.stats['duplicate_bytes'] += storage.size(name)
+        else:
+            self.stats['files'] += 1
+        self.stored.add(new_name)
+        self.renamed[name] = new_name
+        return new_name
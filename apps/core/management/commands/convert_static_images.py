@@ -0,0 +1,94 @@
+"""
+Management command: AVIF/WebP для картинок из static/img.
+
+Для каждой PNG/JPEG картинки в static/img (во всех STATICFILES_DIRS)
+рядом создаются файлы в современных форматах из settings.IMAGE_FORMATS
+(About.jpg -> About.avif, About.webp), длинная сторона уменьшается
+до MAX_EDGE. Тег {% static_picture %} выводит их в <picture>, исходная
+картинка остаётся для браузеров без AVIF/WebP и для og:image.
+Готовые файлы, которые новее исходной картинки, не пересоздаются.
+
+Использование:
+    python manage.py convert_static_images
+    python manage.py convert_static_images --force
+"""
+
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image
+from apps.core.images import get_modern_formats
+from apps.core.images.variants import static_variant_name
+from apps.core.management.commands.image_report import format_bytes
+
+
+# Картинки из static выводятся не шире контейнера страницы
+MAX_EDGE = 1920
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+class Command(BaseCommand):
+    """Создание AVIF/WebP для картинок из static/img."""
+    
+    help = 'Создаёт AVIF/WebP рядом с PNG/JPEG картинками в static/img'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать все файлы, даже если они новее исходных'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        formats = get_modern_formats()
+        if not formats:
+            self.stdout.write(self.style.WARNING('Pillow не умеет ни один формат из IMAGE_FORMATS'))
+            return
+        
+        self.stdout.write(f'{"static/img":<34}{"оригинал":>14}' + ''.join(f'{name.lower():>12}' for name in formats))
+        totals = {'original': 0, **{name: 0 for name in formats}}
+        for directory in settings.STATICFILES_DIRS:
+            for path in sorted(Path(directory, 'img').glob('*')):
+                if path.suffix.lower() not in SOURCE_EXTENSIONS:
+                    continue
+                sizes = self.convert(path, formats, options['force'])
+                for key, value in sizes.items():
+                    totals[key] += value
+                self.stdout.write(
+                    f'{path.name[:33]:<34}{format_bytes(sizes["original"]):>14}'
+                    + ''.join(f'{format_bytes(sizes[name]):>12}' for name in formats)
+                )
+        self.stdout.write(
+            f'{"Итого":<34}{format_bytes(totals["original"]):>14}'
+            + ''.join(f'{format_bytes(totals[name]):>12}' for name in formats)
+        )
+    
+    def convert(self, path: Path, formats: dict, force: bool) -> dict:
+        """
+        Создаёт файлы в современных форматах для одной картинки.
+        
+        Returns:
+            Размеры в байтах: original и по форматам
+        """
+        sizes = {'original': path.stat().st_size}
+        image = None
+        try:
+            for name, quality in formats.items():
+                target = Path(static_variant_name(str(path), name))
+                if not force and target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+                    sizes[name] = target.stat().st_size
+                    continue
+                if image is None:
+                    image = Image.open(path)
+                    image.load()
+                    if max(image.size) > MAX_EDGE:
+                        image.thumbnail((MAX_EDGE, MAX_EDGE), Image.Resampling.LANCZOS)
+                image.save(target, name, quality=quality)
+                sizes[name] = target.stat().st_size
+        finally:
+            if image is not None:
+                image.close()
+        return sizes
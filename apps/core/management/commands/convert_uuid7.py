@@ -0,0 +1,151 @@
+"""
+Management command для перевода первичных ключей на UUID v7.
+
+Существующие записи получают ключ со временем из created_at,
+ссылки на них (ForeignKey, таблицы поиска, журнал админки)
+обновляются в той же транзакции. Записи с ключом v7 пропускаются,
+поэтому команду можно прервать и запустить повторно.
+
+Использование:
+    python manage.py convert_uuid7 --dry-run
+    python manage.py convert_uuid7
+    python manage.py convert_uuid7 portfolio.PortfolioItem --batch-size 500
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from loguru import logger
+from apps.core.models import BaseModel
+from apps.core.page_cache import bump_generation
+from apps.core.search.backends import search_rowid
+from apps.core.utils.uuid7 import uuid7_from_datetime
+
+
+class Command(BaseCommand):
+    """Перевод ключей существующих записей на UUID v7."""
+    
+    help = 'Переводит первичные ключи существующих записей на UUID v7 (с обновлением ссылок)'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            'models',
+            nargs='*',
+            help='Модели в формате app_label.Model (по умолчанию все модели на BaseModel)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одной транзакции'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать записи для перевода'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        if options['models']:
+            try:
+                target_models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(f'Неизвестная модель: {e}')
+        else:
+            target_models = [
+                model for model in apps.get_models()
+                if issubclass(model, BaseModel) and not model._meta.proxy
+            ]
+        
+        tables = set(connection.introspection.table_names())
+        for model in target_models:
+            references = self.get_references(model)
+            search_table = f'{model._meta.db_table}_search'
+            if search_table not in tables:
+                search_table = None
+            
+            label = model._meta.label
+            if options['dry_run']:
+                pending = sum(1 for pk in model._base_manager.values_list('pk', flat=True).iterator() if pk.version != 7)
+                names = ', '.join(f'{ref._meta.label}.{field.name}' for ref, field in references) or 'нет'
+                self.stdout.write(f'{label}: к переводу {pending}, ссылки: {names}')
+                continue
+            
+            converted = self.convert_model(model, references, search_table, options['batch_size'])
+            if converted:
+                bump_generation(model._meta.label_lower)
+            self.stdout.write(self.style.SUCCESS(f'{label}: переведено {converted}'))
+            logger.info(f'Ключи {label} переведены на UUID v7: {converted}')
+    
+    def get_references(self, model):
+        """ForeignKey всех моделей (включая промежуточные M2M), ссылающиеся на ключ модели."""
+        references = []
+        for related_model in apps.get_models(include_auto_created=True):
+            for field in related_model._meta.concrete_fields:
+                if isinstance(field, models.ForeignKey) and field.remote_field.model is model \
+                        and field.target_field.primary_key:
+                    references.append((related_model, field))
+        return references
+    
+    def convert_model(self, model, references, search_table, batch_size: int) -> int:
+        """
+        Переводит записи модели пачками в порядке создания.
+        
+        Returns:
+            Количество переведённых записей
+        """
+        converted = 0
+        last = None
+        while True:
+            queryset = model._base_manager.order_by('created_at', 'pk')
+            if last is not None:
+                queryset = queryset.filter(
+                    models.Q(created_at__gt=last[0]) | models.Q(created_at=last[0], pk__gt=last[1])
+                )
+            rows = list(queryset.values_list('pk', 'created_at')[:batch_size])
+            if not rows:
+                return converted
+            last = (rows[-1][1], rows[-1][0])
+            
+            pairs = [(pk, uuid7_from_datetime(created_at)) for pk, created_at in rows if pk.version != 7]
+            if pairs:
+                with transaction.atomic():
+                    for old, new in pairs:
+                        self.replace_key(model, references, search_table, old, new)
+                converted += len(pairs)
+                self.stdout.write(f'  {model._meta.label}: {converted}')
+    
+    def replace_key(self, model, references, search_table, old, new) -> None:
+        """Заменяет ключ одной записи и все ссылки на неё."""
+        # Ограничения ForeignKey в Django отложенные (DEFERRABLE INITIALLY DEFERRED),
+        # поэтому порядок обновлений внутри транзакции не важен
+        for related_model, field in references:
+            related_model._base_manager.filter(**{field.attname: old}).update(**{field.attname: new})
+        
+        if search_table:
+            pk_field = model._meta.pk
+            table = connection.ops.quote_name(search_table)
+            with connection.cursor() as cursor:
+                if connection.vendor == 'sqlite':
+                    # Строка FTS5 находится по rowid из ключа (search_rowid), а не по object_id
+                    cursor.execute(
+                        f'UPDATE {table} SET rowid = %s, object_id = %s WHERE rowid = %s',
+                        [search_rowid(new), pk_field.get_db_prep_value(new, connection), search_rowid(old)]
+                    )
+                else:
+                    cursor.execute(
+                        f'UPDATE {table} SET object_id = %s WHERE object_id = %s',
+                        [pk_field.get_db_prep_value(new, connection), pk_field.get_db_prep_value(old, connection)]
+                    )
+        
+        if apps.is_installed('django.contrib.admin'):
+            from django.contrib.admin.models import LogEntry
+            from django.contrib.contenttypes.models import ContentType
+            LogEntry.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id=str(old)
+            ).update(object_id=str(new))
+        
+        model._base_manager.filter(pk=old).update(**{model._meta.pk.attname: new})
@@ -0,0 +1,155 @@
+"""
+Management command: создание вариантов изображений в пуле процессов.
+
+Создаёт недостающие варианты для всех изображений из IMAGE_FIELDS,
+по процессу на ядро. Готовые наборы записываются в базу
+(ImageVariantJob) и пропускаются, поэтому прерванный запуск можно
+просто повторить. После изменения пресета в IMAGE_SIZES повторный
+запуск пересоздаёт варианты всей библиотеки.
+
+С --watch работает постоянно (systemd, image-variants.service) и создаёт
+варианты, поставленные в очередь при сохранении объектов в админке.
+
+Использование:
+    python manage.py generate_image_variants
+    python manage.py generate_image_variants --size grid --workers 4
+    python manage.py generate_image_variants --model portfolio.PortfolioItem --dry-run
+    python manage.py generate_image_variants --watch
+"""
+
+import signal
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from loguru import logger
+from apps.core.images.registry import IMAGE_FIELDS, collect_jobs
+from apps.core.images.workers import get_worker_count, missing_jobs, process_queue, run_jobs
+
+
+class Command(BaseCommand):
+    """Создание недостающих вариантов изображений."""
+    
+    help = 'Создаёт недостающие варианты изображений (AVIF/WebP/JPEG) в пуле процессов'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов (по умолчанию IMAGE_WORKERS или число ядер)'
+        )
+        parser.add_argument(
+            '--size',
+            action='append',
+            dest='sizes',
+            help='Только этот именованный размер (можно указать несколько раз)'
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='labels',
+            help='Только эта модель, например portfolio.PortfolioItem'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, сколько вариантов нужно создать'
+        )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help='Постоянно выполнять задачи из очереди'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Пауза между проверками очереди в секундах (по умолчанию 2)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        for size_name in options['sizes'] or ():
+            if size_name not in settings.IMAGE_SIZES:
+                raise CommandError(f'Неизвестный размер: {size_name}')
+        for label in options['labels'] or ():
+            if label not in IMAGE_FIELDS:
+                raise CommandError(f'Модель {label} не указана в IMAGE_FIELDS')
+        workers = options['workers'] if options['workers'] is not None else get_worker_count()
+        if options['watch']:
+            self.watch(workers, options['interval'])
+            return
+        
+        self.stdout.write('Поиск изображений без вариантов...')
+        jobs = list(missing_jobs(collect_jobs(options['labels'], options['sizes'])))
+        total = len(jobs)
+        if not total:
+            self.stdout.write(self.style.SUCCESS('Все варианты уже созданы'))
+            return
+        
+        self.stdout.write(f'Нужно создать: {total} (изображение x размер), процессов: {max(workers, 1)}')
+        if options['dry_run']:
+            return
+        
+        started = time.monotonic()
+        done = errors = 0
+        step = max(total // 20, 1)
+        try:
+            for job, error in run_jobs(jobs, workers):
+                done += 1
+                if error is not None:
+                    errors += 1
+                    self.stdout.write(self.style.ERROR(f'  {job.name} ({job.size_name}): {error}'))
+                if done % step == 0 or done == total:
+                    self.write_progress(done, total, time.monotonic() - started)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(
+                f'\nПрервано: обработано {done} из {total}. Повторный запуск продолжит с этого места.'
+            ))
+            return
+        
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\nГотово: {done - errors} за {elapsed:.1f} с'
+        ))
+        if errors:
+            self.stdout.write(self.style.WARNING(f'Ошибок: {errors} (будут повторены при следующем запуске)'))
+    
+    def watch(self, workers: int, interval: float):
+        """Выполнение очереди до SIGTERM или Ctrl+C."""
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        logger.info('Создание вариантов изображений из очереди запущено')
+        try:
+            while self.running:
+                # Долгоживущий процесс: соединение с базой не должно устаревать
+                close_old_connections()
+                done = 0
+                for job, error in process_queue(workers):
+                    done += 1
+                    if error is not None:
+                        logger.error(f'Ошибка создания вариантов {job.name} ({job.size_name}): {error}')
+                    if not self.running:
+                        break
+                if done:
+                    logger.info(f'Создано наборов вариантов: {done}')
+                else:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        logger.info('Создание вариантов изображений из очереди остановлено')
+    
+    def stop(self, signum, frame):
+        """Завершение после текущей задачи (SIGTERM от systemd)."""
+        self.running = False
+    
+    def write_progress(self, done: int, total: int, elapsed: float):
+        """Строка прогресса: доля, скорость и оставшееся время."""
+        rate = done / elapsed if elapsed else 0
+        left = (total - done) / rate if rate else 0
+        self.stdout.write(
+            f'  [{done}/{total}] {done / total * 100:5.1f}%  '
+            f'{rate:.1f} в секунду, осталось ~{left:.0f} с'
+        )
@@ -0,0 +1,133 @@
+"""
+Management command: отчёт об экономии трафика на вариантах изображений.
+
+Для каждого изображения из IMAGE_FIELDS сравнивает размер оригинала
+с самым крупным вариантом каждого именованного размера, в котором
+оно выводится: в исходном формате, WebP и AVIF. Недостающие варианты
+создаются (если не указан --no-generate).
+
+Использование:
+    python manage.py image_report
+    python manage.py image_report --no-generate --static
+"""
+
+from collections import defaultdict
+from io import BytesIO
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image
+from apps.core.images import FALLBACK, get_all_variants, get_modern_formats
+from apps.core.images.registry import IMAGE_FIELDS
+
+
+def format_bytes(value: int) -> str:
+    for unit in ('Б', 'КБ', 'МБ'):
+        if abs(value) < 1024:
+            return f'{value:.0f} {unit}' if unit == 'Б' else f'{value:.1f} {unit}'
+        value /= 1024
+    return f'{value:.1f} ГБ'
+
+
+class Command(BaseCommand):
+    """Отчёт о размере оригиналов и вариантов изображений."""
+    
+    help = 'Показывает, сколько байт экономят варианты изображений по сравнению с оригиналами'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--no-generate',
+            action='store_true',
+            help='Не создавать недостающие варианты (учитывать только готовые)'
+        )
+        parser.add_argument(
+            '--static',
+            action='store_true',
+            help='Дополнительно оценить WebP/AVIF для PNG/JPEG в static/img'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        formats = [FALLBACK] + list(get_modern_formats())
+        totals = defaultdict(int)
+        
+        header = f'{"Поле / размер":<34}{"файлов":>8}{"оригиналы":>14}' + ''.join(
+            f'{name.lower() if name != FALLBACK else "jpeg/png":>12}' for name in formats
+        )
+        self.stdout.write(header)
+        
+        for label, fields in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field_name, size_names in fields.items():
+                queryset = model._base_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                for size_name in size_names:
+                    row = self.measure(queryset, field_name, size_name, formats, not options['no_generate'])
+                    for key, value in row.items():
+                        totals[key] += value
+                    self.write_row(f'{model.__name__}.{field_name} / {size_name}', row, formats)
+        
+        self.stdout.write('-' * len(header))
+        self.write_row('Итого', totals, formats)
+        
+        if totals['original']:
+            best = formats[1] if len(formats) > 1 else FALLBACK
+            saved = totals['original'] - totals[best]
+            self.stdout.write(self.style.SUCCESS(
+                f'\nЭкономия ({best.lower() if best != FALLBACK else "jpeg/png"} против оригиналов): '
+                f'{format_bytes(saved)} ({saved / totals["original"] * 100:.0f}%)'
+            ))
+        
+        if options['static']:
+            self.report_static(formats[1:])
+    
+    def measure(self, queryset, field_name: str, size_name: str, formats, generate: bool) -> dict:
+        """Суммарные размеры оригиналов и самых крупных вариантов одного размера."""
+        row = defaultdict(int)
+        for instance in queryset.only('pk', field_name).iterator(chunk_size=500):
+            image = getattr(instance, field_name)
+            try:
+                original = image.storage.size(image.name)
+            except OSError:
+                continue
+            variants = get_all_variants(image, size_name, generate=generate)
+            if not variants or variants[FALLBACK][-1].bytes is None:
+                continue
+            row['files'] += 1
+            row['original'] += original
+            for name in formats:
+                # Нет варианта в формате - браузер получит исходный формат
+                row[name] += (variants.get(name) or variants[FALLBACK])[-1].bytes
+        return row
+    
+    def write_row(self, title: str, row: dict, formats):
+        self.stdout.write(
+            f'{title:<34}{row["files"]:>8}{format_bytes(row["original"]):>14}'
+            + ''.join(f'{format_bytes(row[name]):>12}' for name in formats)
+        )
+    
+    def report_static(self, formats):
+        """Оценка размера картинок static/img в современных форматах (без записи файлов)."""
+        self.stdout.write(f'\n{"static/img":<34}{"оригинал":>14}' + ''.join(f'{name.lower():>12}' for name in formats))
+        totals = defaultdict(int)
+        for directory in settings.STATICFILES_DIRS:
+            for path in sorted(Path(directory, 'img').glob('*')):
+                if path.suffix.lower() not in ('.png', '.jpg', '.jpeg'):
+                    continue
+                sizes = {'original': path.stat().st_size}
+                with Image.open(path) as image:
+                    for name in formats:
+                        buffer = BytesIO()
+                        image.save(buffer, name, quality=settings.IMAGE_FORMATS[name])
+                        sizes[name] = buffer.tell()
+                for key, value in sizes.items():
+                    totals[key] += value
+                self.stdout.write(
+                    f'{path.name[:33]:<34}{format_bytes(sizes["original"]):>14}'
+                    + ''.join(f'{format_bytes(sizes[name]):>12}' for name in formats)
+                )
+        self.stdout.write(
+            f'{"Итого":<34}{format_bytes(totals["original"]):>14}'
+            + ''.join(f'{format_bytes(totals[name]):>12}' for name in formats)
+        )
@@ -0,0 +1,144 @@
+"""
+Management command: отчёт об экономии от нормализации изображений в media/.
+
+Проходит по каталогам IMAGE_UPLOAD_PATHS в MEDIA_ROOT, нормализует
+каждое изображение в памяти (как при загрузке) и показывает, сколько
+места на диске и трафика это сэкономит. С --apply файлы заменяются
+на месте (имена не меняются, ссылки в базе остаются верными),
+а исходные копируются в IMAGE_ORIGINALS_ROOT, если он задан.
+
+Использование:
+    python manage.py normalize_media
+    python manage.py normalize_media --apply --workers 4
+"""
+
+import os
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.core.images.normalize import normalize_image
+from apps.core.images.storage import is_content_name
+from apps.core.images.workers import get_worker_count, init_worker
+from apps.core.management.commands.image_report import format_bytes
+
+
+# Каталоги, файлы которых отдаются как есть, без вариантов (вставки CKEditor):
+# экономия на них - это и экономия трафика на каждый просмотр
+DIRECT_PATHS = ('uploads/',)
+
+
+def process_file(path: str, apply: bool) -> Tuple[str, int, int, Optional[str]]:
+    """
+    Нормализует один файл.
+    
+    Returns:
+        (путь, байт до, байт после, ошибка или None)
+    """
+    root = Path(settings.MEDIA_ROOT)
+    before = os.path.getsize(path)
+    try:
+        with open(path, 'rb') as file_object:
+            normalized = normalize_image(file_object)
+        # Файл с именем по содержимому не меняется на месте (URL кешируется навсегда)
+        if normalized is None or is_content_name(path):
+            return path, before, before, None
+        if apply:
+            originals = getattr(settings, 'IMAGE_ORIGINALS_ROOT', None)
+            if originals:
+                target = Path(originals) / Path(path).relative_to(root)
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(path, target)
+            temporary = f'{path}.normalize'
+            with open(temporary, 'wb') as file_object:
+                file_object.write(normalized.content)
+            os.replace(temporary, path)
+        return path, before, len(normalized.content), None
+    except Exception as e:
+        return path, before, before, str(e)
+
+
+class Command(BaseCommand):
+    """Нормализация уже загруженных изображений."""
+    
+    help = 'Показывает (и с --apply применяет) экономию от нормализации изображений в media/'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Заменить файлы нормализованными (иначе только отчёт)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов (по умолчанию IMAGE_WORKERS или число ядер)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        root = Path(settings.MEDIA_ROOT)
+        paths = []
+        for prefix in settings.IMAGE_UPLOAD_PATHS:
+            directory = root / prefix
+            if directory.is_dir():
+                paths.extend(str(path) for path in sorted(directory.rglob('*')) if path.is_file())
+        if not paths:
+            self.stdout.write(f'В {root} нет загруженных изображений')
+            return
+        
+        workers = options['workers'] if options['workers'] is not None else get_worker_count()
+        apply = options['apply']
+        totals = defaultdict(lambda: [0, 0, 0, 0])  # файлов, до, после, изменено
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                results = list(executor.map(process_file, paths, [apply] * len(paths), chunksize=8))
+        else:
+            results = [process_file(path, apply) for path in paths]
+        
+        for path, before, after, error in results:
+            relative = Path(path).relative_to(root).as_posix()
+            if error:
+                self.stdout.write(self.style.ERROR(f'  {relative}: {error}'))
+            prefix = next(prefix for prefix in settings.IMAGE_UPLOAD_PATHS if relative.startswith(prefix))
+            row = totals[prefix]
+            row[0] += 1
+            row[1] += before
+            row[2] += after
+            row[3] += int(after != before)
+        
+        self.stdout.write(f'{"Каталог":<16}{"файлов":>8}{"изменится":>11}{"сейчас":>13}{"после":>13}{"экономия":>13}')
+        total = [0, 0, 0, 0]
+        for prefix, row in totals.items():
+            self.write_row(prefix, row)
+            total = [a + b for a, b in zip(total, row)]
+        self.stdout.write('-' * 74)
+        self.write_row('Итого', total)
+        
+        saved = total[1] - total[2]
+        direct = sum(totals[prefix][1] - totals[prefix][2] for prefix in DIRECT_PATHS if prefix in totals)
+        self.stdout.write(self.style.SUCCESS(
+            f'\nДиск: {format_bytes(saved)} ({saved / total[1] * 100 if total[1] else 0:.0f}%)'
+        ))
+        self.stdout.write(
+            f'Трафик: {format_bytes(direct)} на каждый показ всех файлов {", ".join(DIRECT_PATHS)} '
+            f'(отдаются без вариантов); остальные каталоги отдаются через варианты изображений'
+        )
+        if apply:
+            self.stdout.write(self.style.SUCCESS(f'Заменено файлов: {total[3]}'))
+        elif total[3]:
+            self.stdout.write('Для замены файлов запустите с --apply')
+    
+    def write_row(self, title: str, row):
+        files, before, after, changed = row
+        self.stdout.write(
+            f'{title:<16}{files:>8}{changed:>11}{format_bytes(before):>13}'
+            f'{format_bytes(after):>13}{format_bytes(before - after):>13}'
+        )
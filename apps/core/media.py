@@ -0,0 +1,211 @@
+"""
+Раздача медиафайлов в production.
+
+Django проверяет путь (без выхода за MEDIA_ROOT, без скрытых файлов,
+файл существует), а передачу файла выполняет один из режимов
+MEDIA_SERVE_MODE:
+    - 'accel' - nginx по заголовку X-Accel-Redirect из internal-location
+      MEDIA_ACCEL_PREFIX (воркер gunicorn сразу освобождается);
+    - 'sendfile' - Apache (mod_xsendfile) или lighttpd по заголовку
+      X-Sendfile с абсолютным путём к файлу;
+    - 'python' - сам Django: Range (206/416), ETag и Last-Modified
+      (304 на условные запросы) и долгий Cache-Control.
+
+Файлы с именем по содержимому (см. apps.core.images.storage) и варианты
+изображений не меняются никогда, для них Cache-Control - immutable на год.
+
+Пример для nginx (MEDIA_SERVE_MODE=accel):
+    location /protected-media/ {
+        internal;
+        alias /path/to/project/media/;
+    }
+"""
+
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from apps.core.images.storage import is_content_name
+
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve_media_path(path: str) -> str:
+    """
+    Абсолютный путь к файлу в MEDIA_ROOT.
+    
+    Raises:
+        Http404: Путь выходит за MEDIA_ROOT, указывает на скрытый файл
+            или каталог, или файла нет
+    """
+    parts = path.split('/')
+    if any(not part or part.startswith('.') for part in parts):
+        raise Http404('Файл не найден')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, *parts)
+    except Exception:
+        raise Http404('Файл не найден')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден')
+    return full_path
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """ETag по времени изменения и размеру (без чтения файла)."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Диапазон байт из заголовка Range.
+    
+    Поддерживается один диапазон: bytes=a-b, bytes=a- и bytes=-n.
+    
+    Returns:
+        (первый байт, последний байт) включительно; None, если заголовок
+        не разобран, диапазон перевёрнут (bytes=8-3) или их несколько -
+        такой Range игнорируется и отдаётся весь файл (RFC 9110, 14.2)
+    
+    Raises:
+        ValueError: Диапазон начинается за концом файла (ответ 416)
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Последние n байт
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+def range_matches(request: HttpRequest, etag: str, last_modified: int) -> bool:
+    """Проверка If-Range: диапазон действует, только если файл не изменился."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def iter_range(file_object, start: int, length: int):
+    """Читает length байт файла с позиции start и закрывает файл."""
+    try:
+        file_object.seek(start)
+        while length > 0:
+            chunk = file_object.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file_object.close()
+
+
+def cache_control(path: str) -> str:
+    """Cache-Control для файла: неизменяемые файлы кешируются навсегда."""
+    if is_content_name(path) or path.startswith(thumbnail_settings.THUMBNAIL_PREFIX):
+        return f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def set_cache_headers(response: HttpResponse, path: str, etag: str, last_modified: int) -> None:
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control(path)
+
+
+def file_response(request: HttpRequest, full_path: str, path: str) -> HttpResponse:
+    """Ответ с файлом из Python: условные запросы и диапазоны байт."""
+    stat = os.stat(full_path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    
+    # 304 Not Modified / 412 Precondition Failed
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_cache_headers(response, path, etag, last_modified)
+        return response
+    
+    byte_range = None
+    header = request.META.get('HTTP_RANGE')
+    if header and range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+    
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(stat.st_size)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            iter_range(open(full_path, 'rb'), start, length),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    set_cache_headers(response, path, etag, last_modified)
+    return response
+
+
+def offload_response(full_path: str, path: str, mode: str) -> HttpResponse:
+    """
+    Пустой ответ, по которому файл отдаёт веб-сервер.
+    
+    Range, ETag и Last-Modified веб-сервер обрабатывает сам,
+    Django задаёт только тип и Cache-Control.
+    """
+    content_type, _ = mimetypes.guess_type(full_path)
+    response = HttpResponse(content_type=content_type or 'application/octet-stream')
+    if mode == 'accel':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(path)
+    else:
+        response['X-Sendfile'] = full_path
+    response['Cache-Control'] = cache_control(path)
+    return response
+
+
+@require_safe
+def serve_media(request: HttpRequest, path: str) -> HttpResponse:
+    """Отдаёт файл из MEDIA_ROOT в режиме MEDIA_SERVE_MODE."""
+    full_path = resolve_media_path(path)
+    mode = settings.MEDIA_SERVE_MODE
+    if mode in ('accel', 'sendfile'):
+        return offload_response(full_path, path, mode)
+    return file_response(request, full_path, path)
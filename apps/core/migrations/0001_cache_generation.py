@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheGeneration',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Модель')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Поколение')),
+            ],
+            options={
+                'verbose_name': 'Поколение кеша',
+                'verbose_name_plural': 'Поколения кеша',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_cache_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariantJob',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Ключ')),
+                ('label', models.CharField(max_length=100, verbose_name='Модель')),
+                ('field_name', models.CharField(max_length=100, verbose_name='Поле')),
+                ('name', models.CharField(max_length=255, verbose_name='Файл')),
+                ('size_name', models.CharField(max_length=50, verbose_name='Размер')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=10, verbose_name='Статус')),
+                ('variants', models.JSONField(blank=True, null=True, verbose_name='Варианты')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('claimed_until', models.DateTimeField(blank=True, null=True, verbose_name='Занята до')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Варианты изображения',
+                'verbose_name_plural': 'Варианты изображений',
+                'indexes': [models.Index(fields=['status', 'claimed_until'], name='core_imagev_status_90ea41_idx')],
+            },
+        ),
+    ]
@@ -3,5 +3,7 @@
 """
 
 from .base import BaseModel
+from .cache import CacheGeneration
+from .images import ImageVariantJob
 
-__all__ = ['BaseModel']
+__all__ = ['BaseModel', 'CacheGeneration', 'ImageVariantJob']
@@ -2,8 +2,8 @@
 Базовая модель проекта.
 """
 
-import uuid
 from django.db import models
+from apps.core.utils.uuid7 import uuid7
 
 
 class BaseModel(models.Model):
@@ -11,14 +11,14 @@ class BaseModel(models.Model):
     Абстрактная базовая модель для всех моделей проекта.
     
     Поля:
-        uuid: Уникальный идентификатор (UUID4)
+        uuid: Уникальный идентификатор (UUID7, упорядочен по времени создания)
         created_at: Дата и время создания
         updated_at: Дата и время последнего обновления
     """
     
     uuid = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False,
         verbose_name='UUID',
         help_text='Уникальный идентификатор записи'
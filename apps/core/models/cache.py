@@ -0,0 +1,37 @@
+"""
+Поколения моделей для сброса кеша страниц.
+"""
+
+from django.db import models
+
+
+class CacheGeneration(models.Model):
+    """
+    Поколение модели для ключей кеша публичных страниц.
+    
+    Хранится в базе, а не в кеше: кеш по умолчанию (LocMemCache) у каждого
+    воркера gunicorn свой, и увеличение поколения в одном воркере не было бы
+    видно остальным. Строка заводится при первом изменении модели.
+    
+    Поля:
+        label: Метка модели ('app_label.model_name')
+        value: Текущее поколение
+    """
+    
+    label = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name='Модель'
+    )
+    
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name='Поколение'
+    )
+    
+    class Meta:
+        verbose_name = 'Поколение кеша'
+        verbose_name_plural = 'Поколения кеша'
+    
+    def __str__(self) -> str:
+        return f'{self.label}: {self.value}'
@@ -0,0 +1,106 @@
+"""
+Очередь и результаты создания вариантов изображений.
+"""
+
+from django.db import models
+
+
+class ImageVariantJob(models.Model):
+    """
+    Набор вариантов одного изображения для одного размера.
+    
+    Строка заводится при сохранении объекта с изображением (задача
+    в очереди), варианты создаёт отдельный процесс - команда
+    generate_image_variants (--watch под systemd). Готовый набор хранится
+    здесь же: кеш по умолчанию (LocMemCache) у каждого процесса свой,
+    поэтому состояние очереди и результат в нём не сохранить.
+    
+    Поля:
+        key: Ключ набора (зависит от файла и параметров размера)
+        label: Модель ('app_label.ModelName')
+        field_name: Поле изображения
+        name: Имя файла в хранилище
+        size_name: Именованный размер из settings.IMAGE_SIZES
+        status: Статус задачи
+        variants: Готовый набор {формат: [[url, ширина, байт], ...]}
+        attempts: Количество попыток создания
+        last_error: Последняя ошибка
+        claimed_until: До какого времени задача занята процессом
+        updated_at: Время последнего изменения
+    """
+    
+    class Status(models.TextChoices):
+        """Статусы задачи."""
+        PENDING = 'pending', 'В очереди'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+    
+    key = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name='Ключ'
+    )
+    
+    label = models.CharField(
+        max_length=100,
+        verbose_name='Модель'
+    )
+    
+    field_name = models.CharField(
+        max_length=100,
+        verbose_name='Поле'
+    )
+    
+    name = models.CharField(
+        max_length=255,
+        verbose_name='Файл'
+    )
+    
+    size_name = models.CharField(
+        max_length=50,
+        verbose_name='Размер'
+    )
+    
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    
+    variants = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='Варианты'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Занята до'
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления'
+    )
+    
+    class Meta:
+        verbose_name = 'Варианты изображения'
+        verbose_name_plural = 'Варианты изображений'
+        indexes = [
+            models.Index(fields=['status', 'claimed_until']),
+        ]
+    
+    def __str__(self) -> str:
+        return f'{self.name} ({self.size_name}): {self.get_status_display()}'
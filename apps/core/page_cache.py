@@ -0,0 +1,178 @@
+"""
+Кеширование публичных страниц целиком для анонимных посетителей.
+
+Ключ страницы строится из схемы, хоста, пути, нормализованной строки
+запроса и поколений моделей, от которых зависит страница. Сохранение
+или удаление записи такой модели увеличивает её поколение, и все
+зависящие от неё страницы перестают находиться в кеше.
+
+Поколения хранятся в базе (CacheGeneration), поэтому сброс виден всем
+воркерам gunicorn, даже если у каждого свой LocMemCache; проверка
+поколений - один запрос по первичному ключу на страницу.
+"""
+
+import hashlib
+import time
+from typing import Iterable
+from urllib.parse import urlencode
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from loguru import logger
+from apps.core.models import CacheGeneration
+
+
+# Подставляется вместо CSRF токена в кешируемый HTML и заменяется
+# на свежий токен посетителя при каждой отдаче страницы
+CSRF_PLACEHOLDER = 'pagecache-csrf-token-placeholder'
+
+# Параметры, которые не влияют на содержимое страницы
+IGNORED_QUERY_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'yclid', 'gclid', 'fbclid'}
+
+PAGE_KEY_PREFIX = 'pagecache:page:'
+
+
+def bump_generation(model_label: str) -> None:
+    """
+    Сбрасывает кеш страниц, зависящих от модели.
+
+    Args:
+        model_label: Метка модели в формате 'app_label.model_name'
+    """
+    label = model_label.lower()
+    with transaction.atomic():
+        # Первое поколение уникально во времени: страницы, закешированные
+        # с поколением 0 до появления строки (или до пересоздания базы), не найдутся
+        _, created = CacheGeneration.objects.get_or_create(label=label, defaults={'value': time.time_ns()})
+        if not created:
+            CacheGeneration.objects.filter(label=label).update(value=F('value') + 1)
+
+
+def get_generations(model_labels: Iterable[str]) -> list:
+    """Текущие поколения моделей одним запросом (0 - модель ещё не менялась)."""
+    labels = [label.lower() for label in model_labels]
+    generations = dict(CacheGeneration.objects.filter(label__in=labels).values_list('label', 'value'))
+    return [generations.get(label, 0) for label in labels]
+
+
+def normalize_query_string(request: HttpRequest) -> str:
+    """Отсортированная строка запроса без пустых и рекламных параметров."""
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        if key not in IGNORED_QUERY_PARAMS
+        for value in values
+        if value != ''
+    )
+    return urlencode(params)
+
+
+def page_cache_key(request: HttpRequest, model_labels: Iterable[str]) -> str:
+    """
+    Ключ кеша страницы для текущего запроса.
+
+    Прочитанные поколения сохраняются в request.cache_generations:
+    по ним снимок настроек сайта проверяется без повторного запроса.
+    """
+    model_labels = [label.lower() for label in model_labels]
+    generations = get_generations(model_labels)
+    request.cache_generations = dict(zip(model_labels, generations))
+    raw_key = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        normalize_query_string(request),
+        ','.join(str(generation) for generation in generations),
+    ])
+    return PAGE_KEY_PREFIX + hashlib.md5(raw_key.encode('utf-8')).hexdigest()
+
+
+def is_cacheable_request(request: HttpRequest) -> bool:
+    """
+    Можно ли отдать запросу общую закешированную страницу.
+
+    Кешируются только GET/HEAD запросы анонимных посетителей,
+    у которых нет ожидающих flash-сообщений.
+    """
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    if hasattr(request, '_messages') and len(get_messages(request)):
+        return False
+    return True
+
+
+def insert_csrf_token(request: HttpRequest, content: bytes) -> bytes:
+    """Подставляет CSRF токен посетителя вместо заглушки."""
+    if CSRF_PLACEHOLDER.encode() not in content:
+        return content
+    return content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+
+
+class PageCacheMixin:
+    """
+    Миксин для кеширования страницы целиком.
+
+    Атрибуты:
+        page_cache_models: Метки моделей, от которых зависит страница.
+            Изменение любой из них сбрасывает кеш страницы.
+    """
+
+    page_cache_models = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        # Настройки сайта выводятся в base.html на каждой странице
+        model_labels = ('main.sitesettings',) + tuple(self.page_cache_models)
+        try:
+            cache_key = page_cache_key(request, model_labels)
+            cached = cache.get(cache_key)
+        except Exception as e:
+            logger.error(f'Ошибка чтения кеша страницы {request.path}: {e}')
+            return super().dispatch(request, *args, **kwargs)
+
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(insert_csrf_token(request, content), content_type=content_type)
+            response['X-Page-Cache'] = 'HIT'
+            return response
+
+        self._page_cache_pending = True
+        response = super().dispatch(request, *args, **kwargs)
+
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(
+                lambda rendered: self._store_page(request, rendered, cache_key)
+            )
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if getattr(self, '_page_cache_pending', False):
+            # Переопределяет значение из context processor csrf
+            context['csrf_token'] = CSRF_PLACEHOLDER
+        return context
+
+    def _store_page(self, request: HttpRequest, response: HttpResponse, cache_key: str) -> None:
+        """Сохраняет отрендеренную страницу и подставляет настоящий CSRF токен."""
+        if response.status_code == 200:
+            try:
+                cache.set(
+                    cache_key,
+                    (response.content, response['Content-Type']),
+                    getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+                )
+            except Exception as e:
+                logger.error(f'Ошибка записи кеша страницы {request.path}: {e}')
+        response.content = insert_csrf_token(request, response.content)
+        response['X-Page-Cache'] = 'MISS'
@@ -0,0 +1,243 @@
+"""
+Keyset (курсорная) пагинация.
+
+Вместо OFFSET страница выбирается условием "после последней записи
+предыдущей страницы" по уникальному набору полей сортировки, поэтому
+любая страница стоит столько же, сколько первая, и COUNT(*) не нужен.
+Курсор - непрозрачная строка для параметра ?cursor=.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from functools import reduce
+from operator import and_, or_
+from typing import List, Optional, Sequence, Tuple
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F, Q
+from django.http import Http404
+
+
+class KeysetPage:
+    """
+    Страница keyset пагинации.
+    
+    Совместима с шаблонами Django по has_next/has_previous/has_other_pages
+    и number; вместо номеров соседних страниц отдаёт курсоры.
+    """
+    
+    is_keyset = True
+    
+    def __init__(self, object_list: list, paginator: 'KeysetPaginator', number: int,
+                 next_cursor: Optional[str], previous_cursor: Optional[str]):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+    
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+    
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по набору полей сортировки.
+    
+    Args:
+        queryset: Исходный QuerySet (его сортировка заменяется)
+        ordering: Поля сортировки, '-' означает по убыванию.
+            Последнее поле должно быть уникальным (например, 'uuid').
+        per_page: Записей на странице
+    """
+    
+    # Время жизни приблизительного количества записей в кеше, секунд
+    APPROXIMATE_COUNT_TIMEOUT = 300
+    
+    # Оценке планировщика PostgreSQL меньше этого числа не доверяем: для
+    # небольших и ещё не проанализированных (ANALYZE) таблиц она неточна,
+    # а точный COUNT на них дёшев
+    EXACT_COUNT_LIMIT = 1000
+    
+    def __init__(self, queryset, ordering: Sequence[str], per_page: int):
+        self.queryset = queryset
+        self.per_page = per_page
+        opts = queryset.model._meta
+        self.fields = []
+        for item in ordering:
+            name = item.lstrip('-')
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            self.fields.append((name, item.startswith('-'), field))
+    
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """
+        Страница после (или перед) курсором.
+        
+        Raises:
+            Http404: Если курсор повреждён
+        """
+        if not cursor:
+            return self._build_page(self._fetch(None, backwards=False), number=1, backwards=False, from_cursor=False)
+        
+        values, backwards, number = self.decode_cursor(cursor)
+        rows = self._fetch(values, backwards)
+        return self._build_page(rows, number=number, backwards=backwards, from_cursor=True)
+    
+    @property
+    def approximate_count(self) -> int:
+        """
+        Приблизительное количество записей (для подписи "около N").
+        
+        PostgreSQL: оценка планировщика без выполнения запроса, если она
+        не меньше EXACT_COUNT_LIMIT. Иначе (и на других базах) - точный
+        COUNT, закешированный на несколько минут.
+        """
+        connection = connections[self.queryset.db]
+        if connection.vendor == 'postgresql':
+            # SQL для базы queryset (sql_with_params() строит его для 'default')
+            sql, params = self.queryset.order_by().query.get_compiler(using=self.queryset.db).as_sql()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate >= self.EXACT_COUNT_LIMIT:
+                return estimate
+        
+        sql, params = self.queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
+        key = f'keyset:count:{digest}'
+        return cache.get_or_set(key, self.queryset.count, self.APPROXIMATE_COUNT_TIMEOUT)
+    
+    def encode_cursor(self, obj, backwards: bool, number: int) -> str:
+        """Курсор, указывающий на объект."""
+        values = [
+            None if value is None else field.value_to_string(obj)
+            for (name, _, field), value in zip(self.fields, self._values(obj))
+        ]
+        payload = json.dumps({'v': values, 'b': int(backwards), 'n': number}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, cursor: str) -> Tuple[list, bool, int]:
+        """Значения полей, направление и номер страницы из курсора."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            raw_values = payload['v']
+            if len(raw_values) != len(self.fields):
+                raise ValueError('Неверное количество полей курсора')
+            values = [
+                None if value is None else field.to_python(value)
+                for (_, _, field), value in zip(self.fields, raw_values)
+            ]
+            return values, bool(payload.get('b')), max(int(payload.get('n', 1)), 1)
+        except (ValueError, KeyError, TypeError, binascii.Error) as e:
+            raise Http404(f'Неверный курсор страницы: {e}')
+    
+    def _values(self, obj) -> list:
+        return [getattr(obj, field.attname) for _, _, field in self.fields]
+    
+    def _order_by(self, backwards: bool) -> list:
+        expressions = []
+        for name, descending, _ in self.fields:
+            expressions.append(F(name).asc() if descending == backwards else F(name).desc())
+        return expressions
+    
+    def _after(self, index: int, value, backwards: bool) -> Optional[Q]:
+        """
+        Условие "строго после значения" для одного поля.
+        
+        Пустые значения сортируются так же, как их сортирует база
+        (больше всех значений в PostgreSQL, меньше всех в SQLite),
+        поэтому сортировка остаётся обычной и использует индексы.
+        """
+        name, descending, field = self.fields[index]
+        ascending = descending == backwards
+        nulls_largest = connections[self.queryset.db].features.nulls_order_largest
+        if value is None:
+            # Пустое значение - крайнее: после него либо все непустые, либо ничего
+            if ascending == nulls_largest:
+                return None
+            return Q(**{f'{name}__isnull': False})
+        condition = Q(**{f'{name}__gt' if ascending else f'{name}__lt': value})
+        if field.null and ascending == nulls_largest:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+    
+    def _equal(self, index: int, value) -> Q:
+        name = self.fields[index][0]
+        if value is None:
+            return Q(**{f'{name}__isnull': True})
+        return Q(**{name: value})
+    
+    def _fetch(self, values: Optional[list], backwards: bool) -> list:
+        queryset = self.queryset.order_by(*self._order_by(backwards))
+        if values is not None:
+            conditions = []
+            for index, value in enumerate(values):
+                after = self._after(index, value, backwards)
+                if after is None:
+                    continue
+                equal = [self._equal(position, values[position]) for position in range(index)]
+                conditions.append(reduce(and_, equal + [after]))
+            if not conditions:
+                return []
+            queryset = queryset.filter(reduce(or_, conditions))
+        return list(queryset[:self.per_page + 1])
+    
+    def _build_page(self, rows: List, number: int, backwards: bool, from_cursor: bool) -> KeysetPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_previous, has_next = has_more, from_cursor
+            # Номер из курсора приблизителен: записи перед страницей могли
+            # добавиться или удалиться. Перед первой страницей страниц нет,
+            # а перед остальными есть хотя бы одна
+            number = max(number, 2) if has_previous else 1
+        else:
+            has_previous, has_next = from_cursor and number > 1, has_more
+        
+        next_cursor = self.encode_cursor(rows[-1], False, number + 1) if has_next and rows else None
+        previous_cursor = self.encode_cursor(rows[0], True, number - 1) if has_previous and rows else None
+        return KeysetPage(rows, self, number, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """
+    Миксин ListView для keyset пагинации.
+    
+    Атрибуты:
+        keyset_ordering: Поля сортировки, последнее должно быть уникальным
+        cursor_kwarg: Имя GET параметра с курсором
+    """
+    
+    keyset_ordering = ()
+    cursor_kwarg = 'cursor'
+    
+    def use_keyset_pagination(self) -> bool:
+        """Можно ли использовать keyset пагинацию для текущего запроса."""
+        return True
+    
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
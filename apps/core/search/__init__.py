@@ -0,0 +1,120 @@
+"""
+Полнотекстовый поиск по моделям.
+
+Пример:
+    service_index = SearchIndex(
+        Service,
+        fields={'name': 'A', 'description': 'C'},
+        html_fields=['description'],
+    )
+    queryset = service_index.search(Service.objects.filter(is_active=True), 'световые вывески')
+"""
+
+from functools import reduce
+from operator import or_
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from loguru import logger
+from apps.core.search.backends import get_backend
+
+
+class SearchIndex:
+    """
+    Описание полнотекстового индекса модели.
+
+    Атрибуты:
+        model: Индексируемая модель
+        fields: Поля и их веса от 'A' (важнее) до 'D'
+        html_fields: Поля с HTML (CKEditor), теги вырезаются при индексации
+    """
+
+    def __init__(self, model, fields: dict, html_fields=()):
+        self.model = model
+        self.fields = dict(fields)
+        self.html_fields = set(html_fields)
+
+    def get_backend(self, using=None):
+        """Бэкенд для текущей базы или None."""
+        return get_backend(self, using or connection)
+
+    def search(self, queryset, query: str, prefix: bool = False):
+        """
+        Поиск по индексу с сортировкой по релевантности.
+
+        Если база не поддерживает полнотекстовый поиск,
+        используется фильтр icontains по индексируемым полям.
+        """
+        query = (query or '').strip()
+        if not query:
+            return queryset
+        backend = self.get_backend()
+        if backend is None:
+            return queryset.filter(
+                reduce(or_, (Q(**{f'{field}__icontains': query}) for field in self.fields))
+            )
+        return backend.search(queryset, query, prefix=prefix)
+
+    def create(self, using=None) -> None:
+        """Создаёт таблицу индекса."""
+        backend = self.get_backend(using)
+        if backend is not None:
+            backend.create()
+
+    def drop(self, using=None) -> None:
+        """Удаляет таблицу индекса."""
+        backend = self.get_backend(using)
+        if backend is not None:
+            backend.drop()
+
+    def rebuild(self, using=None) -> int:
+        """Переиндексирует все объекты модели."""
+        backend = self.get_backend(using)
+        if backend is None:
+            return 0
+        objects = self.model._default_manager.only('pk', *self.fields).iterator(chunk_size=1000)
+        return backend.rebuild(objects)
+
+    def add_many(self, objects, using=None) -> int:
+        """
+        Добавляет в индекс новые объекты (созданные bulk_create, без сигналов).
+
+        Returns:
+            Количество проиндексированных объектов
+        """
+        backend = self.get_backend(using)
+        if backend is None:
+            return 0
+        return backend.insert_many(objects)
+
+    def handle_save(self, sender, instance, **kwargs):
+        """Обновление индекса после сохранения объекта."""
+        if kwargs.get('raw'):
+            return
+        try:
+            backend = self.get_backend()
+            if backend is not None:
+                # Точка сохранения: ошибка индекса не должна ломать транзакцию сохранения
+                with transaction.atomic():
+                    backend.update(instance)
+        except Exception as e:
+            logger.error(f'Ошибка обновления поискового индекса {sender.__name__} ({instance.pk}): {e}')
+
+    def handle_delete(self, sender, instance, **kwargs):
+        """Удаление объекта из индекса."""
+        try:
+            backend = self.get_backend()
+            if backend is not None:
+                with transaction.atomic():
+                    backend.remove(instance.pk)
+        except Exception as e:
+            logger.error(f'Ошибка удаления из поискового индекса {sender.__name__} ({instance.pk}): {e}')
+
+    def connect_signals(self) -> None:
+        """Подключает обновление индекса к сохранению и удалению объектов."""
+        label = self.model._meta.label_lower
+        post_save.connect(self.handle_save, sender=self.model, dispatch_uid=f'search_index_save_{label}', weak=False)
+        post_delete.connect(self.handle_delete, sender=self.model, dispatch_uid=f'search_index_delete_{label}', weak=False)
+
+
+__all__ = ['SearchIndex']
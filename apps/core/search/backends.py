@@ -0,0 +1,302 @@
+"""
+Бэкенды полнотекстового поиска.
+
+Для каждой проиндексированной модели создаётся отдельная таблица
+<таблица модели>_search со строкой на объект:
+    - SQLite: виртуальная таблица FTS5 с основами слов по колонкам,
+      ранжирование через bm25();
+    - PostgreSQL: колонка tsvector с весами и GIN индексом,
+      ранжирование через ts_rank().
+
+Обе реализации дают один интерфейс: create/drop, update/remove,
+rebuild и search(queryset, query), который фильтрует QuerySet
+по совпадению и сортирует по релевантности.
+
+Строка объекта в FTS5 находится по rowid, который вычисляется из
+первичного ключа (search_rowid), поэтому обновление и удаление объекта
+не просматривают индекс целиком. В PostgreSQL ключ object_id - PRIMARY KEY.
+"""
+
+import uuid
+from typing import Iterable, Optional
+from django.db import connection as default_connection
+from apps.core.search.stemmer import html_to_text, stem, stem_text, tokenize
+
+
+# Веса полей (как в PostgreSQL setweight) и их множители для bm25()
+WEIGHTS = {'A': 10.0, 'B': 5.0, 'C': 2.0, 'D': 1.0}
+
+# Минимальная длина слова для поиска по префиксу
+MIN_PREFIX_LENGTH = 2
+
+
+def search_rowid(pk) -> int:
+    """
+    rowid строки FTS5 для первичного ключа объекта.
+
+    Целый ключ используется как есть, у UUID - младшие 64 бита как знаковое
+    целое (у UUID v4 и v7 это случайная часть). Совпадение rowid у двух
+    объектов практически исключено, а если случится, вставка второй строки
+    завершится ошибкой ограничения, а не подменит первую.
+    """
+    if isinstance(pk, int):
+        return pk
+    if not isinstance(pk, uuid.UUID):
+        pk = uuid.UUID(str(pk))
+    return int.from_bytes(pk.bytes[8:], 'big', signed=True)
+
+
+class BaseSearchBackend:
+    """Общая часть бэкендов поиска."""
+
+    rank_order = 'search_rank'
+
+    def __init__(self, index, connection=None):
+        self.index = index
+        self.connection = connection or default_connection
+        self.table = f'{index.model._meta.db_table}_search'
+
+    @property
+    def quoted_table(self) -> str:
+        return self.connection.ops.quote_name(self.table)
+
+    @property
+    def model_table(self) -> str:
+        return self.connection.ops.quote_name(self.index.model._meta.db_table)
+
+    @property
+    def pk_column(self) -> str:
+        return self.connection.ops.quote_name(self.index.model._meta.pk.column)
+
+    def prepare_pk(self, pk):
+        """Значение первичного ключа в формате колонки базы."""
+        return self.index.model._meta.pk.get_db_prep_value(pk, self.connection)
+
+    def document(self, instance) -> dict:
+        """Текст индексируемых полей объекта без HTML."""
+        values = {}
+        for field in self.index.fields:
+            value = getattr(instance, field, '') or ''
+            if field in self.index.html_fields:
+                value = html_to_text(value)
+            values[field] = str(value)
+        return values
+
+    def rebuild(self, objects: Iterable, batch_size: int = 1000) -> int:
+        """
+        Полностью перестраивает индекс.
+
+        Args:
+            objects: Объекты модели (итерируются один раз, без загрузки в память целиком)
+            batch_size: Размер пачки вставки
+
+        Returns:
+            Количество проиндексированных объектов
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.quoted_table}')
+        total = 0
+        batch = []
+        for instance in objects:
+            batch.append(instance)
+            if len(batch) >= batch_size:
+                total += self.insert_many(batch)
+                batch = []
+        if batch:
+            total += self.insert_many(batch)
+        return total
+
+    def update(self, instance) -> None:
+        """Обновляет строку индекса одного объекта."""
+        self.remove(instance.pk)
+        self.insert_many([instance])
+
+    def remove(self, pk) -> None:
+        """Удаляет объект из индекса."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.quoted_table} WHERE object_id = %s',
+                [self.prepare_pk(pk)]
+            )
+
+    def search(self, queryset, query: str, prefix: bool = False):
+        """
+        Фильтрует queryset по поисковому запросу и сортирует по релевантности.
+
+        Args:
+            queryset: Исходный QuerySet модели индекса
+            query: Текст запроса
+            prefix: Искать слова по началу (для подсказок по мере ввода)
+
+        Returns:
+            QuerySet с аннотацией search_rank
+        """
+        expression = self.build_query(query, prefix)
+        if not expression:
+            return queryset.none()
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.quoted_table}.object_id = {self.model_table}.{self.pk_column}', self.match_sql()],
+            params=[expression],
+            select={'search_rank': self.rank_sql()},
+            select_params=self.rank_params(expression),
+        ).order_by(self.rank_order)
+
+    def create(self) -> None:
+        raise NotImplementedError
+
+    def drop(self) -> None:
+        raise NotImplementedError
+
+    def insert_many(self, objects) -> int:
+        raise NotImplementedError
+
+    def build_query(self, query: str, prefix: bool) -> str:
+        raise NotImplementedError
+
+    def match_sql(self) -> str:
+        raise NotImplementedError
+
+    def rank_sql(self) -> str:
+        raise NotImplementedError
+
+    def rank_params(self, expression: str) -> list:
+        return []
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Поиск на SQLite FTS5 с русским стеммингом на стороне Python."""
+
+    def create(self) -> None:
+        columns = ', '.join(self.index.fields)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.quoted_table} '
+                f"USING fts5(object_id UNINDEXED, {columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def drop(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.quoted_table}')
+
+    def insert_many(self, objects) -> int:
+        columns = ', '.join(['rowid', 'object_id'] + list(self.index.fields))
+        placeholders = ', '.join(['%s'] * (len(self.index.fields) + 2))
+        rows = []
+        for instance in objects:
+            document = self.document(instance)
+            rows.append(
+                [search_rowid(instance.pk), self.prepare_pk(instance.pk)]
+                + [stem_text(document[field]) for field in self.index.fields]
+            )
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {self.quoted_table} ({columns}) VALUES ({placeholders})', rows)
+        return len(rows)
+
+    def remove(self, pk) -> None:
+        """Удаляет объект из индекса по rowid (object_id в FTS5 не индексируется)."""
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.quoted_table} WHERE rowid = %s', [search_rowid(pk)])
+
+    def build_query(self, query: str, prefix: bool) -> str:
+        terms = []
+        for token in tokenize(query):
+            term = f'"{stem(token)}"'
+            if prefix and len(token) >= MIN_PREFIX_LENGTH:
+                term += '*'
+            terms.append(term)
+        return ' '.join(terms)
+
+    def match_sql(self) -> str:
+        return f'{self.quoted_table} MATCH %s'
+
+    def rank_sql(self) -> str:
+        # Первая колонка object_id не участвует в ранжировании
+        weights = ', '.join(['0'] + [str(WEIGHTS[weight]) for weight in self.index.fields.values()])
+        return f'bm25({self.quoted_table}, {weights})'
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Поиск на PostgreSQL tsvector с конфигурацией 'russian' и GIN индексом."""
+
+    rank_order = '-search_rank'
+    config = 'russian'
+
+    def create(self) -> None:
+        pk_type = self.index.model._meta.pk.db_type(self.connection)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.quoted_table} '
+                f'(object_id {pk_type} PRIMARY KEY, document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {self.connection.ops.quote_name(self.table + "_gin")} '
+                f'ON {self.quoted_table} USING GIN (document)'
+            )
+
+    def drop(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {self.quoted_table}')
+
+    def insert_many(self, objects) -> int:
+        parts = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', %s), '{weight}')"
+            for weight in self.index.fields.values()
+        )
+        rows = []
+        for instance in objects:
+            document = self.document(instance)
+            rows.append([self.prepare_pk(instance.pk)] + [document[field] for field in self.index.fields])
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.quoted_table} (object_id, document) VALUES (%s, {parts}) '
+                f'ON CONFLICT (object_id) DO UPDATE SET document = EXCLUDED.document',
+                rows
+            )
+        return len(rows)
+
+    def build_query(self, query: str, prefix: bool) -> str:
+        # Слова содержат только буквы и цифры, поэтому безопасны для to_tsquery
+        terms = []
+        for token in tokenize(query):
+            term = token
+            if prefix and len(token) >= MIN_PREFIX_LENGTH:
+                term += ':*'
+            terms.append(term)
+        return ' & '.join(terms)
+
+    def match_sql(self) -> str:
+        return f"{self.quoted_table}.document @@ to_tsquery('{self.config}', %s)"
+
+    def rank_sql(self) -> str:
+        return f"ts_rank({self.quoted_table}.document, to_tsquery('{self.config}', %s))"
+
+    def rank_params(self, expression: str) -> list:
+        return [expression]
+
+
+_fts5_support = {}
+
+
+def sqlite_has_fts5(connection) -> bool:
+    """Собран ли SQLite с поддержкой FTS5 (проверяется один раз на базу)."""
+    if connection.alias not in _fts5_support:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            _fts5_support[connection.alias] = any('FTS5' in row[0] for row in cursor.fetchall())
+    return _fts5_support[connection.alias]
+
+
+def get_backend(index, connection=None) -> Optional[BaseSearchBackend]:
+    """
+    Бэкенд поиска для базы данных.
+
+    Returns:
+        Экземпляр бэкенда или None, если база не поддерживает полнотекстовый поиск
+    """
+    connection = connection or default_connection
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(index, connection)
+    if connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        return SQLiteSearchBackend(index, connection)
+    return None
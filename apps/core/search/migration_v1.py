@@ -0,0 +1,278 @@
+"""
+Создание поисковых индексов в миграциях (первая версия индекса).
+
+Общая часть миграций services 0007 и portfolio 0005: таблица индекса
+и её заполнение по историческим моделям (apps.get_model). Модуль
+заморожен вместе с копией стеммера: миграции должны давать тот же
+индекс при любом состоянии apps.core.search, поэтому код приложения
+отсюда не импортируется. Изменение индекса - новая миграция со своим
+модулем (migration_v2 и т.д.), этот не меняется.
+"""
+
+import html
+import re
+from functools import lru_cache
+from django.db import migrations
+from django.utils.html import strip_tags
+
+
+BATCH_SIZE = 1000
+
+
+# Стеммер русского языка (Snowball) - копия apps.core.search.stemmer
+# на момент первых миграций индекса
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND_1 = ('вшись', 'вши', 'в')
+PERFECTIVE_GERUND_2 = ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв')
+
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому',
+    'ее', 'ие', 'ые', 'ое', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+
+PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+
+REFLEXIVE = ('ся', 'сь')
+
+VERB_1 = (
+    'ете', 'йте', 'ешь', 'нно',
+    'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет', 'ют', 'ны', 'ть',
+    'й', 'л', 'н',
+)
+VERB_2 = (
+    'ейте', 'уйте',
+    'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло', 'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь',
+    'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую',
+    'ю',
+)
+
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях',
+    'ев', 'ов', 'ие', 'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию', 'ью', 'ия', 'ья',
+    'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+TOKEN_RE = re.compile(r'[0-9a-zа-яё]+', re.IGNORECASE)
+
+
+def _regions(word: str):
+    """Начала областей RV и R2 слова."""
+    rv = len(word)
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            rv = index + 1
+            break
+
+    def next_region(start: int) -> int:
+        for index in range(start + 1, len(word)):
+            if word[index] not in VOWELS and word[index - 1] in VOWELS:
+                return index + 1
+        return len(word)
+
+    r1 = next_region(0)
+    r2 = next_region(r1)
+    return rv, r2
+
+
+def _longest_suffix(word: str, start: int, *groups):
+    """
+    Самое длинное окончание из групп, целиком лежащее после start.
+
+    Returns:
+        (окончание, номер группы) или (None, None)
+    """
+    best, best_group = None, None
+    for group_index, group in enumerate(groups):
+        for suffix in group:
+            if (best is None or len(suffix) > len(best)) and word.endswith(suffix) \
+                    and len(word) - len(suffix) >= start:
+                best, best_group = suffix, group_index
+    return best, best_group
+
+
+def _strip_after_a_ya(word: str, start: int, group_1, group_2):
+    """
+    Удаляет окончание, где окончания group_1 допустимы только после 'а'/'я'.
+
+    Returns:
+        Слово без окончания или None, если окончание не найдено
+    """
+    suffix, group = _longest_suffix(word, start, group_1, group_2)
+    if suffix is None:
+        return None
+    stem = word[:-len(suffix)]
+    if group == 0 and not (len(stem) > start and stem[-1] in 'ая'):
+        return None
+    return stem
+
+
+@lru_cache(maxsize=100000)
+def stem(word: str) -> str:
+    """
+    Основа русского слова.
+
+    Пример:
+        stem('вывесками') -> 'вывеск'
+    """
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    # Шаг 1
+    result = _strip_after_a_ya(word, rv, PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2)
+    if result is None:
+        suffix, _ = _longest_suffix(word, rv, REFLEXIVE)
+        if suffix:
+            word = word[:-len(suffix)]
+
+        suffix, _ = _longest_suffix(word, rv, ADJECTIVE)
+        if suffix:
+            result = word[:-len(suffix)]
+            participle = _strip_after_a_ya(result, rv, PARTICIPLE_1, PARTICIPLE_2)
+            if participle is not None:
+                result = participle
+        else:
+            result = _strip_after_a_ya(word, rv, VERB_1, VERB_2)
+            if result is None:
+                suffix, _ = _longest_suffix(word, rv, NOUN)
+                result = word[:-len(suffix)] if suffix else word
+    word = result
+
+    # Шаг 2
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    suffix, _ = _longest_suffix(word, max(r2, rv), DERIVATIONAL)
+    if suffix:
+        word = word[:-len(suffix)]
+
+    # Шаг 4
+    suffix, _ = _longest_suffix(word, rv, SUPERLATIVE, ('нн', 'ь'))
+    if suffix in SUPERLATIVE:
+        word = word[:-len(suffix)]
+        if word.endswith('нн') and len(word) - 2 >= rv:
+            word = word[:-1]
+    elif suffix == 'нн':
+        word = word[:-1]
+    elif suffix == 'ь':
+        word = word[:-1]
+
+    return word
+
+
+def html_to_text(value: str) -> str:
+    if not value:
+        return ''
+    return html.unescape(strip_tags(value))
+
+
+def stem_text(text: str) -> str:
+    return ' '.join(stem(token.lower()) for token in TOKEN_RE.findall(text or ''))
+
+
+# Индекс
+
+def has_fts5(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def search_rowid(pk) -> int:
+    # Младшие 64 бита UUID как знаковое целое (rowid строки FTS5)
+    return int.from_bytes(pk.bytes[8:], 'big', signed=True)
+
+
+def documents(model, fields: dict, html_fields: set):
+    """Пары (pk, {поле: текст без HTML}) по исторической модели."""
+    for instance in model._base_manager.only(*fields).iterator(chunk_size=BATCH_SIZE):
+        values = {}
+        for field in fields:
+            value = str(getattr(instance, field) or '')
+            values[field] = html_to_text(value) if field in html_fields else value
+        yield instance.pk, values
+
+
+def insert_batches(cursor, sql: str, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            cursor.executemany(sql, batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+
+
+def create_search_index(schema_editor, model, table: str, fields: dict, html_fields: set) -> None:
+    """Создаёт таблицу индекса и заполняет её (SQLite FTS5 или PostgreSQL tsvector)."""
+    connection = schema_editor.connection
+    quoted = schema_editor.quote_name(table)
+    pk_field = model._meta.pk
+
+    if connection.vendor == 'sqlite' and has_fts5(connection):
+        columns = ', '.join(fields)
+        placeholders = ', '.join(['%s'] * (len(fields) + 2))
+        rows = (
+            [search_rowid(pk), pk_field.get_db_prep_value(pk, connection)]
+            + [stem_text(values[field]) for field in fields]
+            for pk, values in documents(model, fields, html_fields)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {quoted} '
+                f"USING fts5(object_id UNINDEXED, {columns}, tokenize='unicode61 remove_diacritics 2')"
+            )
+            insert_batches(cursor, f'INSERT INTO {quoted} (rowid, object_id, {columns}) VALUES ({placeholders})', rows)
+
+    elif connection.vendor == 'postgresql':
+        document = ' || '.join(
+            f"setweight(to_tsvector('russian', %s), '{weight}')" for weight in fields.values()
+        )
+        rows = (
+            [pk_field.get_db_prep_value(pk, connection)] + [values[field] for field in fields]
+            for pk, values in documents(model, fields, html_fields)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {quoted} '
+                f'(object_id {pk_field.db_type(connection)} PRIMARY KEY, document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(table + "_gin")} ON {quoted} USING GIN (document)'
+            )
+            insert_batches(cursor, f'INSERT INTO {quoted} (object_id, document) VALUES (%s, {document})', rows)
+
+
+def search_index_operation(app_label: str, model_name: str, table: str, fields: dict,
+                           html_fields=()) -> migrations.RunPython:
+    """
+    Операция миграции: создание индекса модели (обратная - удаление таблицы).
+
+    Args:
+        app_label, model_name: Историческая модель
+        table: Таблица индекса
+        fields: Поля и их веса 'A'-'D' на момент миграции
+        html_fields: Поля с HTML
+    """
+    fields = dict(fields)
+    html_fields = set(html_fields)
+
+    def forwards(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        create_search_index(schema_editor, model, table, fields, html_fields)
+
+    def backwards(apps, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {schema_editor.quote_name(table)}')
+
+    return migrations.RunPython(forwards, backwards)
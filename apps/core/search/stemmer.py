@@ -0,0 +1,177 @@
+"""
+Стеммер русского языка (алгоритм Snowball) и токенизация текста.
+
+Используется для полнотекстового индекса SQLite FTS5, у которого
+нет встроенной русской морфологии. PostgreSQL стеммит сам
+через конфигурацию 'russian'.
+"""
+
+import html
+import re
+from functools import lru_cache
+from typing import List
+from django.utils.html import strip_tags
+
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND_1 = ('вшись', 'вши', 'в')
+PERFECTIVE_GERUND_2 = ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв')
+
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому',
+    'ее', 'ие', 'ые', 'ое', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+
+PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+
+REFLEXIVE = ('ся', 'сь')
+
+VERB_1 = (
+    'ете', 'йте', 'ешь', 'нно',
+    'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет', 'ют', 'ны', 'ть',
+    'й', 'л', 'н',
+)
+VERB_2 = (
+    'ейте', 'уйте',
+    'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло', 'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь',
+    'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую',
+    'ю',
+)
+
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях',
+    'ев', 'ов', 'ие', 'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию', 'ью', 'ия', 'ья',
+    'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+TOKEN_RE = re.compile(r'[0-9a-zа-яё]+', re.IGNORECASE)
+
+
+def _regions(word: str):
+    """Начала областей RV и R2 слова."""
+    rv = len(word)
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            rv = index + 1
+            break
+
+    def next_region(start: int) -> int:
+        for index in range(start + 1, len(word)):
+            if word[index] not in VOWELS and word[index - 1] in VOWELS:
+                return index + 1
+        return len(word)
+
+    r1 = next_region(0)
+    r2 = next_region(r1)
+    return rv, r2
+
+
+def _longest_suffix(word: str, start: int, *groups):
+    """
+    Самое длинное окончание из групп, целиком лежащее после start.
+
+    Returns:
+        (окончание, номер группы) или (None, None)
+    """
+    best, best_group = None, None
+    for group_index, group in enumerate(groups):
+        for suffix in group:
+            if (best is None or len(suffix) > len(best)) and word.endswith(suffix) \
+                    and len(word) - len(suffix) >= start:
+                best, best_group = suffix, group_index
+    return best, best_group
+
+
+def _strip_after_a_ya(word: str, start: int, group_1, group_2):
+    """
+    Удаляет окончание, где окончания group_1 допустимы только после 'а'/'я'.
+
+    Returns:
+        Слово без окончания или None, если окончание не найдено
+    """
+    suffix, group = _longest_suffix(word, start, group_1, group_2)
+    if suffix is None:
+        return None
+    stem = word[:-len(suffix)]
+    if group == 0 and not (len(stem) > start and stem[-1] in 'ая'):
+        return None
+    return stem
+
+
+@lru_cache(maxsize=100000)
+def stem(word: str) -> str:
+    """
+    Основа русского слова.
+
+    Пример:
+        stem('вывесками') -> 'вывеск'
+    """
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    # Шаг 1
+    result = _strip_after_a_ya(word, rv, PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2)
+    if result is None:
+        suffix, _ = _longest_suffix(word, rv, REFLEXIVE)
+        if suffix:
+            word = word[:-len(suffix)]
+
+        suffix, _ = _longest_suffix(word, rv, ADJECTIVE)
+        if suffix:
+            result = word[:-len(suffix)]
+            participle = _strip_after_a_ya(result, rv, PARTICIPLE_1, PARTICIPLE_2)
+            if participle is not None:
+                result = participle
+        else:
+            result = _strip_after_a_ya(word, rv, VERB_1, VERB_2)
+            if result is None:
+                suffix, _ = _longest_suffix(word, rv, NOUN)
+                result = word[:-len(suffix)] if suffix else word
+    word = result
+
+    # Шаг 2
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    suffix, _ = _longest_suffix(word, max(r2, rv), DERIVATIONAL)
+    if suffix:
+        word = word[:-len(suffix)]
+
+    # Шаг 4
+    suffix, _ = _longest_suffix(word, rv, SUPERLATIVE, ('нн', 'ь'))
+    if suffix in SUPERLATIVE:
+        word = word[:-len(suffix)]
+        if word.endswith('нн') and len(word) - 2 >= rv:
+            word = word[:-1]
+    elif suffix == 'нн':
+        word = word[:-1]
+    elif suffix == 'ь':
+        word = word[:-1]
+
+    return word
+
+
+def html_to_text(value: str) -> str:
+    """Текст без HTML тегов и сущностей (для полей CKEditor)."""
+    if not value:
+        return ''
+    return html.unescape(strip_tags(value))
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре."""
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def stem_text(text: str) -> str:
+    """Текст, приведённый к основам слов через пробел."""
+    return ' '.join(stem(token) for token in tokenize(text))
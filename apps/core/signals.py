@@ -0,0 +1,38 @@
+"""
+Сигналы core приложения.
+
+Сбрасывают кеш публичных страниц при изменении контента в админке.
+"""
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from apps.core.page_cache import bump_generation
+
+
+# Модели, от которых зависят закешированные страницы
+PAGE_CACHE_MODELS = [
+    'main.Slider',
+    'main.AboutUs',
+    'main.Statistic',
+    'main.Testimonial',
+    'main.SiteSettings',
+    'services.Service',
+    'portfolio.PortfolioItem',
+]
+
+
+def invalidate_page_cache(sender, **kwargs):
+    """Увеличивает поколение модели после фиксации транзакции."""
+    label = sender._meta.label_lower
+    # До коммита другой запрос может прочитать старые данные
+    # и сохранить их в кеш под новым поколением
+    transaction.on_commit(lambda: bump_generation(label))
+
+
+def connect_page_cache_signals():
+    """Подключает сброс кеша страниц к моделям контента."""
+    for label in PAGE_CACHE_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_save_{label}')
+        post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_delete_{label}')
@@ -0,0 +1,156 @@
+"""
+Снимок настроек сайта, общий для всех запросов процесса.
+
+Настройки читаются из базы один раз и хранятся в памяти воркера в виде
+неизменяемого объекта. Версия снимка - поколение SiteSettings в кеше
+страниц (CacheGeneration), которое растёт при каждом сохранении или
+удалении настроек. Проверка версии запросов к базе не делает:
+    - страницы с кешем (PageCacheMixin) уже прочитали поколение для
+      ключа страницы, оно берётся из запроса;
+    - в остальных запросах версия берётся из кеша (VERSION_KEY),
+      SiteSettings.save()/delete() её сбрасывают. Если кеш у каждого
+      воркера свой (LocMemCache), другие воркеры перечитывают версию
+      из базы не реже раза в VERSION_TIMEOUT секунд.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from django.core.cache import cache
+from django.db import transaction
+from apps.core.page_cache import get_generations
+
+
+SETTINGS_LABEL = 'main.sitesettings'
+
+VERSION_KEY = 'site_settings:version'
+VERSION_TIMEOUT = 10
+
+_lock = threading.Lock()
+_state = None  # (версия, снимок)
+
+
+def format_phone(phone):
+    """
+    Форматирует телефонный номер в формат +7 (8142) 28-09-03
+    """
+    if not phone:
+        return phone
+
+    # Удаляем все нецифровые символы кроме плюса
+    phone_digits = ''.join(filter(str.isdigit, str(phone).replace('+', '')))
+
+    # Если номер начинается с 8, заменяем на 7
+    if phone_digits.startswith('8'):
+        phone_digits = '7' + phone_digits[1:]
+
+    # Если номер не начинается с 7, добавляем 7
+    if not phone_digits.startswith('7'):
+        phone_digits = '7' + phone_digits
+
+    # Форматируем: +7 (8142) 28-09-03
+    if len(phone_digits) >= 11:
+        return f"+7 ({phone_digits[1:5]}) {phone_digits[5:7]}-{phone_digits[7:9]}-{phone_digits[9:11]}"
+
+    return phone
+
+
+@dataclass(frozen=True)
+class SiteSettingsSnapshot:
+    """
+    Неизменяемая копия активных настроек сайта для шаблонов.
+
+    Содержит поля SiteSettings, которые выводятся на сайте,
+    и заранее вычисленный phone_formatted.
+    """
+
+    site_name: str
+    phone: str
+    phone_formatted: str
+    email: str
+    address: str
+    working_hours: str
+    vk_link: str
+    instagram_link: str
+    telegram_link: str
+
+    @classmethod
+    def from_model(cls, settings) -> 'SiteSettingsSnapshot':
+        """Создание снимка из записи SiteSettings."""
+        return cls(
+            site_name=settings.site_name,
+            phone=settings.phone,
+            phone_formatted=format_phone(settings.phone) if settings.phone else '',
+            email=settings.email,
+            address=settings.address,
+            working_hours=settings.working_hours,
+            vk_link=settings.vk_link,
+            instagram_link=settings.instagram_link,
+            telegram_link=settings.telegram_link,
+        )
+
+
+def get_version(request=None) -> int:
+    """
+    Текущая версия настроек (поколение SiteSettings).
+
+    Args:
+        request: Запрос; если кеш страниц уже прочитал поколения,
+            используется значение из него
+    """
+    generations = getattr(request, 'cache_generations', None)
+    if generations and SETTINGS_LABEL in generations:
+        return generations[SETTINGS_LABEL]
+
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        [version] = get_generations([SETTINGS_LABEL])
+        cache.set(VERSION_KEY, version, VERSION_TIMEOUT)
+    return version
+
+
+def bump_version() -> None:
+    """
+    Сбрасывает версию в кеше после коммита.
+
+    Вызывается из SiteSettings.save()/delete() после сигналов, поэтому
+    поколение в базе к этому моменту уже увеличено.
+    """
+    transaction.on_commit(lambda: cache.delete(VERSION_KEY))
+
+
+def get_site_settings(request=None) -> Optional[SiteSettingsSnapshot]:
+    """
+    Активные настройки сайта.
+
+    Args:
+        request: Текущий запрос (для версии из кеша страниц)
+
+    Returns:
+        Снимок настроек или None, если активных настроек нет
+    """
+    global _state
+
+    version = get_version(request)
+    state = _state
+    # Поколения только растут: версия меньше текущей - устаревшее значение
+    # из кеша этого воркера, снимок при этом не перечитывается
+    if state is not None and state[0] >= version:
+        return state[1]
+
+    with _lock:
+        if _state is not None and _state[0] >= version:
+            return _state[1]
+
+        from apps.main.models import SiteSettings
+        settings = SiteSettings.objects.filter(is_active=True).first()
+        snapshot = SiteSettingsSnapshot.from_model(settings) if settings else None
+        _state = (version, snapshot)
+        return snapshot
+
+
+def reset() -> None:
+    """Сбрасывает снимок текущего процесса."""
+    global _state
+    with _lock:
+        _state = None
@@ -0,0 +1,55 @@
+"""
+Настройка соединений SQLite.
+
+Для развёртывания на одном сервере без PostgreSQL. При каждом новом
+соединении выполняются PRAGMA из settings.SQLITE_PRAGMAS:
+    - journal_mode=WAL: читатели не блокируют писателя и наоборот;
+    - synchronous=NORMAL: fsync только при checkpoint (безопасно в WAL);
+    - busy_timeout: ожидание блокировки вместо "database is locked";
+    - cache_size, mmap_size, temp_store: меньше обращений к диску.
+"""
+
+import re
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from loguru import logger
+
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def get_pragmas() -> list:
+    """
+    PRAGMA из настроек в порядке выполнения.
+
+    busy_timeout ставится первым, чтобы переключение журнала
+    тоже ждало освобождения блокировки.
+    """
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', None) or {})
+    ordered = []
+    if 'busy_timeout' in pragmas:
+        ordered.append(('busy_timeout', pragmas.pop('busy_timeout')))
+    ordered.extend(pragmas.items())
+    for name, value in ordered:
+        if not PRAGMA_NAME_RE.match(name) or not PRAGMA_VALUE_RE.match(str(value)):
+            raise ValueError(f'Недопустимая настройка SQLite: {name}={value}')
+    return ordered
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет PRAGMA к новому соединению SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_pragmas()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+    logger.debug(f'Настройки SQLite применены: {dict(pragmas)}')
+
+
+def connect_sqlite_signals():
+    """Подключает настройку к созданию соединений с базой."""
+    connection_created.connect(configure_sqlite, dispatch_uid='sqlite_pragmas')
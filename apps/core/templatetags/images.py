@@ -0,0 +1,151 @@
+"""
+Template tags для адаптивных изображений.
+
+Пример:
+    {% load images %}
+    {% responsive_image work.image 'grid' alt=work.title class='img-fluid' %}
+    <div style="{% background_image slide.image 'hero' %}">
+    {% static_picture 'img/About.jpg' alt='Цех' class='img-fluid' %}
+"""
+
+import mimetypes
+from functools import lru_cache
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from apps.core.images import FALLBACK, MIME_TYPES, get_metadata, get_modern_formats, get_size
+from apps.core.images.variants import static_variant_name
+from apps.core.images.workers import get_ready_variants
+
+register = template.Library()
+
+
+def srcset(variants) -> str:
+    return ', '.join(f'{variant.url} {variant.width}w' for variant in variants)
+
+
+@register.simple_tag
+def responsive_image(image, size_name, **attrs):
+    """
+    <picture> с источниками AVIF/WebP и запасным <img> в исходном формате.
+    
+    Дополнительные аргументы (alt, class, loading и т.п.) становятся
+    атрибутами <img>. По умолчанию loading="lazy". Если у модели
+    хранятся размеры изображения, выводятся width/height (место
+    резервируется до загрузки) и размытая заглушка фоном.
+    
+    Пока варианты не созданы (задача в очереди), выводится <img>
+    с оригиналом.
+    """
+    all_variants = get_ready_variants(image, size_name)
+    fallback = all_variants.get(FALLBACK)
+    if not fallback:
+        return ''
+    
+    attrs.setdefault('alt', '')
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    metadata = get_metadata(image)
+    if metadata:
+        attrs.setdefault('width', metadata.width)
+        attrs.setdefault('height', metadata.height)
+        if metadata.placeholder:
+            style = f'background: center / cover no-repeat url("{metadata.placeholder}");'
+            attrs['style'] = f'{style} {attrs["style"]}' if attrs.get('style') else style
+    extra = format_html_join('', ' {}="{}"', sorted(attrs.items()))
+    
+    if fallback[0].width is None:
+        return format_html('<img src="{}"{}>', fallback[-1].url, extra)
+    
+    sizes = get_size(size_name).sizes
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES[format_name], srcset(variants), sizes)
+            for format_name, variants in all_variants.items()
+            if format_name != FALLBACK and variants
+        )
+    )
+    # Браузеры без srcset получают средний вариант
+    src = fallback[(len(fallback) - 1) // 2].url
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        sources, src, srcset(fallback), sizes, extra
+    )
+
+
+@register.simple_tag
+def background_image(image, size_name):
+    """
+    CSS background-image с самым крупным вариантом размера.
+    
+    Браузеры с поддержкой image-set() выбирают AVIF/WebP,
+    остальные используют первое объявление в исходном формате.
+    Размытая заглушка (если хранится) - нижний слой фона, видна
+    до загрузки изображения.
+    """
+    all_variants = get_ready_variants(image, size_name)
+    fallback = all_variants.get(FALLBACK)
+    if not fallback:
+        return ''
+    
+    metadata = get_metadata(image)
+    placeholder = format_html(", url('{}')", metadata.placeholder) if metadata and metadata.placeholder else ''
+    declaration = format_html("background-image: url('{}'){};", fallback[-1].url, placeholder)
+    candidates = [
+        (variants[-1].url, MIME_TYPES[format_name])
+        for format_name, variants in all_variants.items()
+        if format_name != FALLBACK and variants
+    ]
+    if not candidates:
+        return declaration
+    fallback_type, _ = mimetypes.guess_type(fallback[-1].url)
+    candidates.append((fallback[-1].url, fallback_type or 'application/octet-stream'))
+    image_set = format_html_join(', ', "url('{}') type('{}')", candidates)
+    return format_html('{} background-image: image-set({}){};', declaration, image_set, placeholder)
+
+
+@register.simple_tag
+def image_url(image, size_name, format_name='WEBP'):
+    """
+    Адрес самого крупного варианта размера (для JS).
+    
+    По умолчанию WebP (поддерживается всеми актуальными браузерами),
+    если формат недоступен - исходный формат.
+    """
+    all_variants = get_ready_variants(image, size_name)
+    variants = all_variants.get(format_name) or all_variants.get(FALLBACK)
+    return variants[-1].url if variants else ''
+
+
+@lru_cache(maxsize=None)
+def find_static_variants(path: str, format_names: tuple) -> tuple:
+    """Пары (MIME тип, путь) для созданных файлов в современных форматах."""
+    return tuple(
+        (MIME_TYPES[format_name], static_variant_name(path, format_name))
+        for format_name in format_names
+        if finders.find(static_variant_name(path, format_name))
+    )
+
+
+@register.simple_tag
+def static_picture(path, **attrs):
+    """
+    <picture> для картинки из static с источниками AVIF/WebP.
+    
+    Файлы в современных форматах создаёт команда convert_static_images
+    рядом с исходной картинкой; если их нет, выводится только <img>.
+    Дополнительные аргументы становятся атрибутами <img>.
+    """
+    attrs.setdefault('alt', '')
+    extra = format_html_join('', ' {}="{}"', sorted(attrs.items()))
+    img = format_html('<img src="{}"{}>', static(path), extra)
+    variants = find_static_variants(path, tuple(get_modern_formats()))
+    if not variants:
+        return img
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}">',
+        ((content_type, static(name)) for content_type, name in variants)
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
@@ -0,0 +1,3 @@
+"""
+Утилиты для core приложения.
+"""
@@ -0,0 +1,23 @@
+"""
+Хеши содержимого файлов.
+"""
+
+import hashlib
+
+
+# Размер блока чтения: большие фотографии не загружаются в память целиком
+CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(file_object) -> str:
+    """
+    SHA-256 содержимого файла (hex).
+    
+    Файл читается с начала, после чтения позиция возвращается в начало.
+    """
+    digest = hashlib.sha256()
+    file_object.seek(0)
+    for chunk in iter(lambda: file_object.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file_object.seek(0)
+    return digest.hexdigest()
@@ -0,0 +1,84 @@
+"""
+Упорядоченные по времени UUID версии 7 (RFC 9562).
+
+Первые 48 бит - время в миллисекундах, поэтому новые ключи попадают
+в конец индекса первичного ключа, а не в случайные страницы B-дерева,
+и порядок ключей совпадает с порядком создания записей.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_last_counter = 0
+
+# Старший бит 12-битного счётчика оставляем свободным при старте миллисекунды,
+# чтобы в одной миллисекунде поместилось не меньше 2048 ключей
+COUNTER_START_MASK = 0x7FF
+COUNTER_MAX = 0xFFF
+
+
+def _build(timestamp_ms: int, counter: int) -> uuid.UUID:
+    rand_b = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    value = (
+        (timestamp_ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | (counter & COUNTER_MAX) << 64
+        | 0b10 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Новый UUID v7.
+
+    Ключи, созданные в одном процессе, строго возрастают:
+    в пределах миллисекунды увеличивается 12-битный счётчик.
+    """
+    global _last_timestamp, _last_counter
+
+    with _lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _last_timestamp:
+            counter = int.from_bytes(os.urandom(2), 'big') & COUNTER_START_MASK
+        else:
+            # Та же миллисекунда (или часы сдвинулись назад) - продолжаем счётчик
+            timestamp = _last_timestamp
+            counter = _last_counter + 1
+            if counter > COUNTER_MAX:
+                timestamp += 1
+                counter = 0
+        _last_timestamp, _last_counter = timestamp, counter
+    return _build(timestamp, counter)
+
+
+def uuid7_from_datetime(value: datetime) -> uuid.UUID:
+    """
+    UUID v7 с временем из даты (для перевода существующих записей).
+
+    Args:
+        value: Дата и время (обычно created_at записи)
+    """
+    timestamp = int(value.timestamp() * 1000)
+    counter = int.from_bytes(os.urandom(2), 'big') & COUNTER_MAX
+    return _build(timestamp, counter)
+
+
+def uuid7_timestamp(value: uuid.UUID) -> Optional[int]:
+    """
+    Время создания UUID v7 в миллисекундах.
+
+    Returns:
+        Время или None, если UUID другой версии
+    """
+    if value.version != 7:
+        return None
+    return value.int >> 80
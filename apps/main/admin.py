@@ -4,8 +4,9 @@
 
 from django.contrib import admin
 from django import forms
+from django.utils import timezone
 from django.utils.html import format_html
-from apps.main.models import Slider, AboutUs, SiteSettings, Testimonial, TelegramChat, Statistic
+from apps.main.models import Slider, AboutUs, SiteSettings, Testimonial, TelegramChat, TelegramNotification, Statistic
 
 
 @admin.register(Slider)
@@ -211,6 +212,50 @@ class TelegramChatAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(TelegramNotification)
+class TelegramNotificationAdmin(admin.ModelAdmin):
+    """Админка очереди уведомлений Telegram."""
+    
+    list_display = ('created_at', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'short_text')
+    list_filter = ('status', 'created_at')
+    search_fields = ('text', 'last_error')
+    readonly_fields = (
+        'text', 'status', 'attempts', 'next_attempt_at', 'chat_results',
+        'last_error', 'sent_at', 'created_at', 'updated_at'
+    )
+    actions = ['retry']
+    
+    def short_text(self, obj):
+        return obj.text[:80]
+    
+    short_text.short_description = 'Текст'
+    
+    @admin.action(description='Отправить заново')
+    def retry(self, request, queryset):
+        """
+        Возвращает уведомления в очередь.
+        
+        Чатам, которым уведомление уже доставлено, оно не отправляется,
+        а чатам с постоянной ошибкой (например, бот был заблокирован)
+        отправляется снова.
+        """
+        count = 0
+        for notification in queryset.exclude(status=TelegramNotification.Status.SENT):
+            notification.status = TelegramNotification.Status.PENDING
+            notification.attempts = 0
+            notification.next_attempt_at = timezone.now()
+            notification.chat_results = {
+                chat_id: result for chat_id, result in notification.chat_results.items() if result == 'sent'
+            }
+            notification.save(update_fields=['status', 'attempts', 'next_attempt_at', 'chat_results', 'updated_at'])
+            count += 1
+        self.message_user(request, f'Возвращено в очередь: {count}')
+    
+    def has_add_permission(self, request):
+        """Уведомления создаются только вместе с заявками."""
+        return False
+
+
 @admin.register(Testimonial)
 class TestimonialAdmin(admin.ModelAdmin):
     """Админка для управления отзывами."""
@@ -0,0 +1,157 @@
+"""
+Management command: замер уведомлений Telegram на поддельном Bot API.
+
+На временной базе и поддельном API (apps.main.utils.fake_telegram)
+с заданной задержкой и долей сбоев (429, 5xx) замеряет:
+    - время ответа формы заявки (уведомление только ставится в очередь);
+    - время прямой отправки во все чаты (так форма отвечала раньше);
+    - пропускную способность очереди: за сколько deliver_notifications
+      доставляет накопленные уведомления с повторами после сбоев.
+
+Сеть не нужна. Повторы в очереди выполняются без задержки
+(TELEGRAM_OUTBOX_RETRY_DELAY=0), ожидание по 429 retry_after - как
+в работе.
+
+Использование:
+    python manage.py benchmark_telegram
+    python manage.py benchmark_telegram --chats 50 --forms 30 --latency 0.3 --rate-limit-rate 0.05 --error-rate 0.05
+"""
+
+import statistics
+import time
+from typing import List
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from loguru import logger
+from apps.core.benchmark import temporary_database
+from apps.main.models import TelegramChat, TelegramNotification
+from apps.main.utils.fake_telegram import fake_telegram
+from apps.main.utils.outbox import deliver_due
+from apps.main.utils.telegram import format_contact_message, send_telegram_message
+
+
+class Command(BaseCommand):
+    """Бенчмарк формы заявки и очереди уведомлений Telegram."""
+    
+    help = 'Замеряет форму заявки и отправку уведомлений на поддельном Telegram API'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument('--chats', type=int, default=50, help='Подписанных чатов (по умолчанию 50)')
+        parser.add_argument('--forms', type=int, default=20, help='Отправок формы (по умолчанию 20)')
+        parser.add_argument(
+            '--direct',
+            type=int,
+            default=3,
+            help='Прямых отправок во все чаты для сравнения (по умолчанию 3)'
+        )
+        parser.add_argument('--latency', type=float, default=0.25, help='Задержка API, секунд (по умолчанию 0.25)')
+        parser.add_argument('--jitter', type=float, default=0.1, help='Разброс задержки, секунд (по умолчанию 0.1)')
+        parser.add_argument(
+            '--rate-limit-rate',
+            type=float,
+            default=0.02,
+            help='Доля ответов 429 (по умолчанию 0.02)'
+        )
+        parser.add_argument('--retry-after', type=int, default=1, help='retry_after в ответе 429 (по умолчанию 1)')
+        parser.add_argument('--error-rate', type=float, default=0.02, help='Доля ответов 502 (по умолчанию 0.02)')
+        parser.add_argument(
+            '--send-rate',
+            type=float,
+            default=None,
+            help='Общий лимит отправки, сообщений в секунду (по умолчанию TELEGRAM_RATE_LIMIT)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        send_rate = options['send_rate'] if options['send_rate'] is not None else settings.TELEGRAM_RATE_LIMIT
+        self.stdout.write(
+            f'Чатов: {options["chats"]}, задержка API {options["latency"]}+{options["jitter"]} с, '
+            f'429: {options["rate_limit_rate"]:.0%}, 502: {options["error_rate"]:.0%}, '
+            f'лимит отправки: {send_rate:g}/с, потоков: {settings.TELEGRAM_SEND_CONCURRENCY}'
+        )
+        
+        # Тысячи строк лога об отправке исказили бы замер
+        logger.disable('apps')
+        try:
+            with temporary_database(), fake_telegram(
+                latency=options['latency'],
+                jitter=options['jitter'],
+                rate_limit_rate=options['rate_limit_rate'],
+                retry_after=options['retry_after'],
+                error_rate=options['error_rate'],
+                seed=42
+            ) as api, override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                TELEGRAM_RATE_LIMIT=send_rate,
+                TELEGRAM_OUTBOX_RETRY_DELAY=0,
+                PAGE_CACHE_ENABLED=False
+            ):
+                TelegramChat.objects.bulk_create([
+                    TelegramChat(chat_id=100000 + index) for index in range(options['chats'])
+                ])
+                self.benchmark_form(options['forms'])
+                self.benchmark_direct(options['direct'])
+                self.benchmark_outbox(api)
+        finally:
+            logger.enable('apps')
+    
+    def report(self, title: str, timings: List[float]) -> None:
+        """Медиана и 95-й перцентиль в миллисекундах."""
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+        self.stdout.write(f'{title:<40}{statistics.median(timings):>12.1f}{p95:>12.1f}')
+    
+    def benchmark_form(self, count: int):
+        """Время ответа формы заявки (AJAX)."""
+        self.stdout.write(f'\n{"":<40}{"медиана, мс":>12}{"p95, мс":>12}')
+        client = Client()
+        timings = []
+        for index in range(count):
+            started = time.perf_counter()
+            client.post('/contacts/send/', {
+                'name': f'Клиент {index}',
+                'phone': '+7 (999) 123-45-67',
+                'message': 'Нужна вывеска',
+                'privacy_policy': 'on',
+            }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+            timings.append((time.perf_counter() - started) * 1000)
+        self.report('Форма заявки (очередь)', timings)
+    
+    def benchmark_direct(self, count: int):
+        """Прямая отправка во все чаты - столько ждала бы форма без очереди."""
+        if count <= 0:
+            return
+        message = format_contact_message('Клиент', '+7 (999) 123-45-67', message='Нужна вывеска')
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            send_telegram_message(message)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.report('Прямая отправка во все чаты', timings)
+    
+    def benchmark_outbox(self, api):
+        """Доставка накопленной очереди с повторами после сбоев."""
+        queued = TelegramNotification.objects.filter(status=TelegramNotification.Status.PENDING).count()
+        sent_before = len(api.sent)
+        started = time.perf_counter()
+        while deliver_due(20):
+            pass
+        elapsed = time.perf_counter() - started
+        
+        messages = len(api.sent) - sent_before
+        notifications = TelegramNotification.objects.all()
+        delivered = notifications.filter(status=TelegramNotification.Status.SENT).count()
+        dead = notifications.filter(status=TelegramNotification.Status.DEAD).count()
+        attempts = sum(notifications.values_list('attempts', flat=True))
+        
+        self.stdout.write(f'\nОчередь: {queued} уведомлений за {elapsed:.1f} с')
+        self.stdout.write(
+            f'  доставлено: {delivered}, не доставлено: {dead}, попыток: {attempts}'
+        )
+        self.stdout.write(
+            f'  сообщений: {messages} ({messages / elapsed:.1f}/с), '
+            f'уведомлений: {delivered / elapsed:.2f}/с'
+        )
+        self.stdout.write(f'  ответы API: {dict(sorted(api.statuses.items()))}')
@@ -0,0 +1,69 @@
+"""
+Management command: фоновая отправка уведомлений из очереди в Telegram.
+
+Забирает уведомления, которые пора отправить (см. apps.main.utils.outbox),
+и отправляет их во все активные чаты. Работает постоянно (systemd,
+telegram-outbox.service) или один раз с --once (cron).
+
+Использование:
+    python manage.py deliver_notifications
+    python manage.py deliver_notifications --once
+"""
+
+import signal
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from loguru import logger
+from apps.main.utils.outbox import deliver_due
+
+
+class Command(BaseCommand):
+    """Отправка уведомлений из очереди."""
+    
+    help = 'Отправляет уведомления о заявках из очереди в Telegram'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить то, что пора, и завершиться'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза между проверками очереди в секундах (по умолчанию 1)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Уведомлений за одну проверку (по умолчанию 20)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        if options['once']:
+            count = deliver_due(options['batch_size'])
+            self.stdout.write(f'Обработано уведомлений: {count}')
+            return
+        
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        logger.info('Отправка уведомлений запущена')
+        try:
+            while self.running:
+                # Долгоживущий процесс: соединение с базой не должно устаревать
+                close_old_connections()
+                count = deliver_due(options['batch_size'])
+                if count < options['batch_size']:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        logger.info('Отправка уведомлений остановлена')
+    
+    def stop(self, signum, frame):
+        """Завершение после текущей пачки (SIGTERM от systemd)."""
+        self.running = False
@@ -0,0 +1,96 @@
+"""
+Management command: поддельный Telegram Bot API для замеров без сети.
+
+Отвечает на getUpdates, sendMessage, setWebhook и другие методы бота
+(apps.main.utils.fake_telegram) и имитирует сбои Telegram: задержку,
+429 с retry_after и ошибки 5xx. Сайт, очередь уведомлений и бот
+подключаются к нему через TELEGRAM_API_URL.
+
+Использование:
+    python manage.py fake_telegram_api --latency 0.3 --rate-limit-rate 0.05 --error-rate 0.02
+    TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=123:token python manage.py deliver_notifications
+"""
+
+import time
+from django.core.management.base import BaseCommand
+from apps.main.utils.fake_telegram import FakeTelegramAPI, FakeTelegramServer
+
+
+class Command(BaseCommand):
+    """Поддельный Telegram Bot API."""
+    
+    help = 'Запускает поддельный Telegram Bot API с имитацией задержек и ошибок'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument('--host', default='127.0.0.1', help='Адрес (по умолчанию 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8081, help='Порт (по умолчанию 8081)')
+        parser.add_argument('--token', default='123:token', help='Токен бота (по умолчанию 123:token)')
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.0,
+            help='Задержка ответа в секундах'
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.0,
+            help='Случайная добавка к задержке, до N секунд'
+        )
+        parser.add_argument(
+            '--rate-limit-rate',
+            type=float,
+            default=0.0,
+            help='Доля запросов с ответом 429 (0-1)'
+        )
+        parser.add_argument(
+            '--retry-after',
+            type=int,
+            default=1,
+            help='retry_after в ответе 429, секунд (по умолчанию 1)'
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Доля запросов с ответом 502 (0-1)'
+        )
+        parser.add_argument(
+            '--stats-interval',
+            type=float,
+            default=10.0,
+            help='Как часто печатать статистику, секунд (по умолчанию 10)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        api = FakeTelegramAPI(
+            token=options['token'],
+            latency=options['latency'],
+            jitter=options['jitter'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            error_rate=options['error_rate']
+        )
+        server = FakeTelegramServer(api, options['host'], options['port']).start()
+        self.stdout.write(self.style.SUCCESS(f'Поддельный Bot API: {server.url} (токен {api.token})'))
+        self.stdout.write(f'Подключение: TELEGRAM_API_URL={server.url} TELEGRAM_BOT_TOKEN={api.token}')
+        
+        started = time.monotonic()
+        try:
+            while True:
+                time.sleep(options['stats_interval'])
+                elapsed = time.monotonic() - started
+                with api.condition:
+                    total = sum(api.statuses.values())
+                    statuses = ', '.join(f'{status}: {count}' for status, count in sorted(api.statuses.items()))
+                    sent = len(api.sent)
+                self.stdout.write(
+                    f'{elapsed:7.0f} с: запросов {total} ({total / elapsed:.1f}/с), '
+                    f'сообщений {sent} ({sent / elapsed:.1f}/с) [{statuses}]'
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
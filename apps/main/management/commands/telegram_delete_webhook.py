@@ -0,0 +1,39 @@
+"""
+Management command: отключение webhook Telegram бота (deleteWebhook).
+
+Нужно, чтобы вернуться к получению обновлений процессом telegram_bot.
+
+Использование:
+    python manage.py telegram_delete_webhook
+    python manage.py telegram_delete_webhook --drop-pending-updates
+"""
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.main.utils.telegram import TelegramAPIError, call_api
+
+
+class Command(BaseCommand):
+    """Отключение webhook Telegram бота."""
+    
+    help = 'Отключает webhook Telegram бота (для работы через telegram_bot)'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--drop-pending-updates',
+            action='store_true',
+            help='Удалить накопленные обновления'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError('Не задан TELEGRAM_BOT_TOKEN')
+        try:
+            call_api('deleteWebhook', drop_pending_updates=options['drop_pending_updates'])
+        except (TelegramAPIError, requests.exceptions.RequestException) as e:
+            raise CommandError(f'Ошибка Telegram API: {e}')
+        self.stdout.write(self.style.SUCCESS('Webhook отключен'))
+        self.stdout.write('Для получения обновлений запустите бота: sudo systemctl enable --now telegram-bot')
@@ -0,0 +1,74 @@
+"""
+Management command: регистрация webhook Telegram бота (setWebhook).
+
+После регистрации Telegram отправляет обновления на /telegram/webhook/
+сайта, процесс telegram_bot (long polling) больше не нужен: getUpdates
+при заданном webhook возвращает 409 Conflict.
+
+Использование:
+    python manage.py telegram_set_webhook
+    python manage.py telegram_set_webhook https://yarkiy-gorod.ru/telegram/webhook/
+    python manage.py telegram_set_webhook --drop-pending-updates
+"""
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.main.utils.telegram import TelegramAPIError, call_api
+
+
+class Command(BaseCommand):
+    """Регистрация webhook Telegram бота."""
+    
+    help = 'Регистрирует webhook Telegram бота (вместо процесса telegram_bot)'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            'url',
+            nargs='?',
+            default=None,
+            help='Адрес webhook (по умолчанию TELEGRAM_WEBHOOK_URL)'
+        )
+        parser.add_argument(
+            '--drop-pending-updates',
+            action='store_true',
+            help='Удалить обновления, накопленные до регистрации'
+        )
+        parser.add_argument(
+            '--max-connections',
+            type=int,
+            default=40,
+            help='Одновременных запросов от Telegram (1-100, по умолчанию 40)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        url = options['url'] or settings.TELEGRAM_WEBHOOK_URL
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError('Не задан TELEGRAM_BOT_TOKEN')
+        if not settings.TELEGRAM_WEBHOOK_SECRET:
+            raise CommandError('Не задан TELEGRAM_WEBHOOK_SECRET: без него webhook не принимает запросы')
+        if not url:
+            raise CommandError('Укажите адрес webhook или TELEGRAM_WEBHOOK_URL')
+        if not url.startswith('https://'):
+            raise CommandError('Telegram отправляет обновления только на https:// адреса')
+        
+        try:
+            call_api(
+                'setWebhook',
+                url=url,
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=['message'],
+                max_connections=options['max_connections'],
+                drop_pending_updates=options['drop_pending_updates']
+            )
+            info = call_api('getWebhookInfo')
+        except (TelegramAPIError, requests.exceptions.RequestException) as e:
+            raise CommandError(f'Ошибка Telegram API: {e}')
+        
+        self.stdout.write(self.style.SUCCESS(f'Webhook зарегистрирован: {info.get("url")}'))
+        self.stdout.write(f'Обновлений в очереди: {info.get("pending_update_count", 0)}')
+        if info.get('last_error_message'):
+            self.stdout.write(self.style.WARNING(f'Последняя ошибка доставки: {info["last_error_message"]}'))
+        self.stdout.write('Процесс telegram_bot больше не нужен: sudo systemctl disable --now telegram-bot')
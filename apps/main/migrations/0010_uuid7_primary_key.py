@@ -0,0 +1,53 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:20
+
+import apps.core.utils.uuid7
+from django.db import migrations, models
+
+
+# Значение по умолчанию вычисляется в Python и в схеме базы не хранится:
+# меняется только состояние моделей. AlterField пересоздал бы таблицы
+# в SQLite ради изменения, которого в базе нет
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_statistic'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='aboutus',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+                migrations.AlterField(
+                    model_name='sitesettings',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+                migrations.AlterField(
+                    model_name='slider',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+                migrations.AlterField(
+                    model_name='statistic',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+                migrations.AlterField(
+                    model_name='telegramchat',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+                migrations.AlterField(
+                    model_name='testimonial',
+                    name='uuid',
+                    field=models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_uuid7_primary_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slider',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='slider',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Размытая миниатюра (data URI), видна до загрузки изображения', verbose_name='Заглушка изображения'),
+        ),
+        migrations.AddField(
+            model_name='slider',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина изображения'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:08
+
+import apps.core.utils.uuid7
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_slider_image_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramNotification',
+            fields=[
+                ('uuid', models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Автоматически устанавливается при создании', verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Автоматически обновляется при изменении', verbose_name='Дата обновления')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('sent', 'Отправлено'), ('dead', 'Не доставлено')], default='pending', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка')),
+                ('chat_results', models.JSONField(blank=True, default=dict, verbose_name='Результаты по чатам')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Доставлено')),
+            ],
+            options={
+                'verbose_name': 'Telegram уведомление',
+                'verbose_name_plural': 'Telegram уведомления',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='main_telegr_status_7fb97b_idx')],
+            },
+        ),
+    ]
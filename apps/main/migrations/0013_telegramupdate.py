@@ -0,0 +1,28 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:14
+
+import apps.core.utils.uuid7
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_telegramnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramUpdate',
+            fields=[
+                ('uuid', models.UUIDField(default=apps.core.utils.uuid7.uuid7, editable=False, help_text='Уникальный идентификатор записи', primary_key=True, serialize=False, verbose_name='UUID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Автоматически устанавливается при создании', verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Автоматически обновляется при изменении', verbose_name='Дата обновления')),
+                ('update_id', models.BigIntegerField(unique=True, verbose_name='Update ID')),
+            ],
+            options={
+                'verbose_name': 'Telegram обновление',
+                'verbose_name_plural': 'Telegram обновления',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -6,8 +6,8 @@ from .slider import Slider
 from .about import AboutUs
 from .settings import SiteSettings
 from .testimonial import Testimonial
-from .telegram import TelegramChat
+from .telegram import TelegramChat, TelegramNotification, TelegramUpdate
 from .statistic import Statistic
 
-__all__ = ['Slider', 'AboutUs', 'SiteSettings', 'Testimonial', 'TelegramChat', 'Statistic']
+__all__ = ['Slider', 'AboutUs', 'SiteSettings', 'Testimonial', 'TelegramChat', 'TelegramNotification', 'TelegramUpdate', 'Statistic']
 
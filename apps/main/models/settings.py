@@ -104,4 +104,15 @@ class SiteSettings(BaseModel):
                 uuid=self.uuid
             ).update(is_active=False)
         super().save(*args, **kwargs)
+        
+        # Снимок настроек в воркерах должен перечитаться
+        from apps.core.site_settings import bump_version
+        bump_version()
+    
+    def delete(self, *args, **kwargs):
+        """Удаление с обновлением снимка настроек."""
+        result = super().delete(*args, **kwargs)
+        from apps.core.site_settings import bump_version
+        bump_version()
+        return result
 
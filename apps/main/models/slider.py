@@ -15,6 +15,8 @@ class Slider(BaseModel):
         title: Заголовок слайда
         subtitle: Подзаголовок
         image: Изображение для слайда
+        image_width, image_height: Размеры изображения
+        image_placeholder: Размытая миниатюра для показа до загрузки
         button_text: Текст кнопки
         button_link: Ссылка кнопки
         order: Порядок отображения
@@ -40,6 +42,27 @@ class Slider(BaseModel):
         help_text='Рекомендуемый размер: 1920x800px'
     )
     
+    image_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Ширина изображения'
+    )
+    
+    image_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Высота изображения'
+    )
+    
+    image_placeholder = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Заглушка изображения',
+        help_text='Размытая миниатюра (data URI), видна до загрузки изображения'
+    )
+    
     button_text = models.CharField(
         max_length=50,
         verbose_name='Текст кнопки',
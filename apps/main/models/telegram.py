@@ -1,8 +1,10 @@
 """
-Модель для хранения Telegram chat_id.
+Модели Telegram: чаты для уведомлений, очередь уведомлений (outbox)
+и полученные через webhook обновления.
 """
 
 from django.db import models
+from django.utils import timezone
 from apps.core.models import BaseModel
 
 
@@ -53,3 +55,105 @@ class TelegramChat(BaseModel):
     def __str__(self) -> str:
         name = self.first_name or self.username or f"Chat {self.chat_id}"
         return f"{name} ({self.chat_id})"
+
+
+class TelegramNotification(BaseModel):
+    """
+    Уведомление в очереди на отправку в Telegram (transactional outbox).
+    
+    Создаётся в той же транзакции, что и обращение, поэтому уведомление
+    есть тогда и только тогда, когда обращение сохранено. Отправляет его
+    фоновый процесс (команда deliver_notifications) во все активные чаты.
+    
+    Поля:
+        text: Текст сообщения (HTML)
+        status: Статус доставки
+        attempts: Количество попыток отправки
+        next_attempt_at: Когда пробовать следующий раз
+        chat_results: Результат по чатам {chat_id: 'sent' | текст ошибки};
+            чаты из этого словаря при повторных попытках пропускаются
+        last_error: Последняя ошибка (для повторяемых ошибок)
+        sent_at: Когда доставка завершена
+    """
+    
+    class Status(models.TextChoices):
+        """Статусы доставки."""
+        PENDING = 'pending', 'В очереди'
+        SENT = 'sent', 'Отправлено'
+        DEAD = 'dead', 'Не доставлено'
+    
+    text = models.TextField(
+        verbose_name='Текст'
+    )
+    
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    
+    chat_results = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Результаты по чатам'
+    )
+    
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Доставлено'
+    )
+    
+    class Meta:
+        verbose_name = 'Telegram уведомление'
+        verbose_name_plural = 'Telegram уведомления'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self) -> str:
+        return f"{self.get_status_display()}: {self.text[:50]}"
+
+
+class TelegramUpdate(BaseModel):
+    """
+    Обновление, полученное через webhook.
+    
+    Telegram повторяет доставку, если не получил ответ вовремя, поэтому
+    update_id запоминается в той же транзакции, что и обработка: повтор
+    уже обработанного обновления пропускается. Старые записи удаляются
+    (повторы приходят в пределах суток).
+    
+    Поля:
+        update_id: ID обновления в Telegram
+    """
+    
+    update_id = models.BigIntegerField(
+        unique=True,
+        verbose_name='Update ID'
+    )
+    
+    class Meta:
+        verbose_name = 'Telegram обновление'
+        verbose_name_plural = 'Telegram обновления'
+        ordering = ['-created_at']
+    
+    def __str__(self) -> str:
+        return str(self.update_id)
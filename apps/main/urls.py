@@ -4,7 +4,7 @@ URL маршруты для главного приложения.
 
 from django.urls import path
 from django.views.generic import TemplateView
-from apps.main.views import HomeView, AboutView, PrivacyView, robots_txt
+from apps.main.views import HomeView, AboutView, PrivacyView, robots_txt, telegram_webhook
 
 app_name = 'main'
 
@@ -13,5 +13,6 @@ urlpatterns = [
     path('about/', AboutView.as_view(), name='about'),
     path('privacy/', PrivacyView.as_view(), name='privacy'),
     path('robots.txt', robots_txt, name='robots_txt'),
+    path('telegram/webhook/', telegram_webhook, name='telegram_webhook'),
 ]
 
@@ -0,0 +1,314 @@
+"""
+Telegram бот подписки на уведомления (long polling на asyncio).
+
+Один цикл получает обновления getUpdates с долгим ожиданием
+(POLL_TIMEOUT секунд: запрос висит, пока нет сообщений, поэтому
+в простое нет ни лишних запросов к API, ни нагрузки на процессор),
+а каждое обновление обрабатывается отдельной задачей: пачка /start
+обрабатывается параллельно, не дожидаясь ответов по одному.
+
+HTTP-клиента на asyncio в зависимостях нет, поэтому запросы выполняются
+через requests в потоках (общая keep-alive сессия и ограничения частоты
+из apps.main.utils.telegram), а запись в базу - через sync_to_async
+в отдельном потоке Django.
+
+Получение обновления подтверждается (offset следующего getUpdates)
+только после его обработки: offset не уходит дальше самого раннего
+обновления, которое ещё обрабатывается. Если бот остановится или упадёт
+посреди обработки, Telegram вернёт такие обновления при следующем
+запуске (обработка /start повторяема: подписка и тот же ответ).
+
+Ошибки сети и API не останавливают бота: цикл повторяет запрос
+с растущей задержкой. По stop() (SIGTERM от systemd) новые обновления
+не запрашиваются, а начатые дообрабатываются.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+import requests
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connections
+from loguru import logger
+from apps.main.models import TelegramChat
+from apps.main.utils.telegram import api_url, get_session, send_to_chat
+
+
+# Долгое ожидание getUpdates в секундах (Telegram держит запрос до 50 с)
+POLL_TIMEOUT = 50
+
+# Задержка после ошибки: удваивается до MAX_RETRY_DELAY
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+# Сколько ждать начатые обработчики при остановке
+SHUTDOWN_TIMEOUT = 10
+
+SUBSCRIBED_TEXT = '✅ Вы успешно подписаны на уведомления о новых заявках!'
+HINT_TEXT = 'Отправьте /start для подписки на уведомления о новых заявках.'
+
+
+def get_updates(token: str, offset: int, timeout: int = POLL_TIMEOUT) -> List[Dict]:
+    """
+    Новые обновления (getUpdates с долгим ожиданием).
+    
+    Raises:
+        requests.exceptions.RequestException: Ошибка сети или HTTP
+        ValueError: API вернул ok=false
+    """
+    response = get_session().get(
+        api_url(token, 'getUpdates'),
+        params={'offset': offset, 'timeout': timeout, 'allowed_updates': '["message"]'},
+        timeout=timeout + 10
+    )
+    response.raise_for_status()
+    data = response.json()
+    if not data.get('ok'):
+        raise ValueError(f'Ошибка API Telegram: {data}')
+    return data.get('result', [])
+
+
+def subscribe_chat(chat: Dict) -> bool:
+    """
+    Подписывает чат на уведомления (или обновляет его данные).
+    
+    Returns:
+        True, если чат новый
+    """
+    _, created = TelegramChat.objects.update_or_create(
+        chat_id=chat['id'],
+        defaults={
+            'username': chat.get('username', ''),
+            'first_name': chat.get('first_name', ''),
+            'is_active': True
+        }
+    )
+    return created
+
+
+def handle_message(update: Dict) -> Optional[Tuple[int, str]]:
+    """
+    Обрабатывает обновление: /start подписывает чат, на остальное - подсказка.
+    
+    Общая часть long polling (BotRunner) и webhook (apps.main.views).
+    
+    Returns:
+        (chat_id, текст ответа) или None, если отвечать не нужно
+    """
+    message = update.get('message')
+    if not message:
+        return None
+    chat = message.get('chat', {})
+    chat_id = chat.get('id')
+    if chat_id is None:
+        return None
+    
+    if message.get('text', '') == '/start':
+        subscribe_chat(chat)
+        logger.info(
+            f'Новый Telegram чат зарегистрирован: {chat_id} '
+            f'({chat.get("first_name") or chat.get("username", "")})'
+        )
+        return chat_id, SUBSCRIBED_TEXT
+    return chat_id, HINT_TEXT
+
+
+def handle_in_thread(update: Dict) -> Optional[Tuple[int, str]]:
+    """handle_message в потоке базы данных бота."""
+    # Поток базы данных живёт столько же, сколько бот
+    close_old_connections()
+    return handle_message(update)
+
+
+def run_in_daemon_thread(func, *args) -> asyncio.Future:
+    """
+    Выполняет func в фоновом потоке и возвращает future для await.
+    
+    В отличие от run_in_executor, незавершённый запрос (долгое ожидание
+    getUpdates) не задерживает выход из процесса после остановки бота.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def set_result(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def target():
+        try:
+            result, error = func(*args), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(set_result, result, error)
+        except RuntimeError:
+            # Цикл событий уже закрыт - бот остановлен
+            pass
+    
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+class BotRunner:
+    """Цикл получения и параллельной обработки обновлений."""
+    
+    def __init__(self, token: str, concurrency: int = 16, retry_delay: float = RETRY_DELAY):
+        self.token = token
+        self.concurrency = concurrency
+        self.retry_delay = retry_delay
+        # offset для getUpdates: всё, что раньше него, обработано
+        self.offset = 0
+        # offset последнего запроса getUpdates (что уже подтверждено Telegram)
+        self.confirmed_offset = 0
+        # Последнее обновление, принятое в обработку, и обрабатываемые сейчас
+        self.last_update_id: Optional[int] = None
+        self.in_progress: Set[int] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.stopping: Optional[asyncio.Event] = None
+    
+    def stop(self) -> None:
+        """Остановка после текущих обработчиков (вызывается в цикле событий)."""
+        if self.stopping is not None:
+            self.stopping.set()
+    
+    async def run(self) -> None:
+        """Получает обновления, пока не вызван stop()."""
+        self.stopping = asyncio.Event()
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.http = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='telegram-bot')
+        self.handle = sync_to_async(handle_in_thread, thread_sensitive=True)
+        delay = self.retry_delay
+        try:
+            while not self.stopping.is_set():
+                try:
+                    updates = await self.poll()
+                except requests.exceptions.HTTPError as e:
+                    if e.response is not None and e.response.status_code == 409:
+                        # Обновления получает другой экземпляр бота или задан webhook
+                        logger.debug('Конфликт получения обновлений (409) - работает другой экземпляр бота')
+                    else:
+                        logger.error(f'Ошибка при запросе к Telegram API: {e}')
+                    await self.sleep(delay)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                except Exception as e:
+                    logger.error(f'Ошибка получения обновлений Telegram: {e}')
+                    await self.sleep(delay)
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                
+                delay = self.retry_delay
+                started = 0
+                for update in updates or []:
+                    update_id = update['update_id']
+                    if self.last_update_id is not None and update_id <= self.last_update_id:
+                        # Ещё обрабатывается: offset до него не подтверждён
+                        continue
+                    self.start(update)
+                    started += 1
+                if updates and not started:
+                    # Telegram вернул только обрабатываемые обновления и вернёт их
+                    # сразу снова: следующий запрос - после завершения хотя бы одного
+                    await self.wait_for_tasks()
+        finally:
+            await self.shutdown()
+    
+    def start(self, update: Dict) -> None:
+        """Запускает обработку обновления отдельной задачей."""
+        update_id = update['update_id']
+        self.last_update_id = update_id
+        self.in_progress.add(update_id)
+        self.offset = min(self.in_progress)
+        task = asyncio.create_task(self.process(update))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        task.add_done_callback(lambda task: self.finish(update_id, task))
+    
+    def finish(self, update_id: int, task: asyncio.Task) -> None:
+        """Сдвигает offset после обработки (прерванная обработка его не сдвигает)."""
+        if task.cancelled():
+            return
+        self.in_progress.discard(update_id)
+        self.offset = min(self.in_progress) if self.in_progress else self.last_update_id + 1
+    
+    async def wait_for_tasks(self) -> None:
+        """Ждёт завершения одной из задач или остановки."""
+        if not self.tasks:
+            return
+        stopping = asyncio.ensure_future(self.stopping.wait())
+        try:
+            await asyncio.wait(set(self.tasks) | {stopping}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopping.cancel()
+    
+    async def poll(self) -> Optional[List[Dict]]:
+        """Ждёт обновлений или остановки (тогда возвращает None)."""
+        self.confirmed_offset = self.offset
+        request = run_in_daemon_thread(get_updates, self.token, self.offset)
+        stopping = asyncio.ensure_future(self.stopping.wait())
+        try:
+            await asyncio.wait({request, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopping.cancel()
+        if not request.done():
+            request.cancel()
+            return None
+        return request.result()
+    
+    async def sleep(self, seconds: float) -> None:
+        """Пауза, которую прерывает остановка."""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def shutdown(self) -> None:
+        if self.tasks:
+            logger.info(f'Завершение обработки {len(self.tasks)} обновлений...')
+            done, pending = await asyncio.wait(set(self.tasks), timeout=SHUTDOWN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+                logger.warning(f'Обработка {len(pending)} обновлений прервана, они будут получены снова')
+        await self.confirm()
+        self.http.shutdown(wait=False, cancel_futures=True)
+        # Соединение потока базы данных бота иначе осталось бы открытым
+        await sync_to_async(connections.close_all, thread_sensitive=True)()
+    
+    async def confirm(self) -> None:
+        """
+        Подтверждает обработанные обновления перед выходом.
+        
+        Иначе их подтвердил бы только getUpdates следующего запуска,
+        и они были бы обработаны повторно.
+        """
+        if self.offset == self.confirmed_offset:
+            return
+        try:
+            await asyncio.wait_for(run_in_daemon_thread(get_updates, self.token, self.offset, 0), SHUTDOWN_TIMEOUT)
+            self.confirmed_offset = self.offset
+        except Exception as e:
+            logger.warning(f'Не удалось подтвердить обработанные обновления Telegram: {e}')
+    
+    async def process(self, update: Dict) -> None:
+        """Обрабатывает одно обновление; ошибка не влияет на остальные."""
+        async with self.semaphore:
+            try:
+                await self.handle_update(update)
+            except Exception as e:
+                logger.error(f'Ошибка обработки обновления {update.get("update_id")}: {e}')
+    
+    async def handle_update(self, update: Dict) -> None:
+        reply = await self.handle(update)
+        if reply:
+            await self.reply(*reply)
+    
+    async def reply(self, chat_id: int, text: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.http, send_to_chat, self.token, chat_id, text)
@@ -0,0 +1,284 @@
+"""
+Поддельный Telegram Bot API для тестов и замеров без сети.
+
+FakeTelegramAPI хранит состояние бота (webhook, очередь входящих
+обновлений, отправленные сообщения) и отвечает в формате Bot API на
+getUpdates (с долгим ожиданием), sendMessage, setWebhook, deleteWebhook,
+getWebhookInfo и getMe. Умеет имитировать сбои Telegram: задержку
+ответа, 429 Too Many Requests с retry_after и ошибки 5xx с заданной
+долей запросов.
+
+FakeTelegramServer отдаёт API по HTTP (keep-alive, поток на соединение):
+код под тестом ходит в него через TELEGRAM_API_URL так же, как в
+настоящий api.telegram.org.
+
+Использование:
+    python manage.py fake_telegram_api --latency 0.3 --rate-limit-rate 0.05
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python manage.py deliver_notifications
+    
+    with fake_telegram(latency=0.2) as api:
+        send_telegram_message('Заявка')
+        api.sent  # [{'chat_id': ..., 'text': ...}]
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+from django.test.utils import override_settings
+
+
+class FakeTelegramAPI:
+    """
+    Состояние и методы поддельного Bot API (потокобезопасно).
+    
+    Args:
+        token: Токен бота; с другим токеном API отвечает 401
+        latency: Задержка каждого ответа в секундах
+        jitter: Случайная добавка к задержке, до jitter секунд
+        rate_limit_rate: Доля запросов с ответом 429
+        retry_after: retry_after в ответе 429
+        error_rate: Доля запросов с ответом 502
+        seed: Зерно генератора сбоев (для повторяемых замеров)
+    """
+    
+    def __init__(self, token: str = '123:token', latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: int = 1, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.condition = threading.Condition()
+        self.webhook: Dict = {}
+        self.updates: List[Dict] = []
+        self.sent: List[Dict] = []
+        self.calls: List[str] = []
+        self.statuses: Counter = Counter()
+        self.next_update_id = 1
+    
+    def add_message(self, chat_id: int, text: str) -> Dict:
+        """Добавляет входящее сообщение в очередь обновлений."""
+        with self.condition:
+            update = {
+                'update_id': self.next_update_id,
+                'message': {
+                    'message_id': self.next_update_id,
+                    'chat': {'id': chat_id, 'type': 'private', 'first_name': f'Менеджер {chat_id}'},
+                    'text': text,
+                },
+            }
+            self.next_update_id += 1
+            self.updates.append(update)
+            self.condition.notify_all()
+        return update
+    
+    def call(self, token: str, method: str, params: Dict) -> Tuple[int, Dict]:
+        """
+        Вызов метода.
+        
+        Returns:
+            (HTTP статус, тело ответа)
+        """
+        delay = self.latency
+        with self.condition:
+            self.calls.append(method)
+            if self.jitter:
+                delay += self.random.uniform(0, self.jitter)
+            fault = self.random.random()
+        if delay:
+            time.sleep(delay)
+        
+        if token != self.token:
+            status, body = self.error(401, 'Unauthorized')
+        elif fault < self.rate_limit_rate:
+            status, body = self.error(429, f'Too Many Requests: retry after {self.retry_after}')
+            body['parameters'] = {'retry_after': self.retry_after}
+        elif fault < self.rate_limit_rate + self.error_rate:
+            status, body = self.error(502, 'Bad Gateway')
+        else:
+            handler = getattr(self, f'method_{method}', None)
+            if handler is None:
+                status, body = self.error(404, 'Not Found')
+            else:
+                with self.condition:
+                    status, body = handler(params)
+        
+        with self.condition:
+            self.statuses[status] += 1
+        return status, body
+    
+    def ok(self, result) -> Tuple[int, Dict]:
+        return 200, {'ok': True, 'result': result}
+    
+    def error(self, status: int, description: str) -> Tuple[int, Dict]:
+        return status, {'ok': False, 'error_code': status, 'description': description}
+    
+    def method_getMe(self, params):
+        return self.ok({'id': 123, 'is_bot': True, 'username': 'fake_bot'})
+    
+    def method_sendMessage(self, params):
+        if 'chat_id' not in params or not params.get('text'):
+            return self.error(400, 'Bad Request: message text is empty')
+        self.sent.append({'chat_id': int(params['chat_id']), 'text': params['text']})
+        return self.ok({'message_id': len(self.sent), 'chat': {'id': params['chat_id']}, 'text': params['text']})
+    
+    def method_setWebhook(self, params):
+        url = params.get('url', '')
+        if url and not url.startswith('https://'):
+            return self.error(400, 'Bad Request: bad webhook: HTTPS url must be provided for webhook')
+        if params.get('drop_pending_updates'):
+            self.updates = []
+        self.webhook = dict(params) if url else {}
+        return self.ok(True)
+    
+    def method_deleteWebhook(self, params):
+        if params.get('drop_pending_updates'):
+            self.updates = []
+        self.webhook = {}
+        return self.ok(True)
+    
+    def method_getWebhookInfo(self, params):
+        return self.ok({'url': self.webhook.get('url', ''), 'pending_update_count': len(self.updates)})
+    
+    def method_getUpdates(self, params):
+        """Обновления с update_id >= offset; без них ждёт до timeout секунд."""
+        if self.webhook:
+            return self.error(409, "Conflict: can't use getUpdates method while webhook is active")
+        offset = int(params.get('offset') or 0)
+        self.updates = [update for update in self.updates if update['update_id'] >= offset]
+        # Условие ожидания - self.condition: метод вызывается под ним
+        self.condition.wait_for(lambda: self.updates, timeout=float(params.get('timeout') or 0))
+        return self.ok(list(self.updates))
+    
+    def deliver_webhook(self, client, path: str = '/telegram/webhook/') -> List[int]:
+        """
+        Доставляет очередь обновлений на webhook, как это делает Telegram.
+        
+        Обновление удаляется из очереди только после ответа 200; метод
+        из тела ответа (sendMessage) выполняется так же, как при вызове API.
+        
+        Args:
+            client: Тестовый клиент Django (django.test.Client)
+            path: Путь webhook на сайте
+        
+        Returns:
+            HTTP статусы ответов webhook
+        """
+        statuses = []
+        for update in list(self.updates):
+            response = client.post(
+                path,
+                data=json.dumps(update),
+                content_type='application/json',
+                HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=self.webhook.get('secret_token', '')
+            )
+            statuses.append(response.status_code)
+            if response.status_code != 200:
+                continue
+            with self.condition:
+                self.updates.remove(update)
+            if response.get('Content-Type') == 'application/json':
+                body = json.loads(response.content)
+                self.call(self.token, body.pop('method'), body)
+        return statuses
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """HTTP обработчик: /bot<token>/<method>, параметры в query, JSON или форме."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.dispatch()
+    
+    def do_POST(self):
+        self.dispatch()
+    
+    def dispatch(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        
+        if len(parts) != 2 or not parts[0].startswith('bot'):
+            status, data = 404, {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+        else:
+            try:
+                if body and self.headers.get('Content-Type', '').startswith('application/json'):
+                    params.update(json.loads(body))
+                elif body:
+                    params.update(parse_qsl(body.decode()))
+            except ValueError:
+                status, data = 400, {'ok': False, 'error_code': 400, 'description': 'Bad Request'}
+            else:
+                status, data = self.server.api.call(parts[0][len('bot'):], parts[1], params)
+        
+        content = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+    
+    def log_message(self, format, *args):
+        # Запросы не пишутся в stderr: при замерах их тысячи
+        pass
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    """HTTP сервер поддельного Bot API."""
+    
+    daemon_threads = True
+    
+    def __init__(self, api: FakeTelegramAPI, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), FakeTelegramHandler)
+        self.api = api
+        self.thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Адрес для TELEGRAM_API_URL."""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    def start(self) -> 'FakeTelegramServer':
+        """Запускает сервер в фоновом потоке."""
+        self.thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+        self.thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def fake_telegram(**options):
+    """
+    Поддельный Bot API на свободном порту на время блока.
+    
+    TELEGRAM_API_URL указывает на него, TELEGRAM_BOT_TOKEN - его токен.
+    
+    Args:
+        **options: Аргументы FakeTelegramAPI (latency, error_rate...)
+    
+    Yields:
+        FakeTelegramAPI
+    """
+    api = FakeTelegramAPI(**options)
+    server = FakeTelegramServer(api).start()
+    try:
+        with override_settings(TELEGRAM_API_URL=server.url, TELEGRAM_BOT_TOKEN=api.token):
+            yield api
+    finally:
+        server.stop()
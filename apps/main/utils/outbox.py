@@ -0,0 +1,192 @@
+"""
+Очередь уведомлений Telegram (transactional outbox).
+
+Уведомление о заявке записывается строкой TelegramNotification в той же
+транзакции, что и само обращение, а отправляет его отдельный процесс
+(python manage.py deliver_notifications). Ответ посетителю не ждёт
+Telegram API; если API недоступен, отправка повторяется с
+экспоненциальной задержкой, а после TELEGRAM_OUTBOX_MAX_ATTEMPTS
+попыток уведомление помечается как недоставленное (видно в админке,
+там же его можно отправить заново).
+"""
+
+import random
+from datetime import timedelta
+from typing import Optional
+from django.conf import settings
+from django.utils import timezone
+from loguru import logger
+from apps.main.models import TelegramChat, TelegramNotification
+from apps.main.utils.telegram import send_to_chats
+
+
+# На это время уведомление занято процессом, который его отправляет;
+# если процесс упадёт, уведомление снова станет доступно после него.
+# Уведомления занимаются по одному непосредственно перед отправкой,
+# поэтому время занятия - это время отправки одного уведомления
+CLAIM_TIMEOUT = timedelta(minutes=2)
+
+# Сколько ближайших уведомлений пробовать занять за один вызов claim_next
+CLAIM_CANDIDATES = 10
+
+
+def enqueue_notification(text: str) -> TelegramNotification:
+    """
+    Ставит уведомление в очередь.
+    
+    Вызывается внутри транзакции, в которой сохраняются данные заявки.
+    """
+    return TelegramNotification.objects.create(text=text)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Задержка перед следующей попыткой: удваивается с каждой попыткой, с разбросом до 10%."""
+    delay = min(
+        settings.TELEGRAM_OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0),
+        settings.TELEGRAM_OUTBOX_RETRY_MAX_DELAY
+    )
+    return timedelta(seconds=delay * random.uniform(1, 1.1))
+
+
+def claim_next() -> Optional[TelegramNotification]:
+    """
+    Занимает одно уведомление, которое пора отправить.
+    
+    Уведомление занимается условным UPDATE (сдвигом next_attempt_at
+    на CLAIM_TIMEOUT): если его одновременно забрал другой процесс,
+    UPDATE не найдёт строку и берётся следующее. Работает одинаково
+    на SQLite и PostgreSQL, без блокировок строк.
+    
+    Returns:
+        Уведомление, у которого next_attempt_at - время окончания
+        занятия (по нему deliver проверяет, что занятие не потеряно),
+        или None, если отправлять нечего
+    """
+    now = timezone.now()
+    due = list(
+        TelegramNotification.objects
+        .filter(status=TelegramNotification.Status.PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at')
+        .values_list('pk', 'next_attempt_at')[:CLAIM_CANDIDATES]
+    )
+    lease = now + CLAIM_TIMEOUT
+    for pk, next_attempt_at in due:
+        updated = TelegramNotification.objects.filter(
+            pk=pk,
+            status=TelegramNotification.Status.PENDING,
+            next_attempt_at=next_attempt_at
+        ).update(next_attempt_at=lease)
+        if updated:
+            return TelegramNotification.objects.get(pk=pk)
+    return None
+
+
+def deliver(notification: TelegramNotification) -> bool:
+    """
+    Отправляет уведомление в активные чаты, которым оно ещё не доставлено.
+    
+    Постоянные ошибки (чат удалён, бот заблокирован) записываются
+    в chat_results и не повторяются; временные оставляют уведомление
+    в очереди до следующей попытки. Если ни в один чат уведомление
+    не доставлено и повторять нечего, оно помечается недоставленным.
+    
+    Результат записывается, только если уведомление всё ещё занято этим
+    процессом (next_attempt_at не изменился с claim_next): иначе после
+    истечения CLAIM_TIMEOUT его уже забрал другой процесс.
+    
+    Returns:
+        True, если результат записан
+    """
+    lease = notification.next_attempt_at
+    done = set(notification.chat_results)
+    chat_ids = [
+        chat_id
+        for chat_id in TelegramChat.objects.filter(is_active=True).values_list('chat_id', flat=True)
+        if str(chat_id) not in done
+    ]
+    
+    errors = []
+    retry_after = 0
+    if not chat_ids and not done:
+        errors.append('Нет активных Telegram чатов')
+    for chat_id, result in send_to_chats(notification.text, chat_ids).items():
+        if result.ok:
+            notification.chat_results[str(chat_id)] = 'sent'
+        elif result.retry:
+            errors.append(f'{chat_id}: {result.error}')
+            retry_after = max(retry_after, result.retry_after)
+        else:
+            notification.chat_results[str(chat_id)] = result.error
+    
+    notification.attempts += 1
+    now = timezone.now()
+    if not errors and 'sent' in notification.chat_results.values():
+        notification.status = TelegramNotification.Status.SENT
+        notification.sent_at = now
+        notification.last_error = ''
+    elif not errors:
+        # Во все чаты - постоянные ошибки: повтор не поможет
+        notification.status = TelegramNotification.Status.DEAD
+        notification.last_error = '\n'.join(
+            f'{chat_id}: {error}' for chat_id, error in notification.chat_results.items()
+        )
+        logger.error(f'Уведомление {notification.pk} не доставлено ни в один чат: {notification.last_error}')
+    elif notification.attempts >= settings.TELEGRAM_OUTBOX_MAX_ATTEMPTS:
+        notification.status = TelegramNotification.Status.DEAD
+        notification.last_error = '\n'.join(errors)
+        logger.error(
+            f'Уведомление {notification.pk} не доставлено после {notification.attempts} попыток: '
+            f'{notification.last_error}'
+        )
+    else:
+        # Не раньше, чем разрешил Telegram (429 с retry_after)
+        notification.next_attempt_at = now + max(retry_delay(notification.attempts), timedelta(seconds=retry_after))
+        notification.last_error = '\n'.join(errors)
+        logger.warning(
+            f'Уведомление {notification.pk} не доставлено (попытка {notification.attempts}), '
+            f'повтор в {timezone.localtime(notification.next_attempt_at):%H:%M:%S}: {notification.last_error}'
+        )
+    
+    saved = TelegramNotification.objects.filter(
+        pk=notification.pk,
+        status=TelegramNotification.Status.PENDING,
+        next_attempt_at=lease
+    ).update(
+        status=notification.status,
+        attempts=notification.attempts,
+        next_attempt_at=notification.next_attempt_at,
+        chat_results=notification.chat_results,
+        last_error=notification.last_error,
+        sent_at=notification.sent_at,
+        updated_at=now
+    )
+    if not saved:
+        logger.warning(
+            f'Уведомление {notification.pk} занято другим процессом (отправка дольше {CLAIM_TIMEOUT}), '
+            f'результат попытки не записан'
+        )
+    return bool(saved)
+
+
+def deliver_due(limit: int = 20) -> int:
+    """
+    Отправляет до limit уведомлений, которые пора отправить.
+    
+    Каждое уведомление занимается непосредственно перед отправкой,
+    поэтому занятие не истекает, пока отправляются предыдущие.
+    
+    Returns:
+        Количество обработанных уведомлений
+    """
+    count = 0
+    while count < limit:
+        notification = claim_next()
+        if notification is None:
+            break
+        count += 1
+        try:
+            deliver(notification)
+        except Exception as e:
+            # Уведомление останется занятым до CLAIM_TIMEOUT и будет отправлено позже
+            logger.error(f'Ошибка отправки уведомления {notification.pk}: {e}')
+    return count
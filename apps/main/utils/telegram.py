@@ -1,17 +1,290 @@
 """
 Утилиты для работы с Telegram ботом.
+
+Сообщение в несколько чатов отправляется параллельно (пул потоков до
+TELEGRAM_SEND_CONCURRENCY) через одну сессию requests с keep-alive:
+соединение с Bot API (TELEGRAM_API_URL) не открывается заново для каждого чата,
+и отправка 50 менеджерам занимает примерно одно обращение к API.
+
+Ограничения Telegram соблюдаются на стороне отправителя: не больше
+TELEGRAM_RATE_LIMIT сообщений в секунду всего и не чаще одного
+сообщения в TELEGRAM_CHAT_INTERVAL секунд в один чат. Ответ 429
+приостанавливает всю отправку процесса на retry_after; retry_after
+до TELEGRAM_MAX_RETRY_AFTER секунд ожидается на месте, более долгий
+возвращается как временная ошибка с retry_after (повтор - в очереди,
+не раньше окончания паузы). Пока идёт долгая пауза, сообщения в API
+не отправляются и сразу возвращаются с той же ошибкой.
 """
 
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, NamedTuple, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
 from django.conf import settings
 from apps.main.models import TelegramChat
 
 
+# Повторов одного сообщения после 429 внутри одной отправки
+MAX_RATE_LIMIT_RETRIES = 2
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class TelegramAPIError(Exception):
+    """Telegram API вернул ошибку (ok=false) или неожиданный ответ."""
+
+
+class SendResult(NamedTuple):
+    """
+    Результат отправки в один чат.
+    
+    ok: сообщение доставлено; retry: ошибка временная (сеть, 429, 5xx),
+    отправку стоит повторить; иначе ошибка постоянная (чат удалён,
+    бот заблокирован) и повтор не поможет; status_code: HTTP статус
+    ответа API с ошибкой (0 - ответа не было); retry_after: через
+    сколько секунд можно повторить (0 - не ограничено, ответ 429
+    без retry_after или другая ошибка).
+    """
+    
+    ok: bool
+    error: str = ''
+    retry: bool = False
+    status_code: int = 0
+    retry_after: int = 0
+
+
+class RateLimiter:
+    """
+    Ограничение частоты отправки: общее и по каждому чату.
+    
+    Общее - "ведро токенов" на TELEGRAM_RATE_LIMIT сообщений в секунду
+    (с запасом на секунду вперёд), по чату - время, раньше которого
+    следующее сообщение в него не отправляется. Ответ 429 приостанавливает
+    и общую отправку на retry_after: превышен может быть общий лимит бота,
+    и остальные потоки получили бы тот же 429. Общий на процесс,
+    потокобезопасный.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._updated = 0.0
+        self._paused_until = 0.0
+        self._chat_ready: Dict[int, float] = {}
+    
+    def acquire(self, chat_id: int, max_pause: Optional[float] = None) -> Optional[float]:
+        """
+        Ждёт, пока можно отправить сообщение в чат.
+        
+        Args:
+            chat_id: Чат
+            max_pause: Паузу после 429 дольше этого не ждать (None - ждать любую)
+        
+        Returns:
+            None, если можно отправлять, иначе оставшаяся пауза в секундах
+            (больше max_pause)
+        """
+        interval = settings.TELEGRAM_CHAT_INTERVAL
+        with self._lock:
+            now = time.monotonic()
+            ready = max(now, self._chat_ready.get(chat_id, 0.0))
+            self._chat_ready[chat_id] = ready + interval
+        if ready > now:
+            time.sleep(ready - now)
+        
+        rate = settings.TELEGRAM_RATE_LIMIT
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                    if max_pause is not None and wait > max_pause:
+                        return wait
+                elif rate <= 0:
+                    return None
+                else:
+                    self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return None
+                    wait = (1 - self._tokens) / rate
+            time.sleep(wait)
+    
+    def delay_chat(self, chat_id: int, seconds: float) -> None:
+        """Откладывает отправку в чат (ответ 429 с retry_after)."""
+        with self._lock:
+            ready = time.monotonic() + seconds
+            self._chat_ready[chat_id] = max(self._chat_ready.get(chat_id, 0.0), ready)
+    
+    def pause(self, seconds: float) -> None:
+        """Приостанавливает всю отправку (ответ 429 с retry_after)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # Токены за время паузы не копятся: после неё - обычная частота, без всплеска
+            self._tokens = 0.0
+            self._updated = max(self._updated, self._paused_until)
+
+
+rate_limiter = RateLimiter()
+
+
+def get_session() -> requests.Session:
+    """
+    Сессия с keep-alive для запросов к Telegram API (одна на процесс).
+    
+    Пул соединений не меньше числа потоков отправки, чтобы потоки
+    не открывали лишних соединений и не ждали друг друга.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            size = max(settings.TELEGRAM_SEND_CONCURRENCY, 1)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            session.mount('https://', adapter)
+            # http:// - поддельный API для замеров (TELEGRAM_API_URL)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def api_url(token: str, method: str) -> str:
+    """Адрес метода Telegram Bot API (TELEGRAM_API_URL)."""
+    return f"{settings.TELEGRAM_API_URL.rstrip('/')}/bot{token}/{method}"
+
+
+def call_api(method: str, token: str = '', timeout: float = 10, **params):
+    """
+    Вызывает метод Telegram Bot API.
+    
+    Args:
+        method: Имя метода (setWebhook, getWebhookInfo...)
+        token: Токен бота (по умолчанию TELEGRAM_BOT_TOKEN)
+        timeout: Таймаут запроса в секундах
+        **params: Параметры метода
+    
+    Returns:
+        Поле result ответа
+    
+    Raises:
+        TelegramAPIError: API вернул ok=false или ответ не разобран
+        requests.exceptions.RequestException: Ошибка сети
+    """
+    response = get_session().post(api_url(token or settings.TELEGRAM_BOT_TOKEN, method), json=params, timeout=timeout)
+    try:
+        data = response.json()
+    except ValueError:
+        raise TelegramAPIError(f'HTTP {response.status_code}: {response.text[:200]}')
+    if not data.get('ok'):
+        raise TelegramAPIError(data.get('description') or f'HTTP {response.status_code}')
+    return data.get('result')
+
+
+def get_retry_after(response: requests.Response) -> Optional[int]:
+    """Значение parameters.retry_after из ответа 429."""
+    try:
+        return int(response.json()['parameters']['retry_after'])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def send_to_chat(token: str, chat_id: int, message: str) -> SendResult:
+    """Отправляет сообщение в один чат (с учётом ограничений частоты)."""
+    url = api_url(token, 'sendMessage')
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        paused = rate_limiter.acquire(chat_id, max_pause=settings.TELEGRAM_MAX_RETRY_AFTER)
+        if paused is not None:
+            # Бот уже получил 429 с долгим retry_after: до конца паузы API не вызывается
+            error = f'Отправка приостановлена после HTTP 429 ещё на {paused:.0f} с'
+            logger.warning(f'Telegram чат {chat_id}: {error}')
+            return SendResult(False, error, retry=True, status_code=429, retry_after=math.ceil(paused))
+        try:
+            response = get_session().post(
+                url,
+                json={
+                    'chat_id': chat_id,
+                    'text': message,
+                    'parse_mode': 'HTML'
+                },
+                timeout=10
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Ошибка отправки в Telegram чат {chat_id}: {e}')
+            return SendResult(False, str(e), retry=True)
+        
+        if response.ok:
+            logger.info(f'Сообщение отправлено в Telegram чат {chat_id}')
+            return SendResult(True)
+        error = f'HTTP {response.status_code}: {response.text[:200]}'
+        retry_after = get_retry_after(response) if response.status_code == 429 else None
+        if retry_after is not None:
+            # Пауза и тогда, когда повтора здесь не будет: остальные потоки не должны вызывать API
+            rate_limiter.pause(retry_after)
+            if retry_after <= settings.TELEGRAM_MAX_RETRY_AFTER and attempt < MAX_RATE_LIMIT_RETRIES:
+                logger.warning(f'Telegram чат {chat_id}: превышен лимит, повтор через {retry_after} с')
+                rate_limiter.delay_chat(chat_id, retry_after)
+                continue
+        logger.error(f'Ошибка отправки в Telegram чат {chat_id}: {error}')
+        return SendResult(
+            False,
+            error,
+            retry=response.status_code == 429 or response.status_code >= 500,
+            status_code=response.status_code,
+            retry_after=retry_after or 0
+        )
+
+
+def deactivate_blocked_chats(results: Dict[int, SendResult]) -> None:
+    """
+    Отключает чаты, в которые бот больше не может писать (ответ 403).
+    
+    403 - бот заблокирован пользователем или удалён из группы: повторная
+    отправка не поможет, пока менеджер снова не отправит /start.
+    """
+    blocked = [chat_id for chat_id, result in results.items() if result.status_code == 403]
+    if blocked:
+        TelegramChat.objects.filter(chat_id__in=blocked).update(is_active=False)
+        logger.warning(f'Telegram чаты отключены (бот заблокирован): {blocked}')
+
+
+def send_to_chats(message: str, chat_ids: Iterable[int]) -> Dict[int, SendResult]:
+    """
+    Отправляет сообщение в указанные чаты параллельно.
+    
+    Чаты, заблокировавшие бота (403), отключаются.
+    
+    Returns:
+        Результат по каждому чату
+    """
+    chat_ids = list(chat_ids)
+    token = settings.TELEGRAM_BOT_TOKEN
+    if not token:
+        logger.warning('Telegram bot token не настроен. Добавьте TELEGRAM_BOT_TOKEN в .env файл')
+        return {chat_id: SendResult(False, 'Токен бота не настроен', retry=True) for chat_id in chat_ids}
+    workers = min(settings.TELEGRAM_SEND_CONCURRENCY, len(chat_ids))
+    if workers <= 1:
+        results = {chat_id: send_to_chat(token, chat_id, message) for chat_id in chat_ids}
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            sent = executor.map(lambda chat_id: send_to_chat(token, chat_id, message), chat_ids)
+            results = dict(zip(chat_ids, sent))
+    deactivate_blocked_chats(results)
+    return results
+
+
 def send_telegram_message(message: str) -> bool:
     """
     Отправляет сообщение во все активные Telegram чаты.
     
+    Отправка синхронная; уведомления о заявках идут через очередь
+    (apps.main.utils.outbox), чтобы не задерживать ответ посетителю.
+    
     Args:
         message: Текст сообщения для отправки
     
@@ -19,39 +292,14 @@ def send_telegram_message(message: str) -> bool:
         True если хотя бы одно сообщение отправлено успешно, иначе False
     """
     try:
-        # Берем токен из .env
-        token = settings.TELEGRAM_BOT_TOKEN
+        chat_ids = list(TelegramChat.objects.filter(is_active=True).values_list('chat_id', flat=True))
         
-        if not token:
-            logger.warning('Telegram bot token не настроен. Добавьте TELEGRAM_BOT_TOKEN в .env файл')
-            return False
-        active_chats = TelegramChat.objects.filter(is_active=True)
-        
-        if not active_chats.exists():
+        if not chat_ids:
             logger.warning('Нет активных Telegram чатов для отправки уведомлений')
             return False
         
-        success_count = 0
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        
-        for chat in active_chats:
-            try:
-                response = requests.post(
-                    url,
-                    json={
-                        'chat_id': chat.chat_id,
-                        'text': message,
-                        'parse_mode': 'HTML'
-                    },
-                    timeout=10
-                )
-                response.raise_for_status()
-                success_count += 1
-                logger.info(f'Сообщение отправлено в Telegram чат {chat.chat_id}')
-            except requests.exceptions.RequestException as e:
-                logger.error(f'Ошибка отправки в Telegram чат {chat.chat_id}: {e}')
-        
-        return success_count > 0
+        results = send_to_chats(message, chat_ids)
+        return any(result.ok for result in results.values())
     
     except Exception as e:
         logger.error(f'Ошибка при отправке сообщений в Telegram: {e}')
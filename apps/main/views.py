@@ -2,17 +2,27 @@
 Views для главной страницы.
 """
 
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.db.models import QuerySet, Q
 from django.template.loader import render_to_string
 from loguru import logger
-from apps.main.models import Slider, AboutUs, SiteSettings, Testimonial, Statistic
+from apps.core.page_cache import PageCacheMixin
+from apps.main.models import Slider, AboutUs, SiteSettings, Testimonial, Statistic, TelegramUpdate
+from apps.main.utils.bot import handle_message
 from apps.services.models import Service
-from apps.portfolio.models import PortfolioItem
+from apps.portfolio.utils.albums import build_albums
 
 
-class HomeView(TemplateView):
+class HomeView(PageCacheMixin, TemplateView):
     """
     Главная страница сайта.
     
@@ -24,6 +34,10 @@ class HomeView(TemplateView):
     """
     
     template_name = 'main/home.html'
+    page_cache_models = ('main.Slider', 'main.AboutUs', 'main.Testimonial', 'services.Service', 'portfolio.PortfolioItem')
+    
+    # Количество работ в одном альбоме на главной
+    ALBUM_WORKS_LIMIT = 4
     
     def get_context_data(self, **kwargs) -> dict:
         """Получение контекста для шаблона."""
@@ -49,91 +63,31 @@ class HomeView(TemplateView):
                 context['about'] = None
                 logger.warning('Блок "О нас" не найден')
             
-            # Получаем работы портфолио для 4 альбомов
-            # Альбом 1: Вывески
-            vyveski_service = Service.objects.filter(slug='vyveski', is_active=True).first()
-            vyveski_works = PortfolioItem.objects.filter(
-                is_active=True,
-                service=vyveski_service
-            ).select_related('service')[:4] if vyveski_service else []
-            
-            # Альбом 2: Авто (Оклейка авто)
-            avto_service = Service.objects.filter(slug='okleika-avto', is_active=True).first()
-            avto_works = PortfolioItem.objects.filter(
-                is_active=True,
-                service=avto_service
-            ).select_related('service')[:4] if avto_service else []
-            
-            # Альбом 3: Неон
-            neon_service = Service.objects.filter(slug='neon', is_active=True).first()
-            neon_works = PortfolioItem.objects.filter(
-                is_active=True,
-                service=neon_service
-            ).select_related('service')[:4] if neon_service else []
-            
-            # Альбом 4: Интерьерные решения
-            interior_service = Service.objects.filter(slug='interiernye-resheniia', is_active=True).first()
-            interior_works = PortfolioItem.objects.filter(
+            # Альбомы портфолио: услуги, отмеченные для главной,
+            # первые работы и счётчики выбираются одним запросом
+            featured_services = Service.objects.filter(
                 is_active=True,
-                service=interior_service
-            ).select_related('service')[:4] if interior_service else []
-            
-            # Альбом 5: Холсты
-            kholsty_service = Service.objects.filter(slug='kholsty', is_active=True).first()
-            kholsty_works = PortfolioItem.objects.filter(
-                is_active=True,
-                service=kholsty_service
-            ).select_related('service')[:4] if kholsty_service else []
-            
-            # Формируем список альбомов
-            context['portfolio_albums'] = [
-                {
-                    'title': 'Вывески',
-                    'slug': 'vyveski',
-                    'description': 'Примеры наших работ в категории "вывески"',
-                    'works': list(vyveski_works),
-                    'count': PortfolioItem.objects.filter(is_active=True, service=vyveski_service).count() if vyveski_service else 0,
-                    'service': vyveski_service,
-                },
-                {
-                    'title': 'Оклейка авто',
-                    'slug': 'okleika-avto',
-                    'description': 'Примеры наших работ в категории "оклейка авто"',
-                    'works': list(avto_works),
-                    'count': PortfolioItem.objects.filter(is_active=True, service=avto_service).count() if avto_service else 0,
-                    'service': avto_service,
-                },
-                {
-                    'title': 'Неон',
-                    'slug': 'neon',
-                    'description': 'Примеры наших работ в категории "неон"',
-                    'works': list(neon_works),
-                    'count': PortfolioItem.objects.filter(is_active=True, service=neon_service).count() if neon_service else 0,
-                    'service': neon_service,
-                },
-                {
-                    'title': 'Интерьерные решения',
-                    'slug': 'interiernye-resheniia',
-                    'description': 'Примеры наших работ в категории "интерьерные решения"',
-                    'works': list(interior_works),
-                    'count': PortfolioItem.objects.filter(is_active=True, service=interior_service).count() if interior_service else 0,
-                    'service': interior_service,
-                },
-            ]
+                is_featured=True
+            ).order_by('order', 'name')
+            context['portfolio_albums'] = build_albums(
+                featured_services,
+                works_per_album=self.ALBUM_WORKS_LIMIT
+            )
             
             logger.info(f'Главная страница загружена. Слайдов: {context["slides"].count()}')
-            
+        
         except Exception as e:
             logger.error(f'Ошибка при загрузке главной страницы: {e}')
-            
+        
         return context
 
 
-class AboutView(TemplateView):
+class AboutView(PageCacheMixin, TemplateView):
     """
     Страница "О нас".
     """
     template_name = 'main/about.html'
+    page_cache_models = ('main.AboutUs', 'main.Statistic')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -183,6 +137,7 @@ User-agent: *
 Allow: /
 Disallow: /admin/
 Disallow: /ckeditor/
+Disallow: /telegram/
 Disallow: /static/admin/
 Disallow: /media/admin/
 
@@ -197,3 +152,50 @@ User-agent: Googlebot
 Crawl-delay: 1
 """
     return HttpResponse(content, content_type='text/plain')
+
+
+# Сколько хранить update_id для защиты от повторной доставки
+TELEGRAM_UPDATE_TTL = timedelta(days=1)
+
+
+@csrf_exempt
+@require_POST
+def telegram_webhook(request):
+    """
+    Webhook Telegram бота.
+    
+    Запрос принимается только с секретом TELEGRAM_WEBHOOK_SECRET
+    в заголовке X-Telegram-Bot-Api-Secret-Token. Обновление
+    обрабатывается один раз: update_id запоминается в той же
+    транзакции, повтор возвращает 200 без обработки. Ответ боту
+    отправляется в теле ответа webhook (метод sendMessage), без
+    отдельного запроса к API.
+    """
+    secret = settings.TELEGRAM_WEBHOOK_SECRET
+    if not secret:
+        raise Http404('Webhook не настроен')
+    if not constant_time_compare(request.headers.get('X-Telegram-Bot-Api-Secret-Token', ''), secret):
+        logger.warning('Запрос к webhook Telegram с неверным секретом')
+        return HttpResponseForbidden()
+    
+    try:
+        update = json.loads(request.body)
+        update_id = int(update['update_id'])
+    except (ValueError, TypeError, KeyError):
+        return HttpResponseBadRequest()
+    
+    # Ошибка обработки откатывает и запись update_id: Telegram повторит доставку
+    with transaction.atomic():
+        _, created = TelegramUpdate.objects.get_or_create(update_id=update_id)
+        if not created:
+            logger.debug(f'Повтор обновления Telegram {update_id} пропущен')
+            return HttpResponse()
+        reply = handle_message(update)
+    
+    if update_id % 100 == 0:
+        TelegramUpdate.objects.filter(created_at__lt=timezone.now() - TELEGRAM_UPDATE_TTL).delete()
+    
+    if reply is None:
+        return HttpResponse()
+    chat_id, text = reply
+    return JsonResponse({'method': 'sendMessage', 'chat_id': chat_id, 'text': text})
@@ -2,15 +2,73 @@
 Административная панель для портфолио.
 """
 
+from django import forms
 from django.contrib import admin
-from django.utils.html import format_html
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+from loguru import logger
+from apps.core.images.phash import dhash_file
 from apps.portfolio.models import PortfolioItem
+from apps.portfolio.utils.similar import find_similar
+
+
+def similar_links(similar):
+    """Ссылки на похожие работы с расстоянием между хешами."""
+    return format_html_join(
+        ', ', '<a href="{}">{}</a> (отличие {} бит из 64)',
+        (
+            (reverse('admin:portfolio_portfolioitem_change', args=[item.pk]), item.title, distance)
+            for distance, item in similar
+        )
+    )
+
+
+class PortfolioItemAdminForm(forms.ModelForm):
+    """
+    Форма работы портфолио с проверкой похожих фотографий.
+    
+    Если в портфолио уже есть похожая фотография, работа не сохраняется,
+    пока не отмечено "Всё равно сохранить".
+    """
+    
+    confirm_similar = forms.BooleanField(
+        required=False,
+        label='Всё равно сохранить',
+        help_text='Сохранить работу, даже если похожая фотография уже есть в портфолио'
+    )
+    
+    class Meta:
+        model = PortfolioItem
+        fields = '__all__'
+    
+    def clean(self):
+        """Проверяет новую фотографию на похожие работы до сохранения."""
+        cleaned_data = super().clean()
+        image = cleaned_data.get('image')
+        if 'image' not in self.changed_data or not image or cleaned_data.get('confirm_similar'):
+            return cleaned_data
+        try:
+            phash = dhash_file(image)
+        except Exception as e:
+            # Ошибку формата сообщит валидация поля изображения
+            logger.warning(f'Не удалось вычислить перцептивный хеш {image.name}: {e}')
+            return cleaned_data
+        similar = find_similar(phash, exclude=self.instance.pk)
+        if similar:
+            raise forms.ValidationError(format_html(
+                'Похожая фотография уже есть в портфолио: {}. Проверьте, не дубликат ли это, '
+                'или отметьте "Всё равно сохранить".',
+                similar_links(similar[:5])
+            ))
+        return cleaned_data
 
 
 @admin.register(PortfolioItem)
 class PortfolioItemAdmin(admin.ModelAdmin):
     """Админка для работ портфолио."""
     
+    form = PortfolioItemAdminForm
+    
     list_display = (
         'title', 'service', 'client', 'date_completed',
         'is_featured', 'is_active', 'image_preview'
@@ -20,13 +78,14 @@ class PortfolioItemAdmin(admin.ModelAdmin):
     list_editable = ('is_featured', 'is_active')
     date_hierarchy = 'date_completed'
     ordering = ('-date_completed', '-created_at')
+    readonly_fields = ('similar_items',)
     
     fieldsets = (
         ('Основная информация', {
             'fields': ('title', 'service', 'client', 'date_completed')
         }),
         ('Контент', {
-            'fields': ('description', 'image')
+            'fields': ('description', 'image', 'confirm_similar', 'similar_items')
         }),
         ('Настройки отображения', {
             'fields': ('is_featured', 'is_active')
@@ -43,4 +102,12 @@ class PortfolioItemAdmin(admin.ModelAdmin):
         return '-'
     
     image_preview.short_description = 'Превью'
-
+    
+    def similar_items(self, obj):
+        """Работы с похожей фотографией (возможные дубликаты)."""
+        if not obj or not obj.pk:
+            return '-'
+        similar = find_similar(obj.image_phash, exclude=obj.pk)
+        return similar_links(similar) if similar else 'Не найдены'
+    
+    similar_items.short_description = 'Похожие фотографии'
@@ -11,4 +11,10 @@ class PortfolioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.portfolio'
     verbose_name = 'Портфолио'
-
+    
+    def ready(self):
+        """Подключение обновления поискового индекса и сигналов."""
+        from apps.portfolio.search import portfolio_index
+        from apps.portfolio.signals import connect_portfolio_signals
+        portfolio_index.connect_signals()
+        connect_portfolio_signals()
@@ -0,0 +1,114 @@
+"""
+Management command: отчёт о похожих фотографиях в портфолио.
+
+Находит группы работ с похожими изображениями (одно фото, загруженное
+несколько раз с другим кадрированием или сжатием) по перцептивному
+хешу. Работам без хеша он сначала вычисляется по файлу (в пуле процессов).
+
+Использование:
+    python manage.py find_similar_photos
+    python manage.py find_similar_photos --distance 6
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.core.images.phash import HammingIndex, group_similar, hamming, parse_hash
+from apps.core.images.workers import get_worker_count, init_worker
+from apps.portfolio.models import PortfolioItem
+from apps.portfolio.utils.ingest import phash_stored
+from apps.portfolio.utils.similar import SIMILAR_DISTANCE
+
+
+class Command(BaseCommand):
+    """Поиск похожих фотографий в портфолио."""
+    
+    help = 'Показывает группы работ портфолио с похожими фотографиями'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--distance',
+            type=int,
+            default=SIMILAR_DISTANCE,
+            help=f'Максимальное расстояние Хэмминга из 64 бит (по умолчанию {SIMILAR_DISTANCE})'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов для вычисления хешей (по умолчанию IMAGE_WORKERS или число ядер)'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        self.hash_missing(options['workers'])
+        
+        items = dict(
+            (pk, parse_hash(phash))
+            for pk, phash in PortfolioItem.objects.exclude(image_phash='').values_list('pk', 'image_phash')
+        )
+        if not items:
+            self.stdout.write('Нет работ с хешем изображения')
+            return
+        
+        started = time.perf_counter()
+        index = HammingIndex(items.items())
+        built = time.perf_counter() - started
+        
+        # Время одного поиска - столько стоит проверка новой загрузки
+        sample = list(items.values())[:200]
+        started = time.perf_counter()
+        for value in sample:
+            index.search(value, options['distance'])
+        lookup = (time.perf_counter() - started) / len(sample)
+        
+        groups = group_similar(items, options['distance'])
+        works = PortfolioItem.objects.select_related('service').in_bulk([pk for group in groups for pk in group])
+        
+        for number, group in enumerate(sorted(groups, key=len, reverse=True), 1):
+            first = items[group[0]]
+            self.stdout.write(self.style.WARNING(f'\nГруппа {number} ({len(group)} работ):'))
+            for pk in group:
+                work = works[pk]
+                service = work.service.name if work.service else 'без услуги'
+                self.stdout.write(
+                    f'  [{hamming(first, items[pk]):2d}] {work.title} ({service}) - {work.image.name}'
+                )
+        
+        duplicates = sum(len(group) - 1 for group in groups)
+        self.stdout.write(
+            f'\nРабот с хешем: {len(items)}, групп похожих: {len(groups)}, возможных дубликатов: {duplicates}'
+        )
+        self.stdout.write(
+            f'Индекс хешей: построен за {built * 1000:.0f} мс, '
+            f'поиск одной фотографии ~{lookup * 1000:.2f} мс'
+        )
+    
+    def hash_missing(self, workers):
+        """Вычисляет перцептивные хеши работ, у которых их нет."""
+        names = list(
+            PortfolioItem.objects.filter(image_phash='').exclude(image='')
+            .values_list('image', flat=True).distinct()
+        )
+        if not names:
+            return
+        
+        self.stdout.write(f'Вычисление хешей для {len(names)} изображений...')
+        workers = workers if workers is not None else get_worker_count()
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                results = list(executor.map(phash_stored, names, chunksize=16))
+        else:
+            results = [phash_stored(name) for name in names]
+        
+        failed = 0
+        with transaction.atomic():
+            for name, phash in results:
+                if phash:
+                    PortfolioItem.objects.filter(image=name, image_phash='').update(image_phash=phash)
+                else:
+                    failed += 1
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Не прочитано файлов: {failed}'))
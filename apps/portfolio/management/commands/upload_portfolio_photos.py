@@ -1,6 +1,16 @@
 """
 Management command для загрузки фотографий в портфолио.
 
+Рассчитана на тысячи фотографий:
+    - хеширование и обработка изображений (нормализация, размеры,
+      заглушка) выполняются в пуле процессов;
+    - дубликаты ищутся по SHA-256 содержимого (индекс image_hash),
+      среди работ, загруженных до появления хеша, - по dHash;
+    - записи создаются пачками через bulk_create, каждая пачка
+      в своей транзакции;
+    - обработанные файлы записываются в файл контрольной точки,
+      повторный запуск продолжает прерванный импорт.
+
 Использование:
     python manage.py upload_portfolio_photos /path/to/photos --folder авто
     python manage.py upload_portfolio_photos /path/to/photos --folder вывески
@@ -9,17 +19,39 @@ Management command для загрузки фотографий в портфо
 
 Или загрузить все папки сразу:
     python manage.py upload_portfolio_photos /path/to/photos --all
+
+Начать заново, не учитывая контрольную точку:
+    python manage.py upload_portfolio_photos /path/to/photos --all --restart
 """
 
-import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
-from django.core.files import File
 from django.db import transaction
 from loguru import logger
 
+from apps.core.images.phash import HammingIndex, parse_hash
+from apps.core.images.registry import IMAGE_FIELDS
+from apps.core.images.workers import ImageJob, get_worker_count, init_worker, missing_jobs, run_jobs
+from apps.core.page_cache import bump_generation
 from apps.portfolio.models import PortfolioItem
-from apps.services.models import Service, ServiceCategory
+from apps.portfolio.search import portfolio_index
+from apps.portfolio.utils.ingest import Checkpoint, find_photos, hash_photo, hash_stored, store_photo
+from apps.services.models import Service
+
+
+# Работа без хеша исходника считается той же фотографией, если dHash
+# её файла отличается от dHash исходника не больше чем на столько бит
+# (уменьшение и пересжатие при нормализации меняют лишь несколько бит)
+LEGACY_MATCH_DISTANCE = 4
+
+# Хеши однотонных изображений (все биты равны): по ним изображения
+# не различить, сравнение по dHash для них не выполняется
+UNINFORMATIVE_HASHES = (0, (1 << 64) - 1)
+
+# Сколько несопоставленных работ без хеша перечислять в итоге
+LEGACY_REPORT_LIMIT = 20
 
 
 class Command(BaseCommand):
@@ -27,26 +59,16 @@ class Command(BaseCommand):
     
     help = 'Загружает фотографии из папок в портфолио'
     
-    # Маппинг папок на услуги и категории
+    # Маппинг папок на услуги
     FOLDERS_MAPPING = {
-        'авто': {
-            'service_slug': 'okleika-avto',
-            'category': 'Брендирование авто',
-        },
-        'вывески': {
-            'service_slug': 'vyveski',
-            'category': 'Вывески',
-        },
-        'неон': {
-            'service_slug': 'neon',
-            'category': 'Неон',
-        },
-        'инт': {
-            'service_slug': 'kholsty',
-            'category': 'Печать и полиграфия',
-        },
+        'авто': 'okleika-avto',
+        'вывески': 'vyveski',
+        'неон': 'neon',
+        'инт': 'kholsty',
     }
     
+    CHECKPOINT_NAME = '.upload_portfolio_photos.json'
+    
     def add_arguments(self, parser):
         """Добавляет аргументы команды."""
         parser.add_argument(
@@ -66,9 +88,38 @@ class Command(BaseCommand):
             help='Загрузить все папки из маппинга'
         )
         parser.add_argument(
-            '--skip-duplicates',
+            '--allow-duplicates',
+            action='store_true',
+            help='Загружать фотографии, которые уже есть в портфолио (по содержимому)'
+        )
+        # Раньше проверка дубликатов включалась этим флагом, теперь она всегда включена
+        parser.add_argument('--skip-duplicates', action='store_true', help=argparse.SUPPRESS)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов (по умолчанию IMAGE_WORKERS или число ядер)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Фотографий в одной пачке и транзакции (по умолчанию 100)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            type=str,
+            help=f'Файл контрольной точки (по умолчанию <path>/{self.CHECKPOINT_NAME})'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Игнорировать контрольную точку и начать импорт заново'
+        )
+        parser.add_argument(
+            '--skip-variants',
             action='store_true',
-            help='Пропускать дубликаты (проверка по имени файла)'
+            help='Не создавать варианты изображений после импорта'
         )
     
     def handle(self, *args, **options):
@@ -81,13 +132,6 @@ class Command(BaseCommand):
         if not base_path.is_dir():
             raise CommandError(f'Путь не является папкой: {base_path}')
         
-        # Статистика
-        stats = {
-            'created': 0,
-            'skipped': 0,
-            'errors': 0,
-        }
-        
         # Определяем какие папки обрабатывать
         if options['all']:
             folders_to_process = list(self.FOLDERS_MAPPING.keys())
@@ -96,144 +140,235 @@ class Command(BaseCommand):
         else:
             raise CommandError('Укажите --folder или --all')
         
-        # Обрабатываем каждую папку
-        for folder_name in folders_to_process:
-            self.stdout.write(f'\n[*] Обработка папки: {folder_name}')
-            
-            folder_data = self.FOLDERS_MAPPING[folder_name]
-            service_slug = folder_data['service_slug']
-            category_name = folder_data['category']
-            
-            # Находим категорию
-            try:
-                category = ServiceCategory.objects.get(name__icontains=category_name)
-                self.stdout.write(f'[OK] Найдена категория: {category.name}')
-            except ServiceCategory.DoesNotExist:
-                self.stdout.write(
-                    self.style.ERROR(f'[ERROR] Категория не найдена: {category_name}')
-                )
-                stats['errors'] += 1
-                continue
-            except ServiceCategory.MultipleObjectsReturned:
-                category = ServiceCategory.objects.filter(
-                    name__icontains=category_name
-                ).first()
-                self.stdout.write(f'[OK] Найдена категория: {category.name} (первая из нескольких)')
-            
-            # Находим услугу
-            try:
-                service = Service.objects.get(slug=service_slug, is_active=True)
-                self.stdout.write(f'[OK] Найдена услуга: {service.name}')
-            except Service.DoesNotExist:
-                self.stdout.write(
-                    self.style.ERROR(f'[ERROR] Услуга не найдена: {service_slug}')
-                )
-                stats['errors'] += 1
-                continue
-            
-            # Ищем папку с фотками
-            source_folder = base_path / folder_name
-            if not source_folder.exists():
-                self.stdout.write(
-                    self.style.WARNING(f'[WARNING] Папка не найдена: {source_folder}')
-                )
-                stats['errors'] += 1
-                continue
-            
-            # Ищем все изображения
-            image_extensions = ['.jpg', '.jpeg', '.png', '.webp']
-            photos = []
-            for ext in image_extensions:
-                photos.extend(list(source_folder.glob(f'*{ext}')))
-                photos.extend(list(source_folder.glob(f'*{ext.upper()}')))
-            
-            if not photos:
-                self.stdout.write(
-                    self.style.WARNING(f'[WARNING] Фотографии не найдены в: {source_folder}')
-                )
+        self.options = options
+        self.stats = {
+            'created': 0,
+            'skipped': 0,
+            'resumed': 0,
+            'errors': 0,
+        }
+        self.created_names = []
+        self.legacy_hashes = {}
+        self.legacy_index = HammingIndex()
+        self.legacy_unmatched = set()
+        self.checkpoint = Checkpoint(Path(options['checkpoint']) if options['checkpoint'] else base_path / self.CHECKPOINT_NAME)
+        if options['restart']:
+            self.checkpoint.clear()
+        
+        workers = options['workers'] if options['workers'] is not None else get_worker_count()
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker) if workers > 1 else None
+        try:
+            if not options['allow_duplicates']:
+                self.hash_existing()
+            for folder_name in folders_to_process:
+                self.process_folder(base_path, folder_name)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(
+                '\n[STOP] Импорт прерван. Повторный запуск продолжит с последней сохранённой пачки.'
+            ))
+            return
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+        
+        if self.created_names and not options['skip_variants']:
+            self.generate_variants(workers)
+        
+        self.write_summary()
+    
+    def map(self, func, items: list) -> list:
+        """Выполняет функцию для элементов в пуле процессов (или в текущем процессе)."""
+        if self.executor is None:
+            return [func(item) for item in items]
+        return list(self.executor.map(func, items, chunksize=4))
+    
+    def hash_existing(self):
+        """
+        Хеши работ, загруженных до появления image_hash.
+        
+        Хеш исходника у таких работ неизвестен, а файл в хранилище мог быть
+        нормализован (уменьшен, пересжат, очищен от EXIF). Его SHA-256
+        совпадает с хешем исходника, только если файл сохранён без изменений,
+        поэтому такие работы сравниваются ещё и по dHash файла: нормализация
+        меняет его лишь на несколько бит. Найденной работе записывается
+        хеш исходника, и следующий импорт находит её по image_hash.
+        """
+        names = list(
+            PortfolioItem.objects.filter(image_hash='').exclude(image='')
+            .values_list('image', flat=True).distinct()
+        )
+        if not names:
+            return
+        
+        self.stdout.write(f'[*] Работ без хеша исходника: {len(names)}')
+        chunk_size = self.options['chunk_size']
+        for start in range(0, len(names), chunk_size):
+            for name, digest, phash in self.map(hash_stored, names[start:start + chunk_size]):
+                if digest:
+                    self.legacy_hashes[digest] = name
+                if phash and parse_hash(phash) not in UNINFORMATIVE_HASHES:
+                    self.legacy_index.add(name, parse_hash(phash))
+        self.legacy_unmatched = set(names)
+    
+    def match_legacy(self, digest: str, phash: str):
+        """Работа без хеша исходника с тем же файлом или с близким dHash (имя файла или None)."""
+        if digest in self.legacy_hashes:
+            return self.legacy_hashes[digest]
+        if not phash or not self.legacy_index.size or parse_hash(phash) in UNINFORMATIVE_HASHES:
+            return None
+        found = self.legacy_index.search(parse_hash(phash), LEGACY_MATCH_DISTANCE)
+        return found[0][1] if found else None
+    
+    def process_folder(self, base_path: Path, folder_name: str):
+        """Импортирует одну папку пачками."""
+        self.stdout.write(f'\n[*] Обработка папки: {folder_name}')
+        service_slug = self.FOLDERS_MAPPING[folder_name]
+        
+        # Находим услугу
+        try:
+            service = Service.objects.get(slug=service_slug, is_active=True)
+            self.stdout.write(f'[OK] Найдена услуга: {service.name}')
+        except Service.DoesNotExist:
+            self.stdout.write(
+                self.style.ERROR(f'[ERROR] Услуга не найдена: {service_slug}')
+            )
+            self.stats['errors'] += 1
+            return
+        
+        # Ищем папку с фотками
+        source_folder = base_path / folder_name
+        if not source_folder.is_dir():
+            self.stdout.write(
+                self.style.WARNING(f'[WARNING] Папка не найдена: {source_folder}')
+            )
+            self.stats['errors'] += 1
+            return
+        
+        photos = find_photos(source_folder)
+        if not photos:
+            self.stdout.write(
+                self.style.WARNING(f'[WARNING] Фотографии не найдены в: {source_folder}')
+            )
+            return
+        
+        # Номер в названии - позиция в папке, поэтому не меняется при возобновлении
+        pending = [(index, str(path)) for index, path in enumerate(photos, 1) if str(path) not in self.checkpoint]
+        self.stats['resumed'] += len(photos) - len(pending)
+        self.stdout.write(f'[OK] Найдено фотографий: {len(photos)}, к загрузке: {len(pending)}')
+        
+        chunk_size = self.options['chunk_size']
+        for start in range(0, len(pending), chunk_size):
+            self.import_chunk(service, pending[start:start + chunk_size])
+            self.stdout.write(f'  [{min(start + chunk_size, len(pending))}/{len(pending)}]')
+    
+    def import_chunk(self, service, chunk: list):
+        """Хеширует, обрабатывает и сохраняет одну пачку фотографий."""
+        indexes = dict((path, index) for index, path in chunk)
+        results = {}
+        
+        hashes = {}
+        phashes = {}
+        for path, digest, phash, error in self.map(hash_photo, [path for _, path in chunk]):
+            if error:
+                self.write_error(path, error)
+            else:
+                hashes[path] = digest
+                phashes[path] = phash
+        
+        if not self.options['allow_duplicates']:
+            existing = set(
+                PortfolioItem.objects.filter(image_hash__in=set(hashes.values())).values_list('image_hash', flat=True)
+            )
+            seen = set()
+            for path, digest in list(hashes.items()):
+                legacy = None
+                if digest not in existing and digest not in seen:
+                    legacy = self.match_legacy(digest, phashes[path])
+                    if legacy is None:
+                        seen.add(digest)
+                        continue
+                    PortfolioItem.objects.filter(image=legacy, image_hash='').update(image_hash=digest)
+                    self.legacy_unmatched.discard(legacy)
+                message = f'  [SKIP] Пропущен дубликат: {Path(path).name}'
+                if legacy:
+                    message += f' (уже загружен как {legacy})'
+                self.stdout.write(self.style.WARNING(message))
+                self.stats['skipped'] += 1
+                results[path] = 'duplicate'
+                del hashes[path]
+                seen.add(digest)
+        
+        items = []
+        for stored in self.map(store_photo, list(hashes)):
+            path = stored['path']
+            if 'error' in stored:
+                self.write_error(path, stored['error'])
                 continue
-            
-            self.stdout.write(f'[OK] Найдено фотографий: {len(photos)}')
-            
-            # Загружаем фотки
-            with transaction.atomic():
-                for idx, photo_path in enumerate(photos, 1):
-                    try:
-                        filename = photo_path.name
-                        
-                        # Проверяем дубликаты по имени файла
-                        if options['skip_duplicates']:
-                            # Проверяем по имени файла в пути изображения
-                            existing = PortfolioItem.objects.filter(
-                                image__icontains=filename,
-                                service=service
-                            ).exists()
-                            
-                            if existing:
-                                self.stdout.write(
-                                    self.style.WARNING(
-                                        f'  [SKIP] Пропущен дубликат: {filename}'
-                                    )
-                                )
-                                stats['skipped'] += 1
-                                continue
-                        
-                        # Открываем файл
-                        with open(photo_path, 'rb') as f:
-                            django_file = File(f, name=filename)
-                            
-                            # Создаем запись в БД
-                            portfolio_item = PortfolioItem.objects.create(
-                                title=f'{service.name} #{idx}',
-                                description=f'<p>Пример работы: {service.name}</p>',
-                                image=django_file,
-                                category=category,
-                                service=service,
-                                is_featured=False,
-                                is_active=True,
-                            )
-                            
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f'  [OK] Добавлено: {filename}'
-                                )
-                            )
-                            stats['created'] += 1
-                    
-                    except FileNotFoundError:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f'  [ERROR] Файл не найден: {photo_path}'
-                            )
-                        )
-                        stats['errors'] += 1
-                    except PermissionError:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f'  [ERROR] Нет доступа к файлу: {photo_path}'
-                            )
-                        )
-                        stats['errors'] += 1
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f'  [ERROR] Ошибка: {filename} - {str(e)}'
-                            )
-                        )
-                        logger.error(f'Ошибка загрузки {photo_path}: {e}')
-                        stats['errors'] += 1
-        
-        # Итоговая статистика
+            items.append(PortfolioItem(
+                title=f'{service.name} #{indexes[path]}',
+                description=f'<p>Пример работы: {service.name}</p>',
+                image=stored['name'],
+                image_hash=hashes[path],
+                image_phash=stored['phash'],
+                image_width=stored['width'],
+                image_height=stored['height'],
+                image_placeholder=stored['placeholder'],
+                service=service,
+                is_featured=False,
+                is_active=True,
+            ))
+            results[path] = 'created'
+        
+        # bulk_create не вызывает сигналы: индекс поиска и кеш страниц обновляются здесь
+        with transaction.atomic():
+            PortfolioItem.objects.bulk_create(items)
+            portfolio_index.add_many(items)
+        if items:
+            bump_generation(PortfolioItem._meta.label_lower)
+        
+        self.checkpoint.mark(results)
+        self.stats['created'] += len(items)
+        self.created_names.extend(item.image.name for item in items)
+    
+    def generate_variants(self, workers: int):
+        """Создаёт варианты изображений для загруженных работ."""
+        size_names = IMAGE_FIELDS['portfolio.PortfolioItem']['image']
+        jobs = list(missing_jobs(
+            ImageJob('portfolio.PortfolioItem', 'image', name, size_name)
+            for name in self.created_names
+            for size_name in size_names
+        ))
+        self.stdout.write(f'\n[*] Создание вариантов изображений: {len(jobs)}')
+        for job, error in run_jobs(jobs, workers):
+            if error is not None:
+                logger.error(f'Ошибка создания вариантов {job.name} ({job.size_name}): {error}')
+    
+    def write_error(self, path: str, error: str):
+        self.stdout.write(self.style.ERROR(f'  [ERROR] {Path(path).name}: {error}'))
+        logger.error(f'Ошибка загрузки {path}: {error}')
+        self.stats['errors'] += 1
+    
+    def write_summary(self):
+        """Итоговая статистика."""
         self.stdout.write('\n' + '='*50)
         self.stdout.write(
-            self.style.SUCCESS(f'[OK] Создано записей: {stats["created"]}')
+            self.style.SUCCESS(f'[OK] Создано записей: {self.stats["created"]}')
         )
-        if stats['skipped'] > 0:
+        if self.stats['resumed'] > 0:
+            self.stdout.write(f'[OK] Уже обработано ранее: {self.stats["resumed"]}')
+        if self.stats['skipped'] > 0:
             self.stdout.write(
-                self.style.WARNING(f'[SKIP] Пропущено дубликатов: {stats["skipped"]}')
+                self.style.WARNING(f'[SKIP] Пропущено дубликатов: {self.stats["skipped"]}')
             )
-        if stats['errors'] > 0:
+        if self.stats['errors'] > 0:
             self.stdout.write(
-                self.style.ERROR(f'[ERROR] Ошибок: {stats["errors"]}')
+                self.style.ERROR(f'[ERROR] Ошибок: {self.stats["errors"]}')
             )
+        if self.legacy_unmatched:
+            self.stdout.write(self.style.WARNING(
+                f'[WARNING] Работ без хеша исходника, не сопоставленных ни с одной фотографией: '
+                f'{len(self.legacy_unmatched)} (похожие фото можно найти командой find_similar_photos)'
+            ))
+            for name in sorted(self.legacy_unmatched)[:LEGACY_REPORT_LIMIT]:
+                self.stdout.write(f'  {name}')
         self.stdout.write('='*50)
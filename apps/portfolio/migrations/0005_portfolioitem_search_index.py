@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from apps.core.search.migration_v1 import search_index_operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_remove_portfolioitem_category'),
+    ]
+
+    # Таблица и поля индекса (с весами 'A'-'D') на момент этой миграции.
+    # Записаны здесь, а не взяты из apps.portfolio.search: миграция не должна
+    # меняться вместе с кодом индекса
+    operations = [
+        search_index_operation(
+            'portfolio', 'PortfolioItem',
+            table='portfolio_portfolioitem_search',
+            fields={'title': 'A', 'client': 'B', 'description': 'C'},
+            html_fields=['description'],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_portfolioitem_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portfolioitem',
+            index=models.Index(fields=['-date_completed', '-created_at', 'uuid'], name='portfolio_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='portfolioitem',
+            index=models.Index(fields=['service', '-date_completed', '-created_at', 'uuid'], name='portfolio_service_keyset_idx'),
+        ),
+    ]
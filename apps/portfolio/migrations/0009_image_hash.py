@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='image_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='SHA-256 исходного файла, для поиска дубликатов', max_length=64, verbose_name='Хеш изображения'),
+        ),
+    ]
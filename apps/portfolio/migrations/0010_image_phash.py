@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_image_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='image_phash',
+            field=models.CharField(blank=True, editable=False, help_text='dHash, для поиска похожих фотографий', max_length=16, verbose_name='Перцептивный хеш изображения'),
+        ),
+    ]
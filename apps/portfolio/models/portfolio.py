@@ -15,6 +15,10 @@ class PortfolioItem(BaseModel):
         title: Название работы
         description: Описание
         image: Главное изображение
+        image_width, image_height: Размеры изображения
+        image_placeholder: Размытая миниатюра для показа до загрузки
+        image_hash: SHA-256 исходного файла изображения
+        image_phash: Перцептивный хеш (dHash) изображения
         client: Клиент
         date_completed: Дата завершения
         is_featured: Показывать на главной
@@ -49,6 +53,44 @@ class PortfolioItem(BaseModel):
         help_text='Главное изображение работы (рекомендуется 800x600px)'
     )
     
+    image_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Ширина изображения'
+    )
+    
+    image_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Высота изображения'
+    )
+    
+    image_placeholder = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Заглушка изображения',
+        help_text='Размытая миниатюра (data URI), видна до загрузки изображения'
+    )
+    
+    image_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Хеш изображения',
+        help_text='SHA-256 исходного файла, для поиска дубликатов'
+    )
+    
+    image_phash = models.CharField(
+        max_length=16,
+        blank=True,
+        editable=False,
+        verbose_name='Перцептивный хеш изображения',
+        help_text='dHash, для поиска похожих фотографий'
+    )
+    
     client = models.CharField(
         max_length=200,
         verbose_name='Клиент',
@@ -79,6 +121,11 @@ class PortfolioItem(BaseModel):
         verbose_name = 'Работа'
         verbose_name_plural = 'Портфолио'
         ordering = ['-date_completed', '-created_at']
+        indexes = [
+            # Keyset пагинация списка работ (общего и по услуге)
+            models.Index(fields=['-date_completed', '-created_at', 'uuid'], name='portfolio_keyset_idx'),
+            models.Index(fields=['service', '-date_completed', '-created_at', 'uuid'], name='portfolio_service_keyset_idx'),
+        ]
     
     def __str__(self) -> str:
         return self.title
@@ -0,0 +1,17 @@
+"""
+Полнотекстовый индекс портфолио.
+"""
+
+from apps.core.search import SearchIndex
+from apps.portfolio.models import PortfolioItem
+
+
+# Поля индекса и их веса: название важнее клиента, клиент важнее описания
+PORTFOLIO_SEARCH_FIELDS = {'title': 'A', 'client': 'B', 'description': 'C'}
+PORTFOLIO_SEARCH_HTML_FIELDS = ['description']
+
+portfolio_index = SearchIndex(
+    PortfolioItem,
+    fields=PORTFOLIO_SEARCH_FIELDS,
+    html_fields=PORTFOLIO_SEARCH_HTML_FIELDS,
+)
@@ -0,0 +1,36 @@
+"""
+Сигналы приложения портфолио.
+"""
+
+from django.db.models.signals import pre_save
+from loguru import logger
+from apps.core.images.phash import dhash_file
+from apps.core.utils.hashing import content_hash
+from apps.portfolio.models import PortfolioItem
+
+
+def set_image_hash(sender, instance, raw=False, **kwargs):
+    """
+    Хеши загружаемого изображения для поиска дубликатов.
+    
+    Считаются до сохранения файла, то есть по исходному файлу,
+    а не по нормализованной копии в media/.
+    """
+    if raw:
+        return
+    image = instance.image
+    if image and not image._committed:
+        instance.image_hash = content_hash(image.file)
+        try:
+            instance.image_phash = dhash_file(image.file)
+        except Exception as e:
+            logger.warning(f'Не удалось вычислить перцептивный хеш {image.name}: {e}')
+            instance.image_phash = ''
+    elif not image:
+        instance.image_hash = ''
+        instance.image_phash = ''
+
+
+def connect_portfolio_signals():
+    """Подключает сигналы портфолио."""
+    pre_save.connect(set_image_hash, sender=PortfolioItem, dispatch_uid='portfolio_image_hash')
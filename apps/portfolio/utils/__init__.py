@@ -0,0 +1,3 @@
+"""
+Утилиты для приложения портфолио.
+"""
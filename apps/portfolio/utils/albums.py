@@ -0,0 +1,74 @@
+"""
+Построение альбомов портфолио по услугам.
+"""
+
+from typing import Iterable, List
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from apps.portfolio.models import PortfolioItem
+
+
+def build_albums(services: Iterable, works_per_album: int, skip_empty: bool = False) -> List[dict]:
+    """
+    Формирует альбомы работ для набора услуг.
+    
+    Первые N активных работ каждой услуги и общее количество её работ
+    выбираются одним запросом: ROW_NUMBER() и COUNT() считаются окнами
+    с PARTITION BY service_id, вместо отдельных выборок на каждую услугу.
+    
+    Args:
+        services: Услуги в нужном порядке (QuerySet или список)
+        works_per_album: Сколько работ показывать в одном альбоме
+        skip_empty: Пропускать услуги без активных работ
+    
+    Returns:
+        Список альбомов с ключами title, slug, description, works, count, service
+    """
+    services = list(services)
+    if not services:
+        return []
+    
+    partition = [F('service_id')]
+    ranked_works = PortfolioItem.objects.filter(
+        is_active=True,
+        service__in=services
+    ).annotate(
+        album_position=Window(
+            expression=RowNumber(),
+            partition_by=partition,
+            order_by=[F('date_completed').desc(), F('created_at').desc()]
+        ),
+        album_count=Window(
+            expression=Count('pk'),
+            partition_by=partition
+        ),
+    ).filter(
+        album_position__lte=works_per_album
+    ).order_by('service_id', 'album_position')
+    
+    works_by_service = {}
+    counts_by_service = {}
+    for work in ranked_works:
+        works_by_service.setdefault(work.service_id, []).append(work)
+        counts_by_service[work.service_id] = work.album_count
+    
+    albums = []
+    for service in services:
+        works = works_by_service.get(service.pk, [])
+        if skip_empty and not works:
+            continue
+        
+        # Услуга уже загружена - подставляем её, чтобы не делать JOIN
+        for work in works:
+            work.service = service
+        
+        albums.append({
+            'title': service.name,
+            'slug': service.slug,
+            'description': service.description or f'Примеры наших работ в категории "{service.name}"',
+            'works': works,
+            'count': counts_by_service.get(service.pk, 0),
+            'service': service,
+        })
+    
+    return albums
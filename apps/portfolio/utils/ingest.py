@@ -0,0 +1,142 @@
+"""
+Массовая загрузка фотографий в портфолио.
+
+Функции уровня модуля выполняются в процессах пула
+(ProcessPoolExecutor): они работают только с файлами и хранилищем
+и не обращаются к базе данных. Записи создаёт основной процесс.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from django.core.files import File
+from apps.core.images.metadata import read_field_metadata
+from apps.core.images.phash import dhash_file
+from apps.core.utils.hashing import content_hash
+from apps.portfolio.models import PortfolioItem
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def find_photos(folder: Path) -> List[Path]:
+    """Изображения в папке в постоянном порядке (для нумерации и возобновления)."""
+    return sorted(
+        path for path in folder.iterdir()
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def hash_photo(path: str) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+    """
+    Хеш и перцептивный хеш исходного файла.
+    
+    Returns:
+        (путь, хеш или None, dHash или None, ошибка или None)
+    """
+    try:
+        with open(path, 'rb') as file_object:
+            digest = content_hash(file_object)
+            try:
+                phash = dhash_file(file_object)
+            except Exception:
+                phash = None
+            return path, digest, phash, None
+    except OSError as e:
+        return path, None, None, str(e)
+
+
+def hash_stored(name: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Хеш и перцептивный хеш уже загруженного файла в хранилище.
+    
+    Returns:
+        (имя, хеш или None, если файла нет, dHash или None)
+    """
+    field = PortfolioItem._meta.get_field('image')
+    try:
+        with field.storage.open(name, 'rb') as file_object:
+            digest = content_hash(file_object)
+            try:
+                phash = dhash_file(file_object)
+            except Exception:
+                phash = None
+            return name, digest, phash
+    except OSError:
+        return name, None, None
+
+
+def phash_stored(name: str) -> Tuple[str, Optional[str]]:
+    """Перцептивный хеш уже загруженного файла (None, если файл не читается)."""
+    field = PortfolioItem._meta.get_field('image')
+    try:
+        with field.storage.open(name, 'rb') as file_object:
+            return name, dhash_file(file_object)
+    except Exception:
+        return name, None
+
+
+def store_photo(path: str) -> Dict:
+    """
+    Сохраняет фотографию в хранилище поля PortfolioItem.image.
+    
+    Хранилище нормализует изображение (см. MediaStorage), затем
+    по сохранённому файлу считаются размеры и заглушка.
+    
+    Returns:
+        Словарь path, name, phash, width, height, placeholder или path, error
+    """
+    field = PortfolioItem._meta.get_field('image')
+    try:
+        with open(path, 'rb') as file_object:
+            phash = dhash_file(file_object)
+            name = field.generate_filename(None, os.path.basename(path))
+            name = field.storage.save(name, File(file_object), max_length=field.max_length)
+    except Exception as e:
+        return {'path': path, 'error': str(e)}
+    
+    metadata = read_field_metadata(field.attr_class(None, field, name))
+    return {
+        'path': path,
+        'name': name,
+        'phash': phash,
+        'width': metadata.width if metadata else None,
+        'height': metadata.height if metadata else None,
+        'placeholder': metadata.placeholder if metadata else '',
+    }
+
+
+class Checkpoint:
+    """
+    Файл с результатами обработанных фотографий.
+    
+    Записывается после фиксации каждой пачки, поэтому прерванный
+    импорт продолжается с первой незафиксированной пачки.
+    Файлы с ошибками не отмечаются и обрабатываются при следующем запуске.
+    Формат: {"done": {"<путь>": "created" | "duplicate"}}.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: Dict[str, str] = {}
+        if path.exists():
+            with open(path, encoding='utf-8') as file_object:
+                self.done = json.load(file_object).get('done', {})
+    
+    def __contains__(self, photo_path: str) -> bool:
+        return photo_path in self.done
+    
+    def mark(self, results: Dict[str, str]) -> None:
+        """Отмечает фотографии обработанными и сохраняет файл."""
+        self.done.update(results)
+        temporary = self.path.with_name(self.path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as file_object:
+            json.dump({'done': self.done}, file_object, ensure_ascii=False)
+        # Замена атомарна: при падении остаётся предыдущая версия
+        os.replace(temporary, self.path)
+    
+    def clear(self) -> None:
+        self.done = {}
+        if self.path.exists():
+            self.path.unlink()
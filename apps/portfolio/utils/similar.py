@@ -0,0 +1,80 @@
+"""
+Поиск похожих работ портфолио по перцептивному хешу (dHash).
+
+Индекс всех хешей строится один раз на процесс и перестраивается
+после изменения работ: его версия - число работ с хешем и время
+последнего изменения работы (updated_at), одним запросом к базе.
+Версия не зависит от кеша, поэтому изменения видны всем процессам.
+Поиск проверяет только кандидатов с близкой частью хеша, поэтому
+проверка новой фотографии против десятков тысяч работ занимает
+доли миллисекунды.
+"""
+
+import threading
+from typing import List, Optional, Tuple
+from django.db.models import Count, Max
+from apps.core.images.phash import HammingIndex, parse_hash
+from apps.portfolio.models import PortfolioItem
+
+
+# Максимальное расстояние Хэмминга между хешами похожих фотографий
+# (из 64 бит): пересжатие - 0-4, кадрирование и цветокоррекция - до 10
+SIMILAR_DISTANCE = 10
+
+_index: Optional[Tuple[object, HammingIndex]] = None
+_lock = threading.Lock()
+
+
+def build_index() -> HammingIndex:
+    """Индекс хешей всех работ (ключ - pk)."""
+    rows = (
+        PortfolioItem.objects
+        .exclude(image_phash='')
+        .values_list('pk', 'image_phash')
+        .iterator(chunk_size=5000)
+    )
+    return HammingIndex((pk, parse_hash(phash)) for pk, phash in rows)
+
+
+def get_version() -> Tuple:
+    """
+    Версия индекса: меняется при добавлении, удалении и сохранении работ.
+    
+    Сохранение через save() обновляет updated_at, удаление и заполнение
+    хешей через update() (find_similar_photos) меняют число работ с хешем.
+    """
+    version = PortfolioItem.objects.exclude(image_phash='').aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return version['count'], version['updated']
+
+
+def get_index() -> HammingIndex:
+    """Индекс текущей версии (перестраивается после изменений работ)."""
+    global _index
+    version = get_version()
+    with _lock:
+        if _index is not None and _index[0] == version:
+            return _index[1]
+    index = build_index()
+    with _lock:
+        _index = (version, index)
+    return index
+
+
+def find_similar(phash: str, distance: int = SIMILAR_DISTANCE,
+                 exclude=None) -> List[Tuple[int, PortfolioItem]]:
+    """
+    Работы с похожим изображением.
+    
+    Args:
+        phash: Перцептивный хеш изображения
+        distance: Максимальное расстояние Хэмминга
+        exclude: pk работы, которую не нужно возвращать (сама проверяемая)
+    
+    Returns:
+        Пары (расстояние, работа) по возрастанию расстояния
+    """
+    if not phash:
+        return []
+    pairs = [(value, pk) for value, pk in get_index().search(parse_hash(phash), distance) if pk != exclude]
+    items = PortfolioItem.objects.select_related('service').in_bulk([pk for _, pk in pairs])
+    return [(value, items[pk]) for value, pk in pairs if pk in items]
@@ -3,20 +3,31 @@ Views для приложения portfolio.
 """
 
 from django.views.generic import ListView
-from django.db.models import Q
+from apps.core.page_cache import PageCacheMixin
+from apps.core.pagination import KeysetPaginationMixin
 from .models import PortfolioItem
+from .search import portfolio_index
+from .utils.albums import build_albums
 from apps.services.models import Service
 
 
-class PortfolioListView(ListView):
+class PortfolioListView(PageCacheMixin, KeysetPaginationMixin, ListView):
     """
     Представление списка работ портфолио с фильтрацией по категориям.
+    
+    Список работ листается по курсору (?cursor=), результаты поиска
+    отсортированы по релевантности и листаются по номеру страницы.
     """
     
     model = PortfolioItem
     template_name = 'portfolio/portfolio_list.html'
     context_object_name = 'portfolio_items'
     paginate_by = 12
+    page_cache_models = ('portfolio.PortfolioItem', 'services.Service')
+    keyset_ordering = ('-date_completed', '-created_at', 'uuid')
+    
+    # Количество работ в одном альбоме
+    ALBUM_WORKS_LIMIT = 6
     
     def get_queryset(self):
         """Получение отфильтрованного списка работ."""
@@ -27,66 +38,45 @@ class PortfolioListView(ListView):
         if service_slug:
             queryset = queryset.filter(service__slug=service_slug)
         
-        # Поиск по названию
+        # Поиск по названию, клиенту и описанию с сортировкой по релевантности.
+        # Фильтр по услуге и поиск выполняются одним запросом.
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(client__icontains=search_query)
-            )
+            queryset = portfolio_index.search(queryset, search_query, prefix=True)
         
         return queryset
     
+    def use_keyset_pagination(self):
+        """Курсор только без поиска: у результатов поиска порядок по релевантности."""
+        return not self.request.GET.get('search')
+    
     def get_context_data(self, **kwargs):
         """Добавление дополнительных данных в контекст."""
         context = super().get_context_data(**kwargs)
         
-        # Все активные услуги для фильтров
-        context['services'] = Service.objects.filter(
-            is_active=True
-        ).order_by('name')
+        # Все активные услуги для фильтров (один запрос на всю страницу)
+        services = list(Service.objects.filter(is_active=True).order_by('name'))
+        context['services'] = services
         
         # Поисковый запрос
         context['search_query'] = self.request.GET.get('search', '')
         
         # Информация о текущей выбранной услуге
         service_slug = self.request.GET.get('service')
-        if service_slug:
-            try:
-                context['current_service'] = Service.objects.get(slug=service_slug, is_active=True)
-            except Service.DoesNotExist:
-                context['current_service'] = None
-        else:
-            context['current_service'] = None
+        context['current_service'] = next(
+            (service for service in services if service_slug and service.slug == service_slug),
+            None
+        )
         
-        # Группировка работ по услугам (только если нет фильтра)
-        if not context['current_service']:
-            portfolio_albums = []
-            # Берем все активные услуги, у которых есть активные работы (включая без фото)
-            services_with_works = Service.objects.filter(
-                is_active=True,
-                portfolio_works__is_active=True
-            ).distinct().order_by('order', 'name')
-            
-            for service in services_with_works:
-                # Берем все активные работы для услуги, включая те, у которых нет фото
-                works = PortfolioItem.objects.filter(
-                    is_active=True,
-                    service=service
-                ).select_related('service').order_by('-date_completed', '-created_at')[:6]  # Берем первые 6 работ
-                
-                if works.exists():
-                    portfolio_albums.append({
-                        'title': service.name,
-                        'slug': service.slug,
-                        'description': service.description or f'Примеры наших работ в категории "{service.name}"',
-                        'works': list(works),
-                        'count': PortfolioItem.objects.filter(is_active=True, service=service).count(),
-                        'service': service,
-                    })
-            
-            context['portfolio_albums'] = portfolio_albums
+        # Группировка работ по услугам (только если нет фильтра и поиска).
+        # Все альбомы собираются одним запросом независимо от числа услуг.
+        if not context['current_service'] and not context['search_query']:
+            album_services = sorted(services, key=lambda service: (service.order, service.name))
+            context['portfolio_albums'] = build_albums(
+                album_services,
+                works_per_album=self.ALBUM_WORKS_LIMIT,
+                skip_empty=True
+            )
         
         return context
 
@@ -11,10 +11,10 @@ from apps.services.models import Service
 class ServiceAdmin(admin.ModelAdmin):
     """Админка для управления услугами."""
     
-    list_display = ('name', 'price_display', 'order', 'is_active', 'icon_preview', 'image_preview', 'created_at')
-    list_filter = ('is_active', 'created_at')
+    list_display = ('name', 'price_display', 'order', 'is_featured', 'is_active', 'icon_preview', 'image_preview', 'created_at')
+    list_filter = ('is_active', 'is_featured', 'created_at')
     search_fields = ('name', 'description')
-    list_editable = ('order', 'is_active')
+    list_editable = ('order', 'is_featured', 'is_active')
     ordering = ('order', 'name')
     
     fieldsets = (
@@ -33,7 +33,7 @@ class ServiceAdmin(admin.ModelAdmin):
             'fields': ('price_from', 'price_unit')
         }),
         ('Настройки отображения', {
-            'fields': ('order', 'is_active')
+            'fields': ('order', 'is_featured', 'is_active')
         }),
     )
     
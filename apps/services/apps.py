@@ -11,4 +11,8 @@ class ServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.services'
     verbose_name = 'Услуги'
-
+    
+    def ready(self):
+        """Подключение обновления поискового индекса."""
+        from apps.services.search import service_index
+        service_index.connect_signals()
@@ -0,0 +1,108 @@
+"""
+Management command для сравнения скорости поиска услуг.
+
+Сравнивает текущий полнотекстовый индекс с прежним фильтром
+name__icontains | description__icontains на временной базе.
+
+Использование:
+    python manage.py benchmark_search
+    python manage.py benchmark_search --rows 10000 100000 --repeat 10
+"""
+
+import random
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from apps.core.benchmark import measure, temporary_database
+from apps.services.models import Service
+from apps.services.search import service_index
+
+
+# Слова предметной области, по которым выполняются запросы
+DOMAIN_WORDS = [
+    'вывески', 'световые', 'неоновая', 'подсветка', 'буквы', 'объемные', 'оклейка',
+    'автомобилей', 'печать', 'баннеров', 'холсты', 'интерьерные', 'наклейки', 'стенды',
+    'полиграфия', 'визитки', 'таблички', 'короба', 'монтаж', 'изготовление',
+]
+
+QUERIES = ['вывески', 'неоновая подсветка', 'оклейка автомобилей', 'широкоформатная печать']
+
+SYLLABLES = ['ка', 'ро', 'ми', 'ле', 'ны', 'то', 'ва', 'ре', 'ло', 'су', 'ди', 'па', 'ге', 'ну']
+
+
+class Command(BaseCommand):
+    """Бенчмарк поиска по каталогу услуг."""
+    
+    help = 'Сравнивает полнотекстовый поиск услуг с фильтром icontains'
+    
+    def add_arguments(self, parser):
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10000, 100000],
+            help='Размеры каталога для замеров (по возрастанию)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов каждого запроса'
+        )
+    
+    def handle(self, *args, **options):
+        """Основной метод выполнения команды."""
+        random.seed(42)
+        
+        with temporary_database():
+            created = 0
+            for rows in sorted(options['rows']):
+                self.stdout.write(f'\n[*] Наполнение каталога до {rows} услуг...')
+                self.create_services(created, rows)
+                created = rows
+                service_index.rebuild()
+                
+                self.stdout.write(f'{"Запрос":<28}{"icontains, мс":>16}{"индекс, мс":>14}{"найдено":>10}')
+                for query in QUERIES:
+                    self.benchmark_query(query, options['repeat'])
+    
+    def create_services(self, start: int, end: int):
+        """Создаёт услуги со случайными описаниями в HTML."""
+        batch = []
+        for index in range(start, end):
+            batch.append(Service(
+                name=f'{random.choice(DOMAIN_WORDS).capitalize()} {self.random_word()} {index}',
+                slug=f'benchmark-{index}',
+                description=self.random_description(),
+            ))
+            if len(batch) >= 5000:
+                Service.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Service.objects.bulk_create(batch)
+    
+    def random_word(self) -> str:
+        return ''.join(random.choice(SYLLABLES) for _ in range(random.randint(2, 4)))
+    
+    def random_description(self) -> str:
+        paragraphs = []
+        for _ in range(random.randint(1, 3)):
+            words = [
+                random.choice(DOMAIN_WORDS) if random.random() < 0.05 else self.random_word()
+                for _ in range(random.randint(20, 60))
+            ]
+            paragraphs.append(f'<p style="text-align: justify;">{" ".join(words)}</p>')
+        return ''.join(paragraphs)
+    
+    def benchmark_query(self, query: str, repeat: int):
+        """Замер одного запроса: COUNT для пагинации и первая страница."""
+        base = Service.objects.filter(is_active=True)
+        icontains = base.filter(Q(name__icontains=query) | Q(description__icontains=query))
+        indexed = service_index.search(base, query)
+        
+        def run(queryset):
+            return lambda: (queryset.count(), list(queryset[:12]))
+        
+        icontains_ms = measure(run(icontains), repeat)
+        indexed_ms = measure(run(indexed), repeat)
+        self.stdout.write(f'{query:<28}{icontains_ms:>16.2f}{indexed_ms:>14.2f}{indexed.count():>10}')
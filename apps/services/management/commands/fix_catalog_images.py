@@ -45,8 +45,11 @@ class Command(BaseCommand):
                 try:
                     service = Service.objects.get(name=service_name)
                     
-                    # Удаляем старое изображение если есть
-                    if service.image:
+                    # Удаляем старое изображение если есть (и на него не ссылаются
+                    # другие услуги: одинаковые файлы хранятся один раз)
+                    if service.image and not Service.objects.filter(
+                        image=service.image.name
+                    ).exclude(pk=service.pk).exists():
                         service.image.delete(save=False)
                     
                     # Загружаем новое изображение
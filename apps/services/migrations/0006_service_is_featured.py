@@ -0,0 +1,28 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:04
+
+from django.db import migrations, models
+
+
+# Услуги, альбомы которых раньше были зашиты в HomeView
+HOME_ALBUM_SLUGS = ['vyveski', 'okleika-avto', 'neon', 'interiernye-resheniia']
+
+
+def feature_home_albums(apps, schema_editor):
+    Service = apps.get_model('services', 'Service')
+    Service.objects.filter(slug__in=HOME_ALBUM_SLUGS).update(is_featured=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_remove_service_category_delete_servicecategory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='is_featured',
+            field=models.BooleanField(default=False, help_text='Показывать альбом работ по этой услуге на главной странице', verbose_name='Альбом на главной'),
+        ),
+        migrations.RunPython(feature_home_albums, migrations.RunPython.noop),
+    ]
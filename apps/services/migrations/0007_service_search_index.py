@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from apps.core.search.migration_v1 import search_index_operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_service_is_featured'),
+    ]
+
+    # Таблица и поля индекса (с весами 'A'-'D') на момент этой миграции.
+    # Записаны здесь, а не взяты из apps.services.search: миграция не должна
+    # меняться вместе с кодом индекса
+    operations = [
+        search_index_operation(
+            'services', 'Service',
+            table='services_service_search',
+            fields={'name': 'A', 'description': 'C'},
+            html_fields=['description'],
+        ),
+    ]
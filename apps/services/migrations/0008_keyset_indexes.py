@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_service_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['order', 'name', 'uuid'], name='service_keyset_idx'),
+        ),
+    ]
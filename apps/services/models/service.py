@@ -21,6 +21,7 @@ class Service(BaseModel):
         price_from: Цена от
         price_unit: Единица измерения цены
         order: Порядок отображения
+        is_featured: Альбом работ на главной
         is_active: Активность
     """
     
@@ -85,6 +86,12 @@ class Service(BaseModel):
         validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
     
+    is_featured = models.BooleanField(
+        default=False,
+        verbose_name='Альбом на главной',
+        help_text='Показывать альбом работ по этой услуге на главной странице'
+    )
+    
     is_active = models.BooleanField(
         default=True,
         verbose_name='Активна',
@@ -117,6 +124,10 @@ class Service(BaseModel):
         verbose_name = 'Услуга'
         verbose_name_plural = 'Услуги'
         ordering = ['order', 'name']
+        indexes = [
+            # Keyset пагинация каталога
+            models.Index(fields=['order', 'name', 'uuid'], name='service_keyset_idx'),
+        ]
     
     def __str__(self) -> str:
         return self.name
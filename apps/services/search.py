@@ -0,0 +1,17 @@
+"""
+Полнотекстовый индекс услуг.
+"""
+
+from apps.core.search import SearchIndex
+from apps.services.models import Service
+
+
+# Поля индекса и их веса: название важнее описания
+SERVICE_SEARCH_FIELDS = {'name': 'A', 'description': 'C'}
+SERVICE_SEARCH_HTML_FIELDS = ['description']
+
+service_index = SearchIndex(
+    Service,
+    fields=SERVICE_SEARCH_FIELDS,
+    html_fields=SERVICE_SEARCH_HTML_FIELDS,
+)
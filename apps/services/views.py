@@ -3,35 +3,43 @@ Views для приложения services.
 """
 
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
+from apps.core.page_cache import PageCacheMixin
+from apps.core.pagination import KeysetPaginationMixin
 from .models import Service
+from .search import service_index
 from apps.portfolio.models import PortfolioItem
 
 
-class CatalogView(ListView):
+class CatalogView(PageCacheMixin, KeysetPaginationMixin, ListView):
     """
     Представление каталога услуг с фильтрацией по категориям.
+    
+    Каталог листается по курсору (?cursor=), результаты поиска
+    отсортированы по релевантности и листаются по номеру страницы.
     """
     
     model = Service
     template_name = 'services/catalog.html'
     context_object_name = 'services'
     paginate_by = 12
+    page_cache_models = ('services.Service',)
+    keyset_ordering = ('order', 'name', 'uuid')
     
     def get_queryset(self):
         """Получение отфильтрованного списка услуг."""
         queryset = Service.objects.filter(is_active=True)
         
-        # Поиск по названию
+        # Полнотекстовый поиск по названию и описанию с сортировкой по релевантности
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) | 
-                Q(description__icontains=search_query)
-            )
+            queryset = service_index.search(queryset, search_query)
         
         return queryset
     
+    def use_keyset_pagination(self):
+        """Курсор только без поиска: у результатов поиска порядок по релевантности."""
+        return not self.request.GET.get('search')
+    
     def get_context_data(self, **kwargs):
         """Добавление дополнительных данных в контекст."""
         context = super().get_context_data(**kwargs)
@@ -42,7 +50,7 @@ class CatalogView(ListView):
         return context
 
 
-class ServiceDetailView(DetailView):
+class ServiceDetailView(PageCacheMixin, DetailView):
     """
     Представление детальной страницы услуги.
     """
@@ -52,6 +60,7 @@ class ServiceDetailView(DetailView):
     context_object_name = 'service'
     slug_field = 'slug'
     slug_url_kwarg = 'slug'
+    page_cache_models = ('services.Service', 'portfolio.PortfolioItem')
     
     def get_queryset(self):
         """Получение услуги."""
@@ -9,8 +9,8 @@ from django.contrib.sitemaps.views import sitemap
 from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
 from decouple import config
+from apps.core.media import serve_media
 from apps.main.sitemaps import StaticViewSitemap, ServiceSitemap, PortfolioSitemap
 
 # Получаем кастомный URL для админки из настроек
@@ -50,9 +50,10 @@ if settings.DEBUG:
     from django.contrib.staticfiles.urls import staticfiles_urlpatterns
     urlpatterns += staticfiles_urlpatterns()
 else:
-    # В production медиа раздаём через Django (или лучше через Nginx)
+    # В production Django проверяет путь, а файл отдаёт nginx/Apache
+    # (MEDIA_SERVE_MODE=accel/sendfile) или сам Django с Range и ETag
     urlpatterns += [
-        re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+        re_path(r'^media/(?P<path>.*)$', serve_media, name='media'),
     ]
     # Статика обрабатывается через WhiteNoise middleware
 
@@ -0,0 +1,136 @@
+"""
+Тесты построения альбомов портфолио.
+"""
+
+from datetime import date
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from apps.services.models import Service
+from apps.portfolio.models import PortfolioItem
+from apps.portfolio.utils.albums import build_albums
+
+
+class BuildAlbumsTest(TestCase):
+    """Тесты для build_albums."""
+    
+    def setUp(self):
+        """Подготовка данных для тестов."""
+        self.signs = Service.objects.create(name='Вывески', description='', order=1, is_featured=True)
+        self.neon = Service.objects.create(name='Неон', description='', order=2, is_featured=True)
+        self.empty = Service.objects.create(name='Холсты', description='', order=3)
+        
+        for day in range(1, 7):
+            PortfolioItem.objects.create(
+                title=f'Вывеска {day}',
+                description='',
+                image='portfolio/sign.jpg',
+                service=self.signs,
+                date_completed=date(2024, 1, day)
+            )
+        PortfolioItem.objects.create(
+            title='Неон',
+            description='',
+            image='portfolio/neon.jpg',
+            service=self.neon
+        )
+        PortfolioItem.objects.create(
+            title='Скрытая работа',
+            description='',
+            image='portfolio/hidden.jpg',
+            service=self.neon,
+            is_active=False
+        )
+    
+    def test_top_works_and_counts(self):
+        """Тест выборки первых работ и общего количества."""
+        albums = build_albums([self.signs, self.neon], works_per_album=4)
+        
+        self.assertEqual([album['slug'] for album in albums], [self.signs.slug, self.neon.slug])
+        self.assertEqual(
+            [work.title for work in albums[0]['works']],
+            ['Вывеска 6', 'Вывеска 5', 'Вывеска 4', 'Вывеска 3']
+        )
+        self.assertEqual(albums[0]['count'], 6)
+        self.assertEqual(albums[1]['count'], 1)
+    
+    def test_empty_albums(self):
+        """Тест услуг без работ."""
+        albums = build_albums([self.signs, self.empty], works_per_album=4)
+        self.assertEqual(albums[1]['works'], [])
+        self.assertEqual(albums[1]['count'], 0)
+        
+        albums = build_albums([self.signs, self.empty], works_per_album=4, skip_empty=True)
+        self.assertEqual(len(albums), 1)
+    
+    def test_single_query(self):
+        """Тест: альбомы строятся одним запросом к работам."""
+        services = list(Service.objects.all())
+        with self.assertNumQueries(1):
+            albums = build_albums(services, works_per_album=4)
+            for album in albums:
+                for work in album['works']:
+                    work.service.name
+    
+    @override_settings(
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        PAGE_CACHE_ENABLED=False
+    )
+    def test_home_uses_featured_services(self):
+        """Тест: на главной показываются только отмеченные услуги."""
+        response = self.client.get('/')
+        titles = [album['title'] for album in response.context['portfolio_albums']]
+        self.assertEqual(titles, ['Вывески', 'Неон'])
+
+
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PAGE_CACHE_ENABLED=False
+)
+class PortfolioListAlbumsTest(TestCase):
+    """Тесты альбомов на странице портфолио."""
+    
+    def create_services(self, count: int, start: int = 0):
+        """Создаёт услуги с двумя работами каждая."""
+        services = Service.objects.bulk_create([
+            Service(name=f'Услуга {index:03d}', slug=f'service-{index}', description='', order=0)
+            for index in range(start, start + count)
+        ])
+        PortfolioItem.objects.bulk_create([
+            PortfolioItem(
+                title=f'{service.name} #{number}',
+                description='',
+                image='portfolio/work.jpg',
+                service=service
+            )
+            for service in services
+            for number in range(2)
+        ])
+    
+    def count_page_queries(self) -> int:
+        """Количество запросов при открытии страницы без фильтра."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/portfolio/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+    
+    def test_albums_skip_services_without_works(self):
+        """Тест: услуги без работ не попадают в альбомы."""
+        self.create_services(2)
+        Service.objects.create(name='Без работ', description='')
+        response = self.client.get('/portfolio/')
+        albums = response.context['portfolio_albums']
+        self.assertEqual([album['title'] for album in albums], ['Услуга 000', 'Услуга 001'])
+        self.assertEqual(albums[0]['count'], 2)
+    
+    def test_query_count_is_constant(self):
+        """Тест: число запросов не растёт с количеством услуг."""
+        self.create_services(5)
+        small = self.count_page_queries()
+        self.assertEqual(len(self.client.get('/portfolio/').context['portfolio_albums']), 5)
+        
+        self.create_services(195, start=5)
+        large = self.count_page_queries()
+        self.assertEqual(len(self.client.get('/portfolio/').context['portfolio_albums']), 200)
+        
+        self.assertEqual(small, large)
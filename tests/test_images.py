@@ -0,0 +1,372 @@
+"""
+Тесты адаптивных изображений.
+"""
+
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+from apps.core.images import FALLBACK, get_all_variants, get_modern_formats, get_variants
+from apps.core.images.workers import ImageJob, claim_jobs, enqueue, process_queue
+from apps.core.models import ImageVariantJob
+from apps.portfolio.models import PortfolioItem
+
+
+def make_image(width: int, height: int, name: str = 'photo.jpg', noise: bool = False) -> SimpleUploadedFile:
+    """JPEG заданного размера для загрузки в ImageField."""
+    buffer = BytesIO()
+    if noise:
+        # Шум плохо сжимается - для проверки предела размера
+        image = Image.frombytes('RGB', (width, height), os.urandom(width * height * 3))
+    else:
+        image = Image.new('RGB', (width, height), (200, 80, 40))
+    image.save(buffer, 'JPEG', quality=95)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ResponsiveImageTest(TestCase):
+    """Тесты вариантов изображений и тега responsive_image."""
+    
+    def setUp(self):
+        """Временный MEDIA_ROOT для загруженных файлов и миниатюр."""
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        # Ключи sorl в кеше: файлы с тем же именем из других тестов
+        cache.clear()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def create_item(self, width: int, height: int, noise: bool = False) -> PortfolioItem:
+        return PortfolioItem.objects.create(title='Вывеска', description='', image=make_image(width, height, noise=noise))
+    
+    def test_variants_for_large_image(self):
+        """Тест вариантов всех ширин для крупного оригинала."""
+        item = self.create_item(2000, 1500)
+        variants = get_variants(item.image, 'grid')
+        self.assertEqual([variant.width for variant in variants], [320, 480, 640])
+        self.assertTrue(all('/cache/' in variant.url for variant in variants))
+    
+    def test_no_upscale(self):
+        """Тест: варианты не крупнее оригинала."""
+        item = self.create_item(400, 300)
+        variants = get_variants(item.image, 'grid')
+        self.assertEqual([variant.width for variant in variants], [320, 400])
+    
+    def test_missing_file_falls_back_to_original(self):
+        """Тест отсутствующего файла: ссылка на оригинал вместо ошибки."""
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image='portfolio/missing.jpg')
+        variants = get_variants(item.image, 'grid')
+        self.assertEqual([variant.url for variant in variants], [item.image.url])
+    
+    def test_template_tag(self):
+        """Тест разметки <img> с srcset и sizes."""
+        item = self.create_item(1000, 750)
+        get_all_variants(item.image, 'grid')
+        html = Template(
+            "{% load images %}{% responsive_image item.image 'grid' alt=item.title class='img-fluid' %}"
+        ).render(Context({'item': item}))
+        self.assertTrue(html.startswith('<picture>'))
+        self.assertIn('srcset="', html)
+        self.assertIn(' 640w', html)
+        if 'WEBP' in get_modern_formats():
+            self.assertIn('<source type="image/webp"', html)
+            self.assertIn('.webp 640w', html)
+        self.assertIn('sizes="(max-width: 576px) 50vw', html)
+        self.assertIn('alt="Вывеска"', html)
+        self.assertIn('class="img-fluid"', html)
+        self.assertIn('loading="lazy"', html)
+    
+    @override_settings(IMAGE_FORMATS={'WEBP': 75})
+    def test_template_tag_cold_cache(self):
+        """Тест: вывод в шаблоне не создаёт вариантов, а ставит задачу в очередь."""
+        item = self.create_item(1000, 750)
+        html = Template(
+            "{% load images %}{% responsive_image item.image 'grid' %}"
+            "<div style=\"{% background_image item.image 'hero' %}\"></div>"
+        ).render(Context({'item': item}))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'cache')))
+        self.assertIn(f'<img src="{item.image.url}"', html)
+        self.assertIn(f"background-image: url('{item.image.url}')", html)
+        self.assertNotIn('image-set', html)
+        self.assertEqual(
+            sorted(ImageVariantJob.objects.values_list('size_name', 'status')),
+            [('grid', 'pending'), ('hero', 'pending')]
+        )
+        
+        # После выполнения задачи выводятся варианты
+        self.assertEqual([error for _, error in process_queue(0)], [None, None])
+        cache.clear()
+        html = Template("{% load images %}{% responsive_image item.image 'grid' %}").render(Context({'item': item}))
+        self.assertIn('<source type="image/webp"', html)
+    
+    def test_empty_image(self):
+        """Тест пустого поля изображения."""
+        html = Template("{% load images %}{% responsive_image image 'grid' %}").render(Context({'image': None}))
+        self.assertEqual(html, '')
+    
+    def test_modern_formats(self):
+        """Тест вариантов WebP/AVIF меньше исходного формата."""
+        item = self.create_item(700, 525, noise=True)
+        variants = get_all_variants(item.image, 'grid')
+        for format_name in get_modern_formats():
+            self.assertEqual([variant.width for variant in variants[format_name]], [320, 480, 640])
+            self.assertTrue(variants[format_name][-1].url.endswith(f'.{format_name.lower()}'))
+            self.assertLess(variants[format_name][-1].bytes, item.image.size)
+    
+    def test_budget_lowers_quality(self):
+        """Тест снижения качества варианта сверх предела размера."""
+        item = self.create_item(700, 525, noise=True)
+        sizes = {**settings.IMAGE_SIZES, 'grid': {**settings.IMAGE_SIZES['grid'], 'budget_kb': None}}
+        with override_settings(IMAGE_SIZES=sizes, IMAGE_FORMATS={}):
+            free = get_variants(item.image, 'grid')[-1]
+        
+        sizes['grid']['budget_kb'] = 10
+        with override_settings(IMAGE_SIZES=sizes, IMAGE_FORMATS={}):
+            limited = get_variants(item.image, 'grid')[-1]
+        self.assertLess(limited.bytes, free.bytes)
+    
+    @override_settings(IMAGE_FORMATS={'WEBP': 75})
+    def test_queued_on_save(self):
+        """Тест: сохранение ставит задачи в очередь, варианты создаёт команда в пуле процессов."""
+        with self.captureOnCommitCallbacks(execute=True):
+            item = self.create_item(800, 600)
+        jobs = ImageVariantJob.objects.filter(name=item.image.name)
+        self.assertEqual(
+            sorted(jobs.values_list('size_name', 'status')),
+            [('grid', 'pending'), ('modal', 'pending')]
+        )
+        self.assertEqual(get_all_variants(item.image, 'modal', generate=False), {})
+        
+        errors = [error for _, error in process_queue(2)]
+        self.assertEqual(errors, [None, None])
+        self.assertFalse(jobs.exclude(status=ImageVariantJob.Status.DONE).exists())
+        
+        # Набор берётся из базы: кеш у каждого процесса сайта свой
+        cache.clear()
+        variants = get_all_variants(item.image, 'modal', generate=False)
+        self.assertEqual(variants[FALLBACK][-1].width, 800)
+        self.assertEqual(variants['WEBP'][-1].width, 800)
+    
+    def test_failed_job(self):
+        """Тест: ошибка записывается в очередь, задача не повторяется до новой постановки."""
+        job = ImageJob('portfolio.PortfolioItem', 'image', 'portfolio/missing.jpg', 'grid')
+        self.assertEqual(enqueue([job]), 1)
+        self.assertEqual(claim_jobs(10), [job])
+        self.assertEqual(claim_jobs(10), [])  # уже занята
+        
+        ImageVariantJob.objects.update(claimed_until=None)
+        [(_, error)] = process_queue(0)
+        self.assertIsNotNone(error)
+        row = ImageVariantJob.objects.get()
+        self.assertEqual((row.status, row.attempts), (ImageVariantJob.Status.FAILED, 1))
+        self.assertEqual(list(process_queue(0)), [])
+        
+        self.assertEqual(enqueue([job]), 1)
+        self.assertEqual(ImageVariantJob.objects.get().status, ImageVariantJob.Status.PENDING)
+    
+    @override_settings(IMAGE_FORMATS={'WEBP': 75})
+    def test_generate_command(self):
+        """Тест команды: создаёт недостающее, повторный запуск ничего не делает."""
+        item = self.create_item(700, 525)
+        out = StringIO()
+        call_command('generate_image_variants', '--workers', '2', '--size', 'grid', stdout=out)
+        self.assertIn('Нужно создать: 1', out.getvalue())
+        self.assertEqual(get_all_variants(item.image, 'grid', generate=False)['WEBP'][-1].width, 640)
+        
+        out = StringIO()
+        call_command('generate_image_variants', '--size', 'grid', stdout=out)
+        self.assertIn('Все варианты уже созданы', out.getvalue())
+        
+        # Изменение пресета: варианты создаются заново
+        sizes = {**settings.IMAGE_SIZES, 'grid': {**settings.IMAGE_SIZES['grid'], 'widths': [300, 600]}}
+        with override_settings(IMAGE_SIZES=sizes):
+            out = StringIO()
+            call_command('generate_image_variants', '--workers', '0', '--size', 'grid', stdout=out)
+            self.assertIn('Нужно создать: 1', out.getvalue())
+            variants = get_all_variants(item.image, 'grid', generate=False)
+        self.assertEqual([variant.width for variant in variants[FALLBACK]], [300, 600])
+    
+    @override_settings(IMAGE_FORMATS={'WEBP': 75})
+    def test_background_image_fallback_type(self):
+        """Тест: тип запасного варианта в image-set() - по расширению файла."""
+        buffer = BytesIO()
+        Image.new('RGB', (800, 600), (10, 120, 200)).save(buffer, 'PNG')
+        item = PortfolioItem.objects.create(
+            title='Вывеска', description='', image=SimpleUploadedFile('slide.png', buffer.getvalue())
+        )
+        get_all_variants(item.image, 'hero')
+        html = Template("{% load images %}{% background_image item.image 'hero' %}").render(Context({'item': item}))
+        self.assertIn("type('image/webp')", html)
+        self.assertIn(".png') type('image/png')", html)
+    
+    @override_settings(
+        IMAGE_FORMATS={'AVIF': 50, 'WEBP': 75},
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage'
+    )
+    def test_static_picture(self):
+        """Тест: картинка из static выводится с AVIF/WebP, созданными convert_static_images."""
+        html = Template("{% load images %}{% static_picture 'img/Logo.png' alt='Лого' %}").render(Context())
+        self.assertIn('<source type="image/webp" srcset="/static/img/Logo.webp">', html)
+        self.assertIn('<source type="image/avif" srcset="/static/img/Logo.avif">', html)
+        self.assertTrue(html.endswith('<img src="/static/img/Logo.png" alt="Лого"></picture>'))
+        
+        # Файлов в современных форматах нет - только <img>
+        html = Template("{% load images %}{% static_picture 'img/missing.png' %}").render(Context())
+        self.assertEqual(html, '<img src="/static/img/missing.png" alt="">')
+    
+    def test_report(self):
+        """Тест отчёта об экономии."""
+        self.create_item(700, 525)
+        out = StringIO()
+        with override_settings(IMAGE_FORMATS={'WEBP': 75}):
+            call_command('image_report', stdout=out)
+        self.assertIn('PortfolioItem.image / grid', out.getvalue())
+        self.assertIn('Экономия', out.getvalue())
+
+
+def make_phone_photo(width: int, height: int, orientation: int = 6) -> SimpleUploadedFile:
+    """JPEG с EXIF как у фотографии с телефона: поворот и координаты GPS."""
+    image = Image.new('RGB', (width, height), (200, 80, 40))
+    # Левая половина темнее - по ней проверяется поворот
+    image.paste((20, 20, 20), (0, 0, width // 2, height))
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = 'Телефон'
+    exif[0x8825] = {1: 'N', 2: (55.0, 45.0, 0.0)}
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=95, exif=exif)
+    return SimpleUploadedFile('phone.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(IMAGE_UPLOAD_MAX_EDGE=1000, IMAGE_FORMATS={})
+class ImageNormalizationTest(TestCase):
+    """Тесты нормализации загружаемых изображений."""
+    
+    def setUp(self):
+        """Временные MEDIA_ROOT и каталог оригиналов."""
+        self.media_root = tempfile.mkdtemp()
+        self.originals_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_ORIGINALS_ROOT=self.originals_root)
+        self.override.enable()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        shutil.rmtree(self.originals_root, ignore_errors=True)
+    
+    def test_phone_photo_normalized(self):
+        """Тест: поворот применён, метаданные удалены, размер уменьшен, оригинал сохранён."""
+        upload = make_phone_photo(1600, 1200)
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=upload)
+        
+        with Image.open(item.image.path) as image:
+            self.assertEqual(image.size, (750, 1000))
+            self.assertNotIn('exif', image.info)
+            # После поворота на 90° по часовой тёмная половина сверху
+            self.assertLess(image.getpixel((375, 100))[0], 100)
+            self.assertGreater(image.getpixel((375, 900))[0], 100)
+        
+        original = os.path.join(self.originals_root, item.image.name)
+        with open(original, 'rb') as file_object:
+            self.assertEqual(file_object.read(), upload.file.getvalue())
+    
+    def test_clean_image_untouched(self):
+        """Тест: небольшое изображение без метаданных сохраняется как есть."""
+        upload = make_image(800, 600)
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=upload)
+        with open(item.image.path, 'rb') as file_object:
+            self.assertEqual(file_object.read(), upload.file.getvalue())
+        self.assertEqual(os.listdir(self.originals_root), [])
+    
+    def test_other_paths_untouched(self):
+        """Тест: файлы вне IMAGE_UPLOAD_PATHS (миниатюры) не изменяются."""
+        upload = make_phone_photo(1600, 1200)
+        name = default_storage.save('cache/phone.jpg', upload)
+        with default_storage.open(name) as file_object:
+            self.assertEqual(file_object.read(), upload.file.getvalue())
+    
+    def test_report_and_apply(self):
+        """Тест отчёта и замены уже загруженных файлов."""
+        path = os.path.join(self.media_root, 'uploads', 'phone.jpg')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as file_object:
+            file_object.write(make_phone_photo(1600, 1200).file.getvalue())
+        before = os.path.getsize(path)
+        
+        out = StringIO()
+        call_command('normalize_media', '--workers', '0', stdout=out)
+        self.assertIn('Для замены файлов запустите с --apply', out.getvalue())
+        self.assertEqual(os.path.getsize(path), before)
+        
+        call_command('normalize_media', '--apply', '--workers', '2', stdout=StringIO())
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (750, 1000))
+        self.assertEqual(os.path.getsize(os.path.join(self.originals_root, 'uploads', 'phone.jpg')), before)
+
+
+@override_settings(IMAGE_FORMATS={})
+class ImageMetadataTest(TestCase):
+    """Тесты хранимых размеров и размытых заглушек."""
+    
+    def setUp(self):
+        """Временный MEDIA_ROOT."""
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        cache.clear()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def test_saved_with_image(self):
+        """Тест: размеры и заглушка вычисляются при сохранении."""
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=make_image(800, 600))
+        item.refresh_from_db()
+        self.assertEqual((item.image_width, item.image_height), (800, 600))
+        self.assertTrue(item.image_placeholder.startswith('data:image/'))
+        self.assertLess(len(item.image_placeholder), 1000)
+    
+    @override_settings(IMAGE_UPLOAD_MAX_EDGE=1000)
+    def test_dimensions_after_normalization(self):
+        """Тест: хранятся размеры файла после нормализации и поворота."""
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=make_phone_photo(1600, 1200))
+        item.refresh_from_db()
+        self.assertEqual((item.image_width, item.image_height), (750, 1000))
+    
+    def test_template_attributes(self):
+        """Тест атрибутов width/height и фона-заглушки в <img>."""
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=make_image(800, 600))
+        get_all_variants(item.image, 'grid')
+        html = Template("{% load images %}{% responsive_image item.image 'grid' alt='Работа' %}").render(
+            Context({'item': item})
+        )
+        self.assertIn('width="800"', html)
+        self.assertIn('height="600"', html)
+        self.assertIn('background: center / cover no-repeat url(&quot;data:image/', html)
+    
+    def test_backfill_command(self):
+        """Тест заполнения уже загруженных изображений и пропуска отсутствующих файлов."""
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=make_image(640, 480))
+        missing = PortfolioItem.objects.create(title='Без файла', description='', image='portfolio/missing.jpg')
+        PortfolioItem.objects.update(image_width=None, image_height=None, image_placeholder='')
+        
+        out = StringIO()
+        call_command('backfill_image_metadata', '--workers', '0', stdout=out)
+        self.assertIn('Заполнено: 1 из 2', out.getvalue())
+        item.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertEqual((item.image_width, item.image_height), (640, 480))
+        self.assertTrue(item.image_placeholder)
+        self.assertIsNone(missing.image_width)
@@ -0,0 +1,321 @@
+"""
+Тесты раздачи медиафайлов (apps/core/media.py).
+"""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.http import http_date
+from apps.core.images import get_all_variants
+from apps.core.images.storage import content_name, is_content_name
+from apps.core.images.workers import process_queue
+from apps.core.media import parse_range
+from apps.core.models import ImageVariantJob
+from apps.main.models import Slider
+from apps.portfolio.models import PortfolioItem
+from tests.test_images import make_image
+
+
+CONTENT = bytes(range(256)) * 40  # 10240 байт
+
+
+class MediaServingTest(TestCase):
+    """Тесты заголовков и диапазонов байт без nginx."""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.media_root, 'portfolio'))
+        self.path = os.path.join(self.media_root, 'portfolio', 'photo.jpg')
+        with open(self.path, 'wb') as file_object:
+            file_object.write(CONTENT)
+        with open(os.path.join(self.media_root, '.secret'), 'w') as file_object:
+            file_object.write('secret')
+        self.override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE='python', MEDIA_CACHE_MAX_AGE=3600)
+        self.override.enable()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def get(self, **headers):
+        return self.client.get('/media/portfolio/photo.jpg', **headers)
+    
+    def test_full_file(self):
+        """Тест: весь файл с ETag, Last-Modified и Cache-Control."""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(response['Last-Modified'], http_date(int(os.stat(self.path).st_mtime)))
+        self.assertTrue(response['ETag'].startswith('"'))
+    
+    def test_conditional_requests(self):
+        """Тест: 304 по If-None-Match и If-Modified-Since, 200 после изменения файла."""
+        response = self.get()
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_ranges(self):
+        """Тест диапазонов байт: a-b, a-, -n, 416 вне файла и перевёрнутый диапазон."""
+        for header, start, end in (
+            ('bytes=0-99', 0, 99),
+            ('bytes=10000-', 10000, 10239),
+            ('bytes=-100', 10140, 10239),
+            ('bytes=10200-20000', 10200, 10239),
+        ):
+            response = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(b''.join(response.streaming_content), CONTENT[start:end + 1], header)
+            self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{len(CONTENT)}')
+            self.assertEqual(response['Content-Length'], str(end - start + 1))
+        
+        response = self.get(HTTP_RANGE='bytes=20000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+        
+        response = self.get(HTTP_RANGE='bytes=500-100')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+    
+    def test_if_range(self):
+        """Тест: устаревший If-Range отдаёт весь файл."""
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"other"').status_code, 200)
+    
+    def test_forbidden_paths(self):
+        """Тест: скрытые файлы, выход за MEDIA_ROOT и отсутствующие файлы - 404."""
+        for url in ('/media/.secret', '/media/portfolio/../.secret', '/media/../manage.py',
+                    '/media/portfolio/missing.jpg', '/media/portfolio'):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+        self.assertEqual(self.client.post('/media/portfolio/photo.jpg').status_code, 405)
+    
+    def test_offload_headers(self):
+        """Тест: в режимах accel и sendfile файл отдаёт веб-сервер."""
+        with override_settings(MEDIA_SERVE_MODE='accel', MEDIA_ACCEL_PREFIX='/protected-media/'):
+            response = self.get()
+            self.assertEqual(response['X-Accel-Redirect'], '/protected-media/portfolio/photo.jpg')
+            self.assertEqual(response['Content-Type'], 'image/jpeg')
+            self.assertEqual(response.content, b'')
+            self.assertEqual(self.client.get('/media/.secret').status_code, 404)
+        
+        with override_settings(MEDIA_SERVE_MODE='sendfile'):
+            response = self.get()
+            self.assertEqual(response['X-Sendfile'], self.path)
+            self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+    
+    def test_parse_range(self):
+        """Тест разбора заголовка Range."""
+        self.assertEqual(parse_range('bytes=5-', 10), (5, 9))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 10))
+        self.assertIsNone(parse_range('items=0-1', 10))
+        with self.assertRaises(ValueError):
+            parse_range('bytes=-0', 10)
+        with self.assertRaises(ValueError):
+            parse_range('bytes=10-', 10)
+        # Перевёрнутый диапазон недействителен и игнорируется
+        self.assertIsNone(parse_range('bytes=8-3', 10))
+        self.assertIsNone(parse_range('bytes=20-3', 10))
+
+
+@override_settings(IMAGE_FORMATS={}, MEDIA_SERVE_MODE='python')
+class ContentAddressedStorageTest(TestCase):
+    """Тесты имён файлов по содержимому."""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def files(self, directory: str) -> list:
+        return sorted(
+            os.path.relpath(os.path.join(path, name), self.media_root).replace(os.sep, '/')
+            for path, _, names in os.walk(os.path.join(self.media_root, directory)) for name in names
+        )
+    
+    def test_content_name(self):
+        """Тест имени по содержимому: каталог upload_to без даты."""
+        digest = 'ab' + '0' * 62
+        self.assertEqual(content_name('services/icons/2024/05/Icon.PNG', digest), f'services/icons/ab/{digest}.png')
+        self.assertTrue(is_content_name(f'portfolio/ab/{digest}.jpg'))
+        self.assertFalse(is_content_name('portfolio/2024/05/photo.jpg'))
+    
+    def test_identical_uploads_stored_once(self):
+        """Тест: одинаковые загрузки - один файл, разные - разные имена."""
+        first = PortfolioItem.objects.create(title='1', description='', image=make_image(400, 300, name='a.jpg'))
+        second = PortfolioItem.objects.create(title='2', description='', image=make_image(400, 300, name='b.jpg'))
+        third = PortfolioItem.objects.create(title='3', description='', image=make_image(300, 200, name='a.jpg'))
+        
+        self.assertTrue(is_content_name(first.image.name))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, third.image.name)
+        self.assertEqual(self.files('portfolio'), sorted([first.image.name, third.image.name]))
+    
+    def test_ckeditor_uploads_keep_names(self):
+        """Тест: файлы вне MEDIA_CONTENT_ADDRESSED_PATHS сохраняются под своим именем."""
+        from django.core.files.storage import default_storage
+        name = default_storage.save('uploads/2024/05/photo.jpg', make_image(100, 100))
+        self.assertEqual(name, 'uploads/2024/05/photo.jpg')
+    
+    def test_immutable_cache_headers(self):
+        """Тест: файлы с именем по содержимому кешируются навсегда."""
+        item = PortfolioItem.objects.create(title='1', description='', image=make_image(400, 300))
+        response = self.client.get(item.image.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        
+        with override_settings(MEDIA_CONTENT_ADDRESSED=False):
+            item = PortfolioItem.objects.create(title='2', description='', image=make_image(300, 200))
+        self.assertEqual(self.client.get(item.image.url)['Cache-Control'], 'public, max-age=2592000')
+    
+    def test_migration_command(self):
+        """Тест переименования старых файлов и обновления ссылок в базе."""
+        with override_settings(MEDIA_CONTENT_ADDRESSED=False):
+            first = PortfolioItem.objects.create(title='1', description='', image=make_image(400, 300, name='a.jpg'))
+            second = PortfolioItem.objects.create(title='2', description='', image=make_image(400, 300, name='b.jpg'))
+            slider = Slider.objects.create(title='Слайд', image=make_image(640, 480, name='slide.jpg'))
+        missing = PortfolioItem.objects.create(title='3', description='')
+        PortfolioItem.objects.filter(pk=missing.pk).update(image='portfolio/2024/01/missing.jpg')
+        old_name = first.image.name
+        self.assertFalse(is_content_name(old_name))
+        
+        out = StringIO()
+        call_command('content_address_media', stdout=out)
+        self.assertIn('Для переименования запустите с --apply', out.getvalue())
+        first.refresh_from_db()
+        self.assertEqual(first.image.name, old_name)
+        
+        out = StringIO()
+        call_command('content_address_media', '--apply', '--batch-size', '1', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Одинаковых файлов сведено к одному: 1', output)
+        self.assertIn('Файлов нет на диске (пропущены): 1', output)
+        
+        first.refresh_from_db()
+        second.refresh_from_db()
+        slider.refresh_from_db()
+        self.assertTrue(is_content_name(first.image.name))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(slider.image.name.startswith('slider/'))
+        self.assertTrue(is_content_name(slider.image.name))
+        with first.image.open('rb') as new, open(os.path.join(self.media_root, old_name), 'rb') as old:
+            self.assertEqual(new.read(), old.read())
+        
+        # Повторный запуск ничего не меняет
+        out = StringIO()
+        call_command('content_address_media', '--apply', stdout=out)
+        self.assertIn('Объектов с новыми именами: 0', out.getvalue())
+
+
+@override_settings(IMAGE_FORMATS={'WEBP': 75}, IMAGE_WORKERS=0)
+class OrphanedMediaTest(TestCase):
+    """Тесты поиска и удаления неиспользуемых файлов."""
+    
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        cache.clear()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def write(self, name: str, content: bytes = b'file') -> str:
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file_object:
+            file_object.write(content)
+        return path
+    
+    def variant_files(self, image) -> set:
+        return {
+            variant.url[len(settings.MEDIA_URL):]
+            for size_name in ('grid', 'modal')
+            for variants in get_all_variants(image, size_name).values()
+            for variant in variants
+        }
+    
+    def test_collect(self):
+        """Тест: удаляются только файлы без ссылок, используемые варианты остаются."""
+        kept = PortfolioItem.objects.create(
+            title='Работа', description='<p><img src="/media/uploads/2024/01/a%20b.jpg"></p>',
+            image=make_image(1000, 750, noise=True)
+        )
+        removed = PortfolioItem.objects.create(title='Удалена', description='', image=make_image(800, 600))
+        kept_variants = self.variant_files(kept.image)
+        removed_variants = self.variant_files(removed.image)
+        self.assertTrue(kept_variants and removed_variants)
+        removed_name = removed.image.name
+        removed.delete()
+        
+        used = {kept.image.name} | kept_variants | {'uploads/2024/01/a b.jpg', 'uploads/2024/01/a b_thumb.jpg'}
+        self.write('uploads/2024/01/a b.jpg')
+        self.write('uploads/2024/01/a b_thumb.jpg')
+        orphans = {removed_name, 'uploads/2024/01/old.jpg', 'stray.txt'} | removed_variants
+        self.write('uploads/2024/01/old.jpg')
+        self.write('stray.txt')
+        self.write('.hidden')
+        
+        # Недавние файлы не трогаются
+        out = StringIO()
+        call_command('collect_orphaned_media', '--delete', '--workers', '0', stdout=out)
+        self.assertIn('Неиспользуемых файлов нет', out.getvalue())
+        
+        out = StringIO()
+        call_command('collect_orphaned_media', '--min-age', '0', '--workers', '0', stdout=out)
+        self.assertIn(f'Итого{len(orphans):>25}', out.getvalue())
+        self.assertTrue(all(os.path.exists(os.path.join(self.media_root, name)) for name in orphans))
+        
+        call_command('collect_orphaned_media', '--min-age', '0', '--delete', '--workers', '2', stdout=StringIO())
+        for name in used:
+            self.assertTrue(os.path.exists(os.path.join(self.media_root, name)), name)
+        for name in orphans:
+            self.assertFalse(os.path.exists(os.path.join(self.media_root, name)), name)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, '.hidden')))
+    
+    def test_reupload_after_collect(self):
+        """Тест: тот же файл после удаления сборщиком получает варианты заново."""
+        upload = make_image(800, 600)
+        content = upload.read()
+        removed = PortfolioItem.objects.create(title='Удалена', description='', image=upload)
+        name = removed.image.name
+        variants = self.variant_files(removed.image)
+        self.assertTrue(ImageVariantJob.objects.filter(name=name).exists())
+        removed.delete()
+        
+        call_command('collect_orphaned_media', '--min-age', '0', '--delete', '--workers', '0', stdout=StringIO())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, name)))
+        self.assertFalse(ImageVariantJob.objects.filter(name=name).exists())
+        
+        # Повторная загрузка: то же имя, задачи снова в очереди, файлы вариантов созданы
+        with self.captureOnCommitCallbacks(execute=True):
+            item = PortfolioItem.objects.create(
+                title='Снова', description='', image=SimpleUploadedFile('again.jpg', content)
+            )
+        self.assertEqual(item.image.name, name)
+        self.assertFalse(ImageVariantJob.objects.filter(name=name, status=ImageVariantJob.Status.DONE).exists())
+        self.assertTrue(all(error is None for _, error in process_queue(0)))
+        self.assertEqual(self.variant_files(item.image), variants)
+        for variant in variants:
+            self.assertTrue(os.path.exists(os.path.join(self.media_root, variant)), variant)
@@ -0,0 +1,330 @@
+"""
+Тесты очереди уведомлений Telegram.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+import time
+import requests
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from apps.contacts.models import ContactMessage
+from apps.main.models import TelegramChat, TelegramNotification
+from apps.main.utils.fake_telegram import fake_telegram
+from apps.main.utils.outbox import claim_next, deliver, deliver_due
+from apps.main.utils.telegram import RateLimiter, rate_limiter, send_to_chats
+
+
+def telegram_response(status_code: int = 200, retry_after: int = None) -> mock.Mock:
+    response = mock.Mock(status_code=status_code, ok=status_code < 400, text='{"ok": false}')
+    response.json.return_value = {'ok': False, 'parameters': {'retry_after': retry_after}}
+    return response
+
+
+@override_settings(
+    TELEGRAM_BOT_TOKEN='123:token',
+    TELEGRAM_OUTBOX_MAX_ATTEMPTS=3,
+    TELEGRAM_OUTBOX_RETRY_DELAY=10,
+    TELEGRAM_CHAT_INTERVAL=0,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PAGE_CACHE_ENABLED=False,
+)
+class TelegramOutboxTest(TestCase):
+    """Тесты записи уведомлений вместе с заявкой и их фоновой отправки."""
+    
+    def setUp(self):
+        TelegramChat.objects.create(chat_id=1)
+        TelegramChat.objects.create(chat_id=2)
+        TelegramChat.objects.create(chat_id=3, is_active=False)
+    
+    def post_form(self):
+        return self.client.post('/contacts/send/', {
+            'name': 'Иван',
+            'phone': '+7 (999) 123-45-67',
+            'message': 'Нужна вывеска',
+            'privacy_policy': 'on',
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post')
+    def test_form_enqueues_without_sending(self, post):
+        """Тест: заявка сохраняется с уведомлением, Telegram API не вызывается."""
+        response = self.post_form()
+        self.assertTrue(response.json()['success'])
+        post.assert_not_called()
+        
+        notification = TelegramNotification.objects.get()
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertIn('Иван', notification.text)
+    
+    @mock.patch('apps.contacts.views.enqueue_notification', side_effect=RuntimeError('fail'))
+    def test_same_transaction(self, enqueue):
+        """Тест: без уведомления не сохраняется и заявка."""
+        with self.assertRaises(RuntimeError):
+            self.post_form()
+        self.assertEqual(ContactMessage.objects.count(), 0)
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response())
+    def test_delivered(self, post):
+        """Тест доставки во все активные чаты."""
+        self.post_form()
+        out = StringIO()
+        call_command('deliver_notifications', '--once', stdout=out)
+        self.assertIn('Обработано уведомлений: 1', out.getvalue())
+        
+        notification = TelegramNotification.objects.get()
+        self.assertEqual(notification.status, TelegramNotification.Status.SENT)
+        self.assertEqual(notification.chat_results, {'1': 'sent', '2': 'sent'})
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(sorted(call.kwargs['json']['chat_id'] for call in post.call_args_list), [1, 2])
+        self.assertEqual(deliver_due(), 0)
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post')
+    def test_retry_with_backoff(self, post):
+        """Тест: временная ошибка - повтор с растущей задержкой только для недоставленных чатов."""
+        notification = TelegramNotification.objects.create(text='Заявка')
+        post.side_effect = lambda url, json, timeout: (
+            telegram_response() if json['chat_id'] == 1 else telegram_response(502)
+        )
+        
+        started = timezone.now()
+        deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertEqual(notification.chat_results, {'1': 'sent'})
+        self.assertIn('HTTP 502', notification.last_error)
+        first_delay = notification.next_attempt_at - started
+        self.assertGreaterEqual(first_delay, timedelta(seconds=10))
+        self.assertEqual(deliver_due(), 0)  # ещё не пора
+        
+        TelegramNotification.objects.update(next_attempt_at=timezone.now())
+        post.reset_mock()
+        post.side_effect = requests.exceptions.ConnectionError('timeout')
+        started = timezone.now()
+        deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual([call.kwargs['json']['chat_id'] for call in post.call_args_list], [2])
+        self.assertGreaterEqual(notification.next_attempt_at - started, timedelta(seconds=20))
+        
+        post.side_effect = None
+        post.return_value = telegram_response()
+        TelegramNotification.objects.update(next_attempt_at=timezone.now())
+        deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.SENT)
+        self.assertEqual(notification.chat_results, {'1': 'sent', '2': 'sent'})
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response(500))
+    def test_dead_letter(self, post):
+        """Тест: после TELEGRAM_OUTBOX_MAX_ATTEMPTS попыток уведомление не доставлено."""
+        notification = TelegramNotification.objects.create(text='Заявка')
+        for _ in range(3):
+            TelegramNotification.objects.update(next_attempt_at=timezone.now())
+            deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.DEAD)
+        self.assertEqual(notification.attempts, 3)
+        TelegramNotification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due(), 0)
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post')
+    def test_permanent_error_not_retried(self, post):
+        """Тест: бот заблокирован в чате (403) - этот чат не повторяется и отключается."""
+        post.side_effect = lambda url, json, timeout: (
+            telegram_response(403) if json['chat_id'] == 1 else telegram_response()
+        )
+        notification = TelegramNotification.objects.create(text='Заявка')
+        deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.SENT)
+        self.assertIn('HTTP 403', notification.chat_results['1'])
+        self.assertFalse(TelegramChat.objects.get(chat_id=1).is_active)
+        self.assertTrue(TelegramChat.objects.get(chat_id=2).is_active)
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post')
+    def test_all_permanent_errors_dead(self, post):
+        """Тест: постоянные ошибки во всех чатах - уведомление не доставлено, а не отправлено."""
+        post.side_effect = lambda url, json, timeout: (
+            telegram_response(403) if json['chat_id'] == 1 else telegram_response(400)
+        )
+        notification = TelegramNotification.objects.create(text='Заявка')
+        deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.DEAD)
+        self.assertIsNone(notification.sent_at)
+        self.assertEqual(notification.attempts, 1)
+        self.assertIn('HTTP 400', notification.last_error)
+        # 400 (например, неверный chat_id) чат не отключает
+        self.assertEqual(list(TelegramChat.objects.filter(is_active=True).values_list('chat_id', flat=True)), [2])
+    
+    @mock.patch('apps.main.utils.telegram.rate_limiter', new_callable=RateLimiter)
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response(429, retry_after=600))
+    def test_retry_not_before_retry_after(self, post, limiter):
+        """Тест: после 429 с долгим retry_after повтор назначается не раньше, чем разрешил Telegram."""
+        notification = TelegramNotification.objects.create(text='Заявка')
+        started = timezone.now()
+        deliver_due()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertGreaterEqual(notification.next_attempt_at - started, timedelta(seconds=600))
+    
+    def test_claimed_once(self):
+        """Тест: уведомление забирает только один процесс."""
+        TelegramNotification.objects.create(text='Заявка')
+        self.assertIsNotNone(claim_next())
+        self.assertIsNone(claim_next())
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response())
+    def test_claimed_one_at_a_time(self, post):
+        """Тест: уведомления занимаются по одному перед отправкой, а не всей пачкой."""
+        for index in range(3):
+            TelegramNotification.objects.create(text=f'Заявка {index}')
+        leased = []
+        
+        def deliver_and_count(notification):
+            leased.append(TelegramNotification.objects.filter(
+                status=TelegramNotification.Status.PENDING, next_attempt_at__gt=timezone.now()
+            ).count())
+            return deliver(notification)
+        
+        with mock.patch('apps.main.utils.outbox.deliver', side_effect=deliver_and_count):
+            self.assertEqual(deliver_due(), 3)
+        self.assertEqual(leased, [1, 1, 1])
+        self.assertEqual(TelegramNotification.objects.filter(status=TelegramNotification.Status.SENT).count(), 3)
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response())
+    def test_lost_lease_not_saved(self, post):
+        """Тест: если занятие истекло и уведомление забрал другой процесс, результат не записывается."""
+        TelegramNotification.objects.create(text='Заявка')
+        notification = claim_next()
+        # Другой процесс забрал уведомление после CLAIM_TIMEOUT
+        other_lease = notification.next_attempt_at + timedelta(minutes=5)
+        TelegramNotification.objects.update(next_attempt_at=other_lease)
+        
+        self.assertFalse(deliver(notification))
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertEqual(notification.next_attempt_at, other_lease)
+        self.assertEqual(notification.attempts, 0)
+
+
+@override_settings(
+    TELEGRAM_BOT_TOKEN='123:token',
+    TELEGRAM_SEND_CONCURRENCY=64,
+    TELEGRAM_RATE_LIMIT=0,
+    TELEGRAM_CHAT_INTERVAL=0,
+    TELEGRAM_MAX_RETRY_AFTER=5,
+)
+class TelegramSenderTest(TestCase):
+    """Тесты параллельной отправки с ограничениями частоты."""
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post')
+    def test_fan_out_concurrent(self, post):
+        """Тест: 50 чатов - примерно одно обращение к API по времени, а не 50."""
+        def slow_post(url, json, timeout):
+            time.sleep(0.2)
+            return telegram_response()
+        post.side_effect = slow_post
+        
+        started = time.monotonic()
+        results = send_to_chats('Заявка', range(1000, 1050))
+        elapsed = time.monotonic() - started
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(result.ok for result in results.values()))
+        self.assertEqual(post.call_count, 50)
+        self.assertLess(elapsed, 1.5)
+    
+    @override_settings(TELEGRAM_RATE_LIMIT=20)
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response())
+    def test_global_rate_limit(self, post):
+        """Тест: больше TELEGRAM_RATE_LIMIT сообщений в секунду не отправляется."""
+        started = time.monotonic()
+        results = send_to_chats('Заявка', range(2000, 2030))
+        self.assertTrue(all(result.ok for result in results.values()))
+        # 20 сразу, ещё 10 - со скоростью 20 в секунду
+        self.assertGreaterEqual(time.monotonic() - started, 0.45)
+    
+    @override_settings(TELEGRAM_CHAT_INTERVAL=0.3)
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response())
+    def test_chat_interval(self, post):
+        """Тест: сообщения в один чат - не чаще TELEGRAM_CHAT_INTERVAL."""
+        send_to_chats('Первое', [3000])
+        started = time.monotonic()
+        send_to_chats('Второе', [3000])
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+    
+    @mock.patch('apps.main.utils.telegram.requests.Session.post')
+    def test_retry_after(self, post):
+        """Тест: 429 с коротким retry_after - ожидание и повтор в той же отправке."""
+        post.side_effect = [telegram_response(429, retry_after=1), telegram_response()]
+        started = time.monotonic()
+        with mock.patch.object(rate_limiter, 'pause', wraps=rate_limiter.pause) as pause:
+            results = send_to_chats('Заявка', [4000])
+        self.assertTrue(results[4000].ok)
+        self.assertEqual(post.call_count, 2)
+        self.assertGreaterEqual(time.monotonic() - started, 0.95)
+        # Пауза общая: 429 мог относиться к общему лимиту бота
+        pause.assert_called_once_with(1)
+    
+    @override_settings(TELEGRAM_RATE_LIMIT=100)
+    def test_pause_blocks_all_chats(self):
+        """Тест: пауза после 429 задерживает отправку в любой чат, без всплеска после неё."""
+        limiter = RateLimiter()
+        limiter.pause(0.3)
+        started = time.monotonic()
+        limiter.acquire(4100)
+        self.assertGreaterEqual(time.monotonic() - started, 0.28)
+        
+        # Токены за время паузы не накопились: следующие 5 - со скоростью 100 в секунду
+        started = time.monotonic()
+        for chat_id in range(4101, 4106):
+            limiter.acquire(chat_id)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+    
+    @mock.patch('apps.main.utils.telegram.rate_limiter', new_callable=RateLimiter)
+    @mock.patch('apps.main.utils.telegram.requests.Session.post', return_value=telegram_response(429, retry_after=60))
+    def test_long_retry_after_deferred(self, post, limiter):
+        """Тест: долгий retry_after не ждётся - временная ошибка для очереди, остальные чаты API не вызывают."""
+        results = send_to_chats('Заявка', [5000])
+        self.assertEqual(post.call_count, 1)
+        self.assertFalse(results[5000].ok)
+        self.assertTrue(results[5000].retry)
+        self.assertIn('HTTP 429', results[5000].error)
+        self.assertEqual(results[5000].retry_after, 60)
+        
+        # Пауза общая: следующие сообщения сразу возвращаются с оставшимся временем
+        started = time.monotonic()
+        results = send_to_chats('Заявка', [5001, 5002])
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(post.call_count, 1)
+        for result in results.values():
+            self.assertTrue(result.retry)
+            self.assertIn(result.retry_after, (59, 60))
+    
+    def test_fake_api_round_trip(self):
+        """Тест: 50 чатов через HTTP поддельного API с задержкой - одна задержка по времени."""
+        with fake_telegram(latency=0.2) as api:
+            started = time.monotonic()
+            results = send_to_chats('Заявка', range(6000, 6050))
+            elapsed = time.monotonic() - started
+        self.assertTrue(all(result.ok for result in results.values()))
+        self.assertEqual(sorted(message['chat_id'] for message in api.sent), list(range(6000, 6050)))
+        self.assertLess(elapsed, 1.5)
+    
+    @mock.patch('apps.main.utils.telegram.rate_limiter', new_callable=RateLimiter)
+    def test_fake_api_faults(self, limiter):
+        """Тест: 5xx и 429 поддельного API - временные ошибки для очереди."""
+        with fake_telegram(error_rate=1.0) as api:
+            results = send_to_chats('Заявка', [7000, 7001])
+        self.assertEqual(api.sent, [])
+        for result in results.values():
+            self.assertTrue(result.retry)
+            self.assertIn('HTTP 502', result.error)
+        
+        with fake_telegram(rate_limit_rate=1.0, retry_after=60) as api:
+            results = send_to_chats('Заявка', [7002])
+        self.assertTrue(results[7002].retry)
+        self.assertIn('HTTP 429', results[7002].error)
+        self.assertEqual(api.statuses, {429: 1})
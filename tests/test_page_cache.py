@@ -0,0 +1,105 @@
+"""
+Тесты кеширования публичных страниц.
+"""
+
+import re
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from apps.core.models import CacheGeneration
+from apps.core.page_cache import CSRF_PLACEHOLDER, bump_generation, normalize_query_string
+from apps.main.models import Statistic
+from apps.services.models import Service
+
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class PageCacheTest(TestCase):
+    """Тесты для PageCacheMixin."""
+
+    def setUp(self):
+        """Подготовка данных для тестов."""
+        cache.clear()
+        self.service = Service.objects.create(name='Вывески', description='<p>Описание</p>')
+
+    def test_second_request_is_served_from_cache(self):
+        """Тест: повторный запрос - только проверка поколений, без запросов данных."""
+        first = self.client.get('/services/catalog/')
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get('/services/catalog/')
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertEqual(len(queries), 1)
+        self.assertIn('core_cachegeneration', queries[0]['sql'])
+        self.assertContains(second, 'Вывески')
+
+    def test_csrf_token_is_per_visitor(self):
+        """Тест: закешированная страница содержит токен текущего посетителя."""
+        Client().get('/services/catalog/')
+
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/services/catalog/')
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        self.assertIn('csrftoken', response.cookies)
+
+        token = CSRF_INPUT.search(response.content.decode()).group(1)
+        post = client.post('/contacts/callback/', {
+            'csrfmiddlewaretoken': token,
+            'name': 'Иван',
+            'phone': '+79991234567',
+            'privacy_policy': 'on',
+        })
+        self.assertEqual(post.status_code, 302)
+
+    def test_save_invalidates_dependent_pages(self):
+        """Тест: изменение услуги сбрасывает кеш каталога."""
+        self.client.get('/services/catalog/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = 'Световые вывески'
+            self.service.save()
+
+        response = self.client.get('/services/catalog/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Световые вывески')
+
+    def test_generation_bumped_by_another_worker(self):
+        """Тест: поколения в базе - сброс в другом процессе виден этому."""
+        self.client.get('/services/catalog/')
+        # Другой воркер сбросил кеш: в этом процессе сигналов не было
+        bump_generation('services.Service')
+        self.assertEqual(self.client.get('/services/catalog/')['X-Page-Cache'], 'MISS')
+        CacheGeneration.objects.filter(label='services.service').update(value=F('value') + 1)
+        self.assertEqual(self.client.get('/services/catalog/')['X-Page-Cache'], 'MISS')
+
+    def test_unrelated_model_keeps_cache(self):
+        """Тест: изменение статистики не сбрасывает кеш каталога."""
+        self.client.get('/services/catalog/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Statistic.objects.create(number=10, label='Лет на рынке')
+
+        self.assertEqual(self.client.get('/services/catalog/')['X-Page-Cache'], 'HIT')
+
+    def test_authenticated_users_bypass_cache(self):
+        """Тест: авторизованным пользователям страница не кешируется."""
+        user = get_user_model().objects.create_user(username='admin', password='secret-password')
+        self.client.force_login(user)
+        self.client.get('/services/catalog/')
+        response = self.client.get('/services/catalog/')
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_query_string_normalization(self):
+        """Тест нормализации строки запроса."""
+        factory = RequestFactory()
+        self.assertEqual(
+            normalize_query_string(factory.get('/', {'search': 'неон', 'page': '2', 'utm_source': 'vk'})),
+            normalize_query_string(factory.get('/', {'page': '2', 'search': 'неон', 'service': ''}))
+        )
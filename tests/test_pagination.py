@@ -0,0 +1,158 @@
+"""
+Тесты keyset пагинации.
+"""
+
+from datetime import date
+from unittest import mock, skipUnless
+from django.db import connection
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from apps.core.pagination import KeysetPaginator
+from apps.portfolio.models import PortfolioItem
+from apps.services.models import Service
+
+
+ORDERING = ('-date_completed', '-created_at', 'uuid')
+
+
+class KeysetPaginatorTest(TestCase):
+    """Тесты для KeysetPaginator."""
+    
+    def setUp(self):
+        """Работы с совпадающими датами и пустыми датами завершения."""
+        self.service = Service.objects.create(name='Вывески', description='')
+        for index in range(11):
+            PortfolioItem.objects.create(
+                title=f'Работа {index}',
+                description='',
+                image='portfolio/work.jpg',
+                service=self.service,
+                date_completed=None if index % 4 == 0 else date(2024, 1, index % 3 + 1)
+            )
+        # Одинаковое время создания: порядок решает uuid
+        PortfolioItem.objects.update(created_at=timezone.now())
+        self.queryset = PortfolioItem.objects.all()
+        self.expected = list(self.queryset.order_by(*ORDERING).values_list('pk', flat=True))
+    
+    def test_forward_walk_matches_ordering(self):
+        """Тест обхода всех страниц вперёд без пропусков и повторов."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        page = paginator.page()
+        seen = []
+        numbers = []
+        while True:
+            seen.extend(item.pk for item in page)
+            numbers.append(page.number)
+            if not page.has_next():
+                break
+            page = paginator.page(page.next_cursor)
+        
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(numbers, [1, 2, 3, 4])
+        self.assertTrue(page.has_previous())
+    
+    def test_backward_walk(self):
+        """Тест возврата на предыдущие страницы."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual([item.pk for item in page], [item.pk for item in expected])
+            self.assertEqual(page.number, expected.number)
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+    
+    def test_backward_number_after_changes(self):
+        """Тест: номер при возврате не опускается ниже 1, первая страница - 1."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        second = paginator.page(paginator.page().next_cursor)
+        
+        # Перед текущей страницей появились новые работы
+        for index in range(6):
+            PortfolioItem.objects.create(
+                title=f'Новая работа {index}', description='', image='portfolio/work.jpg', date_completed=date(2025, 1, 1)
+            )
+        numbers = []
+        page = second
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            numbers.append(page.number)
+        self.assertEqual(numbers, [2, 2, 1])
+        
+        # Работы перед страницей удалены: возврат сразу на первую
+        fourth = paginator.page(paginator.page(paginator.page(page.next_cursor).next_cursor).next_cursor)
+        self.assertEqual(fourth.number, 4)
+        PortfolioItem.objects.filter(date_completed=date(2025, 1, 1)).delete()
+        first = paginator.page(fourth.previous_cursor)
+        self.assertEqual(first.number, 1)
+        self.assertFalse(first.has_previous())
+    
+    def test_no_count_query(self):
+        """Тест: страница выбирается одним запросом без COUNT."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        cursor = paginator.page().next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(cursor)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'].upper())
+    
+    def test_approximate_count(self):
+        """Тест приблизительного количества записей."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        self.assertEqual(paginator.approximate_count, 11)
+    
+    @skipUnless(connection.vendor == 'postgresql', 'Оценка планировщика - только PostgreSQL')
+    def test_approximate_count_planner_estimate(self):
+        """Тест: на PostgreSQL большое количество берётся из EXPLAIN без COUNT."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        with mock.patch.object(KeysetPaginator, 'EXACT_COUNT_LIMIT', 1):
+            with CaptureQueriesContext(connection) as queries:
+                estimate = paginator.approximate_count
+        self.assertGreater(estimate, 0)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('EXPLAIN'))
+    
+    def test_invalid_cursor(self):
+        """Тест повреждённого курсора."""
+        paginator = KeysetPaginator(self.queryset, ORDERING, per_page=3)
+        with self.assertRaises(Http404):
+            paginator.page('не-курсор')
+
+
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PAGE_CACHE_ENABLED=False
+)
+class CatalogPaginationTest(TestCase):
+    """Тесты курсорной пагинации каталога."""
+    
+    def setUp(self):
+        """Подготовка данных для тестов."""
+        for index in range(15):
+            Service.objects.create(name=f'Услуга {index:02d}', description='', order=index % 2)
+    
+    def test_cursor_pages(self):
+        """Тест перехода на вторую страницу каталога по курсору."""
+        response = self.client.get(reverse('services:catalog'))
+        page = response.context['page_obj']
+        self.assertTrue(page.is_keyset)
+        self.assertEqual(len(page), 12)
+        self.assertContains(response, f'?cursor={page.next_cursor}')
+        
+        response = self.client.get(reverse('services:catalog'), {'cursor': page.next_cursor})
+        self.assertEqual(response.status_code, 200)
+        names = [service.name for service in response.context['services']]
+        expected = list(Service.objects.order_by('order', 'name', 'uuid').values_list('name', flat=True))[12:]
+        self.assertEqual(names, expected)
+    
+    def test_invalid_cursor_returns_404(self):
+        """Тест ответа на повреждённый курсор."""
+        response = self.client.get(reverse('services:catalog'), {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 404)
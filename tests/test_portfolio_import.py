@@ -0,0 +1,148 @@
+"""
+Тесты массовой загрузки фотографий в портфолио.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from apps.core.images import get_all_variants
+from apps.portfolio.models import PortfolioItem
+from apps.portfolio.search import portfolio_index
+from apps.services.models import Service
+from tests.test_images import make_image
+
+
+def textured_photo(extent=(-2, -1.2, 1, 1.2)) -> bytes:
+    """JPEG с узором (у одноцветных фотографий dHash нулевой)."""
+    image = Image.effect_mandelbrot((400, 300), extent, 100).convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def write_photo(path: Path, color) -> bytes:
+    """Сохраняет JPEG одного цвета и возвращает его содержимое."""
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), color).save(buffer, 'JPEG')
+    path.write_bytes(buffer.getvalue())
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_FORMATS={})
+class UploadPortfolioPhotosTest(TestCase):
+    """Тесты команды upload_portfolio_photos."""
+    
+    def setUp(self):
+        """Папка с фотографиями и временный MEDIA_ROOT."""
+        self.media_root = tempfile.mkdtemp()
+        self.source = Path(tempfile.mkdtemp())
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        cache.clear()
+        
+        self.service = Service.objects.create(name='Вывески', slug='vyveski', description='')
+        self.folder = self.source / 'вывески'
+        self.folder.mkdir()
+        write_photo(self.folder / '01.jpg', (200, 0, 0))
+        write_photo(self.folder / '02.JPG', (0, 200, 0))
+        # Та же фотография под другим именем
+        shutil.copy(self.folder / '01.jpg', self.folder / '03.jpeg')
+        (self.folder / 'notes.txt').write_text('не фотография')
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        shutil.rmtree(self.source, ignore_errors=True)
+    
+    def run_command(self, *args) -> str:
+        out = StringIO()
+        call_command('upload_portfolio_photos', str(self.source), '--folder', 'вывески', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_import_with_pool(self):
+        """Тест импорта в пуле процессов: дубликат по содержимому пропущен."""
+        output = self.run_command('--workers', '2')
+        
+        self.assertIn('Создано записей: 2', output)
+        self.assertIn('Пропущено дубликатов: 1', output)
+        items = list(PortfolioItem.objects.order_by('title'))
+        self.assertEqual([item.title for item in items], ['Вывески #1', 'Вывески #2'])
+        for item in items:
+            self.assertEqual(item.service, self.service)
+            self.assertEqual(len(item.image_hash), 64)
+            self.assertEqual((item.image_width, item.image_height), (400, 300))
+            self.assertTrue(os.path.exists(item.image.path))
+            self.assertTrue(get_all_variants(item.image, 'grid', generate=False))
+        self.assertEqual(portfolio_index.search(PortfolioItem.objects.all(), 'вывески').count(), 2)
+        
+        checkpoint = json.loads((self.source / '.upload_portfolio_photos.json').read_text())
+        self.assertEqual(sorted(checkpoint['done'].values()), ['created', 'created', 'duplicate'])
+    
+    def test_resume_from_checkpoint(self):
+        """Тест возобновления: обработанные файлы повторно не загружаются."""
+        checkpoint = self.source / '.upload_portfolio_photos.json'
+        checkpoint.write_text(json.dumps({'done': {str(self.folder / '01.jpg'): 'created'}}))
+        
+        output = self.run_command('--workers', '0', '--chunk-size', '1', '--skip-variants')
+        self.assertIn('Уже обработано ранее: 1', output)
+        # 01.jpg отмечен в контрольной точке, поэтому его копия 03.jpeg не считается дубликатом.
+        # Номер в названии - позиция файла в папке
+        titles = sorted(PortfolioItem.objects.values_list('title', flat=True))
+        self.assertEqual(titles, ['Вывески #2', 'Вывески #3'])
+        
+        output = self.run_command('--workers', '0', '--skip-variants')
+        self.assertIn('Создано записей: 0', output)
+        self.assertIn('Уже обработано ранее: 3', output)
+    
+    def test_restart_skips_existing_by_hash(self):
+        """Тест повторного импорта с нуля: уже загруженные фото распознаются по хешу."""
+        self.run_command('--workers', '0', '--skip-variants')
+        output = self.run_command('--workers', '0', '--skip-variants', '--restart')
+        self.assertIn('Создано записей: 0', output)
+        self.assertIn('Пропущено дубликатов: 3', output)
+        self.assertEqual(PortfolioItem.objects.count(), 2)
+    
+    @override_settings(IMAGE_UPLOAD_MAX_EDGE=200)
+    def test_legacy_items_matched_by_dhash(self):
+        """Тест: работа без хеша исходника с нормализованным файлом распознаётся по dHash."""
+        source = textured_photo()
+        (self.folder / '04.jpg').write_bytes(source)
+        legacy = PortfolioItem.objects.create(
+            title='Старая работа', description='', image=SimpleUploadedFile('old.jpg', source)
+        )
+        other = PortfolioItem.objects.create(
+            title='Другая старая работа', description='', image=SimpleUploadedFile('other.jpg', textured_photo((-1, -0.5, 0.5, 0.5)))
+        )
+        # Работы загружены до появления хеша, файл уменьшен при сохранении
+        PortfolioItem.objects.update(image_hash='')
+        with legacy.image.open('rb') as file_object:
+            self.assertNotEqual(file_object.read(), source)
+        
+        output = self.run_command('--workers', '0', '--skip-variants')
+        self.assertIn('Создано записей: 2', output)
+        self.assertIn(f'04.jpg (уже загружен как {legacy.image.name})', output)
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.image_hash, hashlib.sha256(source).hexdigest())
+        # Работа, которой нет среди фотографий, попадает в отчёт
+        self.assertIn('не сопоставленных ни с одной фотографией: 1', output)
+        self.assertIn(other.image.name, output)
+        
+        # Следующий импорт находит работу по хешу
+        output = self.run_command('--workers', '0', '--skip-variants', '--restart')
+        self.assertIn('Пропущено дубликатов: 4', output)
+    
+    def test_hash_set_on_save(self):
+        """Тест: хеш исходного файла сохраняется и при загрузке через админку."""
+        upload = make_image(300, 200)
+        item = PortfolioItem.objects.create(title='Вывеска', description='', image=upload)
+        self.assertEqual(len(item.image_hash), 64)
+        self.assertEqual(PortfolioItem.objects.filter(image_hash=item.image_hash).count(), 1)
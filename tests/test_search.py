@@ -0,0 +1,150 @@
+"""
+Тесты полнотекстового поиска.
+"""
+
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase, override_settings
+from apps.core.search.backends import search_rowid
+from apps.core.search.stemmer import html_to_text, stem
+from apps.portfolio.models import PortfolioItem
+from apps.portfolio.search import portfolio_index
+from apps.services.models import Service
+from apps.services.search import service_index
+
+
+class StemmerTest(TestCase):
+    """Тесты русского стеммера."""
+    
+    def test_word_forms_share_stem(self):
+        """Тест: формы одного слова приводятся к одной основе."""
+        self.assertEqual(stem('вывески'), stem('вывесками'))
+        self.assertEqual(stem('световые'), stem('светового'))
+        self.assertEqual(stem('Холсты'), stem('холстов'))
+    
+    def test_html_is_stripped(self):
+        """Тест удаления HTML из текста CKEditor."""
+        self.assertEqual(html_to_text('<p class="lead">Неон&nbsp;&laquo;под ключ&raquo;</p>'), 'Неон\xa0«под ключ»')
+
+
+class ServiceSearchTest(TestCase):
+    """Тесты поиска услуг."""
+    
+    def setUp(self):
+        """Подготовка данных для тестов."""
+        self.signs = Service.objects.create(
+            name='Световые вывески',
+            description='<p>Изготовление вывесок для магазинов</p>'
+        )
+        self.letters = Service.objects.create(
+            name='Объемные буквы',
+            description='<p>Буквы с подсветкой для вывески на фасаде</p>'
+        )
+        self.print = Service.objects.create(
+            name='Печать',
+            description='<p class="paragraph">Широкоформатная печать баннеров</p>'
+        )
+    
+    def search(self, query):
+        return list(service_index.search(Service.objects.all(), query))
+    
+    def test_morphology(self):
+        """Тест: поиск находит другие формы слова."""
+        self.assertEqual(set(self.search('вывеска')), {self.signs, self.letters})
+    
+    def test_name_ranks_above_description(self):
+        """Тест: совпадение в названии выше совпадения в описании."""
+        self.assertEqual(self.search('вывески')[0], self.signs)
+    
+    def test_html_tags_are_not_indexed(self):
+        """Тест: атрибуты HTML тегов не находятся."""
+        self.assertEqual(self.search('paragraph'), [])
+    
+    def test_index_follows_changes(self):
+        """Тест инкрементального обновления индекса."""
+        self.print.name = 'Неоновые вывески'
+        self.print.save()
+        self.assertIn(self.print, self.search('неоновая'))
+        
+        self.print.delete()
+        self.assertEqual(self.search('неоновая'), [])
+    
+    def test_prefix_search(self):
+        """Тест поиска по началу слова."""
+        self.assertEqual(list(service_index.search(Service.objects.all(), 'широкоф', prefix=True)), [self.print])
+    
+    @skipUnless(connection.vendor == 'sqlite', 'rowid есть только в индексе FTS5')
+    def test_rows_keyed_by_rowid(self):
+        """Тест: строка FTS5 хранится под rowid из первичного ключа и удаляется по нему."""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rowid, object_id FROM services_service_search')
+            rows = dict(cursor.fetchall())
+        self.assertEqual(rows[search_rowid(self.print.pk)], self.print.pk.hex)
+        
+        self.print.delete()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rowid FROM services_service_search')
+            rowids = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(rowids, {search_rowid(self.signs.pk), search_rowid(self.letters.pk)})
+    
+    @override_settings(
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        PAGE_CACHE_ENABLED=False
+    )
+    def test_catalog_search(self):
+        """Тест поиска в каталоге."""
+        response = self.client.get('/services/catalog/', {'search': 'буквами'})
+        self.assertEqual(list(response.context['services']), [self.letters])
+
+
+class PortfolioSearchTest(TestCase):
+    """Тесты поиска по портфолио."""
+    
+    def setUp(self):
+        """Подготовка данных для тестов."""
+        self.signs = Service.objects.create(name='Вывески', description='')
+        self.cars = Service.objects.create(name='Оклейка авто', description='')
+        self.by_title = PortfolioItem.objects.create(
+            title='Вывеска для кофейни', client='Бариста', description='<p>Световой короб</p>',
+            image='portfolio/1.jpg', service=self.signs
+        )
+        self.by_client = PortfolioItem.objects.create(
+            title='Световой короб', client='Кофейня на Ленина', description='<p>Монтаж на фасаде</p>',
+            image='portfolio/2.jpg', service=self.signs
+        )
+        self.by_description = PortfolioItem.objects.create(
+            title='Брендирование фургона', client='Доставка', description='<p>Фургон кофейни</p>',
+            image='portfolio/3.jpg', service=self.cars
+        )
+    
+    def search(self, query, queryset=None):
+        return list(portfolio_index.search(
+            PortfolioItem.objects.all() if queryset is None else queryset, query, prefix=True
+        ))
+    
+    def test_field_weights(self):
+        """Тест: название важнее клиента, клиент важнее описания."""
+        self.assertEqual(self.search('кофейня'), [self.by_title, self.by_client, self.by_description])
+    
+    def test_prefix(self):
+        """Тест поиска по началу слова."""
+        self.assertEqual(self.search('бренд'), [self.by_description])
+    
+    def test_combined_with_service_filter(self):
+        """Тест поиска вместе с фильтром по услуге одним запросом."""
+        queryset = PortfolioItem.objects.filter(service__slug=self.cars.slug)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.search('кофейня', queryset), [self.by_description])
+    
+    @override_settings(
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        PAGE_CACHE_ENABLED=False
+    )
+    def test_portfolio_page_shows_ranked_results(self):
+        """Тест: страница портфолио выводит результаты поиска по релевантности."""
+        response = self.client.get('/portfolio/', {'search': 'кофейн'})
+        self.assertEqual(
+            list(response.context['portfolio_items']),
+            [self.by_title, self.by_client, self.by_description]
+        )
+        self.assertNotIn('portfolio_albums', response.context)
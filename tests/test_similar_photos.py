@@ -0,0 +1,161 @@
+"""
+Тесты поиска похожих фотографий по перцептивному хешу.
+"""
+
+import random
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, ImageDraw
+from apps.core.images.phash import HammingIndex, dhash, group_similar, hamming
+from apps.portfolio.models import PortfolioItem
+from apps.portfolio.utils.similar import find_similar
+
+
+def make_scene(seed: int, size=(640, 480)) -> Image.Image:
+    """Изображение с градиентом и случайными фигурами (как у фотографии, есть структура)."""
+    rnd = random.Random(seed)
+    image = Image.linear_gradient('L').resize(size).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rnd.randrange(size[0]), rnd.randrange(size[1])
+        draw.rectangle(
+            (x, y, x + rnd.randrange(40, 200), y + rnd.randrange(40, 200)),
+            fill=tuple(rnd.randrange(256) for _ in range(3))
+        )
+    return image
+
+
+def upload(image: Image.Image, quality: int = 90, name: str = 'photo.jpg') -> SimpleUploadedFile:
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class PerceptualHashTest(TestCase):
+    """Тесты dHash и индекса хешей."""
+    
+    def test_similar_images_close(self):
+        """Тест: пересжатие и уменьшение почти не меняют хеш, другой снимок - меняет."""
+        original = make_scene(1)
+        recompressed = Image.open(upload(original.resize((320, 240)), quality=40))
+        cropped = original.crop((10, 8, 630, 472))
+        
+        self.assertLessEqual(hamming(dhash(original), dhash(recompressed)), 4)
+        self.assertLessEqual(hamming(dhash(original), dhash(cropped)), 10)
+        self.assertGreater(hamming(dhash(original), dhash(make_scene(2))), 10)
+    
+    def test_index_matches_full_scan(self):
+        """Тест: поиск по индексу совпадает с полным перебором."""
+        rnd = random.Random(7)
+        values = [rnd.getrandbits(64) for _ in range(2000)]
+        # Близкие хеши: копии с несколькими изменёнными битами
+        values += [value ^ (1 << rnd.randrange(64)) ^ (1 << rnd.randrange(64)) for value in values[:100]]
+        index = HammingIndex(enumerate(values))
+        
+        for query in values[:50] + [rnd.getrandbits(64) for _ in range(50)]:
+            expected = sorted(key for key, value in enumerate(values) if hamming(query, value) <= 10)
+            found = sorted(key for _, key in index.search(query, 10))
+            self.assertEqual(found, expected)
+    
+    def test_group_similar(self):
+        """Тест групп похожих хешей."""
+        groups = group_similar({'a': 0b1111, 'b': 0b1110, 'c': 0b1100, 'd': 1 << 60}, radius=1)
+        self.assertEqual([sorted(group) for group in groups], [['a', 'b', 'c']])
+
+
+@override_settings(
+    IMAGE_FORMATS={},
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PAGE_CACHE_ENABLED=False,
+)
+class SimilarPortfolioPhotosTest(TestCase):
+    """Тесты поиска похожих работ, отчёта и предупреждения в админке."""
+    
+    def setUp(self):
+        """Временный MEDIA_ROOT и работа с исходной фотографией."""
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        cache.clear()
+        self.original = PortfolioItem.objects.create(title='Оригинал', description='', image=upload(make_scene(1)))
+        PortfolioItem.objects.create(title='Другая работа', description='', image=upload(make_scene(2)))
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+    
+    def test_find_similar(self):
+        """Тест: пересжатая копия находит оригинал и не находит другую работу."""
+        copy = PortfolioItem.objects.create(
+            title='Копия', description='', image=upload(make_scene(1).resize((500, 375)), quality=50)
+        )
+        similar = find_similar(copy.image_phash, exclude=copy.pk)
+        self.assertEqual([item.title for _, item in similar], ['Оригинал'])
+    
+    def test_report_command(self):
+        """Тест отчёта: хеши вычисляются для старых работ, группы выводятся."""
+        PortfolioItem.objects.create(title='Копия', description='', image=upload(make_scene(1), quality=60))
+        PortfolioItem.objects.update(image_phash='')
+        
+        out = StringIO()
+        call_command('find_similar_photos', '--workers', '0', stdout=out)
+        output = out.getvalue()
+        self.assertIn('Группа 1 (2 работ)', output)
+        self.assertIn('Оригинал', output)
+        self.assertIn('групп похожих: 1', output)
+        self.assertNotIn('Другая работа (', output)
+    
+    def test_admin_requires_confirmation(self):
+        """Тест: похожая фотография в админке не сохраняется без подтверждения."""
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        data = {
+            'title': 'Новая работа',
+            'description': '<p>Описание</p>',
+            'is_active': 'on',
+        }
+        response = self.client.post(
+            reverse('admin:portfolio_portfolioitem_add'),
+            {**data, 'image': upload(make_scene(1), quality=55, name='new.jpg')}
+        )
+        self.assertEqual(response.status_code, 200)
+        errors = response.context['adminform'].form.non_field_errors()
+        self.assertTrue(any('Похожая фотография' in error and 'Оригинал' in error for error in errors))
+        self.assertFalse(PortfolioItem.objects.filter(title='Новая работа').exists())
+        
+        response = self.client.post(
+            reverse('admin:portfolio_portfolioitem_add'),
+            {**data, 'image': upload(make_scene(1), quality=55, name='new.jpg'), 'confirm_similar': 'on'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(PortfolioItem.objects.filter(title='Новая работа').exists())
+    
+    def test_admin_saves_different_photo(self):
+        """Тест: непохожая фотография сохраняется без подтверждения."""
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        response = self.client.post(reverse('admin:portfolio_portfolioitem_add'), {
+            'title': 'Новая работа',
+            'description': '<p>Описание</p>',
+            'image': upload(make_scene(3), name='new.jpg'),
+            'is_active': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+    
+    def test_index_sees_changes(self):
+        """Тест: индекс перестраивается после удаления и изменения работ."""
+        copy_hash = PortfolioItem.objects.get(title='Оригинал').image_phash
+        self.assertEqual(len(find_similar(copy_hash)), 1)
+        self.original.delete()
+        self.assertEqual(find_similar(copy_hash), [])
+        other = PortfolioItem.objects.get(title='Другая работа')
+        other.image = upload(make_scene(1), name='replaced.jpg')
+        other.save()
+        self.assertEqual([item.title for _, item in find_similar(copy_hash)], ['Другая работа'])
@@ -0,0 +1,87 @@
+"""
+Тесты снимка настроек сайта.
+"""
+
+from dataclasses import FrozenInstanceError
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from apps.core import site_settings
+from apps.core.context_processors import site_settings as site_settings_processor
+from apps.core.page_cache import bump_generation, page_cache_key
+from apps.main.models import SiteSettings
+
+
+class SiteSettingsSnapshotTest(TestCase):
+    """Тесты для get_site_settings."""
+    
+    def setUp(self):
+        """Подготовка данных для тестов."""
+        cache.clear()
+        site_settings.reset()
+        self.settings = SiteSettings.objects.create(
+            site_name='Яркий Город',
+            phone='88142280903',
+            email='info@test.ru',
+            address='Петрозаводск'
+        )
+    
+    def test_snapshot_is_reused(self):
+        """Тест: повторные рендеры с неизменными настройками не обращаются к базе."""
+        request = RequestFactory().get('/')
+        first = site_settings_processor(request)['settings']
+        with self.assertNumQueries(0):
+            second = site_settings_processor(request)['settings']
+            third = site_settings_processor(RequestFactory().get('/contacts/'))['settings']
+        self.assertIs(first, second)
+        self.assertIs(first, third)
+        self.assertEqual(first.phone_formatted, '+7 (8142) 28-09-03')
+    
+    def test_version_from_page_cache(self):
+        """Тест: версия из поколений, прочитанных кешем страниц, без отдельного запроса."""
+        request = RequestFactory().get('/')
+        page_cache_key(request, ['main.sitesettings'])
+        first = site_settings.get_site_settings(request)
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertIs(site_settings.get_site_settings(request), first)
+    
+    def test_snapshot_is_immutable(self):
+        """Тест неизменяемости снимка."""
+        snapshot = site_settings.get_site_settings()
+        with self.assertRaises(FrozenInstanceError):
+            snapshot.site_name = 'Другое'
+    
+    def test_save_refreshes_snapshot(self):
+        """Тест: сохранение настроек обновляет снимок."""
+        site_settings.get_site_settings()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.settings.site_name = 'Новое название'
+            self.settings.save()
+        
+        self.assertEqual(site_settings.get_site_settings().site_name, 'Новое название')
+    
+    def test_change_in_another_worker(self):
+        """Тест: изменение в другом воркере (без сброса версии в кеше этого процесса) тоже видно."""
+        site_settings.get_site_settings()
+        SiteSettings.objects.filter(pk=self.settings.pk).update(site_name='Из другого воркера')
+        bump_generation('main.sitesettings')
+        
+        # Страница с кешем видит новое поколение сразу
+        request = RequestFactory().get('/')
+        page_cache_key(request, ['main.sitesettings'])
+        self.assertEqual(site_settings.get_site_settings(request).site_name, 'Из другого воркера')
+        
+        # Остальные запросы - после истечения версии в кеше
+        SiteSettings.objects.filter(pk=self.settings.pk).update(site_name='Ещё раз')
+        bump_generation('main.sitesettings')
+        self.assertEqual(site_settings.get_site_settings().site_name, 'Из другого воркера')
+        cache.delete(site_settings.VERSION_KEY)
+        self.assertEqual(site_settings.get_site_settings().site_name, 'Ещё раз')
+    
+    def test_no_active_settings(self):
+        """Тест: без активных настроек возвращается None."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.settings.delete()
+        
+        self.assertIsNone(site_settings.get_site_settings())
@@ -0,0 +1,40 @@
+"""
+Тесты настройки соединений SQLite.
+"""
+
+from unittest import skipUnless
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from apps.core.sqlite import get_pragmas
+
+
+class SQLitePragmasTest(TestCase):
+    """Тесты PRAGMA при создании соединения."""
+    
+    def test_busy_timeout_first(self):
+        """Тест порядка PRAGMA: ожидание блокировки до смены журнала."""
+        with override_settings(SQLITE_PRAGMAS={'journal_mode': 'WAL', 'busy_timeout': 3000}):
+            self.assertEqual(get_pragmas(), [('busy_timeout', 3000), ('journal_mode', 'WAL')])
+    
+    def test_invalid_value(self):
+        """Тест защиты от произвольного SQL в настройках."""
+        with override_settings(SQLITE_PRAGMAS={'cache_size': '1; DROP TABLE x'}):
+            with self.assertRaises(ValueError):
+                get_pragmas()
+    
+    @skipUnless(connection.vendor == 'sqlite', 'Только для SQLite')
+    def test_applied_to_new_connection(self):
+        """Тест применения PRAGMA к новому соединению."""
+        pragmas = {'busy_timeout': 1234, 'cache_size': -2048, 'temp_store': 'MEMORY'}
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            new_connection = connections.create_connection('default')
+            try:
+                with new_connection.cursor() as cursor:
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone()[0], 1234)
+                    cursor.execute('PRAGMA cache_size')
+                    self.assertEqual(cursor.fetchone()[0], -2048)
+                    cursor.execute('PRAGMA temp_store')
+                    self.assertEqual(cursor.fetchone()[0], 2)
+            finally:
+                new_connection.close()
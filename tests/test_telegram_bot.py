@@ -0,0 +1,177 @@
+"""
+Тесты Telegram бота (long polling на asyncio).
+"""
+
+import asyncio
+import threading
+import time
+from unittest import mock
+import requests
+from django.test import TransactionTestCase, override_settings
+from apps.main.models import TelegramChat
+from apps.main.utils.bot import HINT_TEXT, SUBSCRIBED_TEXT, BotRunner
+from apps.main.utils.fake_telegram import fake_telegram
+from apps.main.utils.telegram import SendResult
+
+
+def start_update(update_id: int, chat_id: int, text: str = '/start') -> dict:
+    return {
+        'update_id': update_id,
+        'message': {'chat': {'id': chat_id, 'first_name': f'Менеджер {chat_id}'}, 'text': text},
+    }
+
+
+@override_settings(TELEGRAM_CHAT_INTERVAL=0, TELEGRAM_RATE_LIMIT=0)
+class BotRunnerTest(TransactionTestCase):
+    """Тесты получения и обработки обновлений."""
+    
+    def run_bot(self, batches):
+        """
+        Запускает бота: getUpdates по очереди возвращает batches
+        (исключение - выбрасывает), после последней пачки бот останавливается.
+        
+        Returns:
+            (runner, offset каждого вызова getUpdates)
+        """
+        runner = BotRunner('123:token', concurrency=32, retry_delay=0.05)
+        batches = list(batches)
+        offsets = []
+        
+        async def main():
+            loop = asyncio.get_running_loop()
+            
+            def get_updates(token, offset, timeout=None):
+                offsets.append(offset)
+                if not batches:
+                    loop.call_soon_threadsafe(runner.stop)
+                    return []
+                batch = batches.pop(0)
+                if isinstance(batch, Exception):
+                    raise batch
+                return batch
+            
+            with mock.patch('apps.main.utils.bot.get_updates', side_effect=get_updates):
+                await asyncio.wait_for(runner.run(), 10)
+        
+        asyncio.run(main())
+        return runner, offsets
+    
+    @mock.patch('apps.main.utils.bot.send_to_chat')
+    def test_burst_handled_concurrently(self, send):
+        """Тест: пачка /start обрабатывается параллельно, а не по одному."""
+        def slow_send(token, chat_id, text):
+            time.sleep(0.3)
+            return SendResult(True)
+        send.side_effect = slow_send
+        
+        started = time.monotonic()
+        _, offsets = self.run_bot([[start_update(100 + i, 1000 + i) for i in range(20)]])
+        elapsed = time.monotonic() - started
+        
+        self.assertEqual(TelegramChat.objects.filter(is_active=True).count(), 20)
+        self.assertEqual(send.call_count, 20)
+        self.assertLess(elapsed, 2)  # по одному - 6 с
+        # Пока пачка обрабатывается, получение не подтверждается;
+        # после обработки - подтверждение при остановке
+        self.assertEqual(offsets[:2], [0, 100])
+        self.assertEqual(offsets[-1], 120)
+    
+    @mock.patch('apps.main.utils.bot.send_to_chat', return_value=SendResult(True))
+    def test_resubscribe_and_hint(self, send):
+        """Тест: повторный /start включает чат, другое сообщение - подсказка."""
+        TelegramChat.objects.create(chat_id=7, is_active=False)
+        self.run_bot([[start_update(1, 7)], [start_update(2, 8, text='привет')]])
+        
+        self.assertTrue(TelegramChat.objects.get(chat_id=7).is_active)
+        self.assertFalse(TelegramChat.objects.filter(chat_id=8).exists())
+        replies = {call.args[1]: call.args[2] for call in send.call_args_list}
+        self.assertEqual(replies, {7: SUBSCRIBED_TEXT, 8: HINT_TEXT})
+    
+    @mock.patch('apps.main.utils.bot.send_to_chat', return_value=SendResult(True))
+    def test_errors_do_not_stop_bot(self, send):
+        """Тест: ошибки сети и API - повтор в том же цикле, без перезапуска."""
+        conflict = requests.exceptions.HTTPError(response=mock.Mock(status_code=409))
+        _, offsets = self.run_bot([
+            requests.exceptions.ConnectionError('нет сети'),
+            conflict,
+            ValueError('ok=false'),
+            [start_update(5, 50)],
+        ])
+        self.assertEqual(offsets[:4], [0, 0, 0, 0])
+        self.assertEqual(offsets[-1], 6)
+        self.assertTrue(TelegramChat.objects.filter(chat_id=50).exists())
+    
+    @mock.patch('apps.main.utils.bot.SHUTDOWN_TIMEOUT', 0.2)
+    @mock.patch('apps.main.utils.bot.send_to_chat')
+    def test_interrupted_update_not_confirmed(self, send):
+        """Тест: обновление, обработка которого прервана остановкой, не подтверждается."""
+        def send_slowly(token, chat_id, text):
+            if chat_id == 71:
+                time.sleep(1)
+            return SendResult(True)
+        send.side_effect = send_slowly
+        
+        runner, offsets = self.run_bot([[start_update(10, 70), start_update(11, 71), start_update(12, 72)]])
+        # 10 и 12 обработаны, 11 прервано: offset не дальше 11
+        self.assertEqual(runner.offset, 11)
+        self.assertNotIn(12, offsets)
+        self.assertNotIn(13, offsets)
+    
+    @mock.patch('apps.main.utils.bot.send_to_chat')
+    def test_update_in_progress_not_processed_twice(self, send):
+        """Тест: обновление, которое ещё обрабатывается, Telegram возвращает снова - оно пропускается."""
+        def slow_send(token, chat_id, text):
+            time.sleep(0.3)
+            return SendResult(True)
+        send.side_effect = slow_send
+        update = start_update(30, 300)
+        
+        _, offsets = self.run_bot([[update], [update], [update]])
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(offsets[:2], [0, 30])
+        self.assertEqual(offsets[-1], 31)
+    
+    @mock.patch('apps.main.utils.bot.send_to_chat', return_value=SendResult(True))
+    def test_stop_interrupts_long_poll(self, send):
+        """Тест: остановка не ждёт окончания долгого getUpdates."""
+        runner = BotRunner('123:token')
+        released = threading.Event()
+        
+        def hanging_get_updates(token, offset):
+            released.wait(5)
+            return []
+        
+        async def main():
+            with mock.patch('apps.main.utils.bot.get_updates', side_effect=hanging_get_updates):
+                task = asyncio.create_task(runner.run())
+                await asyncio.sleep(0.1)
+                runner.stop()
+                await asyncio.wait_for(task, 1)
+        
+        started = time.monotonic()
+        asyncio.run(main())
+        released.set()
+        self.assertLess(time.monotonic() - started, 1)
+    
+    def test_long_polling_against_fake_api(self):
+        """Тест: бот получает /start долгим getUpdates поддельного API и отвечает через него."""
+        with fake_telegram(latency=0.05) as api:
+            runner = BotRunner(api.token)
+            
+            async def main():
+                task = asyncio.create_task(runner.run())
+                await asyncio.sleep(0.2)  # getUpdates уже ждёт
+                api.add_message(60, '/start')
+                for _ in range(50):
+                    if api.sent:
+                        break
+                    await asyncio.sleep(0.1)
+                runner.stop()
+                await asyncio.wait_for(task, 2)
+            
+            asyncio.run(main())
+        
+        self.assertEqual(api.sent, [{'chat_id': 60, 'text': SUBSCRIBED_TEXT}])
+        self.assertTrue(TelegramChat.objects.filter(chat_id=60, is_active=True).exists())
+        # В простое - один долгий запрос, а не опрос каждую секунду
+        self.assertLessEqual(api.calls.count('getUpdates'), 3)
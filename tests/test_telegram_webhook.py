@@ -0,0 +1,122 @@
+"""
+Тесты webhook Telegram бота и команд setWebhook/deleteWebhook.
+"""
+
+import json
+from io import StringIO
+from unittest import mock
+import requests
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from apps.main.models import TelegramChat, TelegramUpdate
+from apps.main.utils.bot import HINT_TEXT, SUBSCRIBED_TEXT, get_updates
+from apps.main.utils.fake_telegram import fake_telegram
+
+
+WEBHOOK_URL = 'https://example.com/telegram/webhook/'
+
+
+@override_settings(
+    TELEGRAM_BOT_TOKEN='123:token',
+    TELEGRAM_WEBHOOK_URL=WEBHOOK_URL,
+    TELEGRAM_WEBHOOK_SECRET='webhook-secret',
+    TELEGRAM_CHAT_INTERVAL=0,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PAGE_CACHE_ENABLED=False,
+)
+class TelegramWebhookTest(TestCase):
+    """Тесты webhook против поддельного Telegram API."""
+    
+    def setUp(self):
+        self.fake = fake_telegram()
+        self.api = self.fake.__enter__()
+        self.addCleanup(self.fake.__exit__, None, None, None)
+    
+    def post_update(self, update, secret='webhook-secret'):
+        return self.client.post(
+            '/telegram/webhook/',
+            data=json.dumps(update),
+            content_type='application/json',
+            HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=secret
+        )
+    
+    def test_set_and_delete_webhook(self):
+        """Тест команд: регистрация с секретом и отключение webhook."""
+        self.api.add_message(1, 'старое')
+        out = StringIO()
+        call_command('telegram_set_webhook', '--drop-pending-updates', stdout=out)
+        self.assertIn(f'Webhook зарегистрирован: {WEBHOOK_URL}', out.getvalue())
+        self.assertEqual(self.api.webhook['secret_token'], 'webhook-secret')
+        self.assertEqual(self.api.webhook['allowed_updates'], ['message'])
+        self.assertEqual(self.api.updates, [])
+        
+        # Пока webhook задан, long polling получает 409
+        with self.assertRaises(requests.exceptions.HTTPError) as raised:
+            get_updates('123:token', 0, timeout=0)
+        self.assertEqual(raised.exception.response.status_code, 409)
+        
+        call_command('telegram_delete_webhook', stdout=StringIO())
+        self.assertEqual(self.api.webhook, {})
+        self.assertEqual(get_updates('123:token', 0, timeout=0), [])
+    
+    def test_set_webhook_errors(self):
+        """Тест: без секрета и с http:// адресом webhook не регистрируется."""
+        with override_settings(TELEGRAM_WEBHOOK_SECRET=''):
+            with self.assertRaises(CommandError):
+                call_command('telegram_set_webhook', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('telegram_set_webhook', 'http://example.com/hook/', stdout=StringIO())
+        with override_settings(TELEGRAM_BOT_TOKEN='999:wrong'):
+            with self.assertRaisesMessage(CommandError, 'Unauthorized'):
+                call_command('telegram_set_webhook', stdout=StringIO())
+        self.assertEqual(self.api.webhook, {})
+    
+    def test_start_via_webhook(self):
+        """Тест полного цикла: Telegram доставляет /start, ответ - в теле webhook."""
+        call_command('telegram_set_webhook', stdout=StringIO())
+        self.api.add_message(10, '/start')
+        self.api.add_message(11, 'привет')
+        
+        self.assertEqual(self.api.deliver_webhook(self.client), [200, 200])
+        self.assertTrue(TelegramChat.objects.filter(chat_id=10, is_active=True).exists())
+        self.assertFalse(TelegramChat.objects.filter(chat_id=11).exists())
+        self.assertEqual(self.api.sent, [
+            {'chat_id': 10, 'text': SUBSCRIBED_TEXT},
+            {'chat_id': 11, 'text': HINT_TEXT},
+        ])
+    
+    def test_duplicate_update_ignored(self):
+        """Тест: повторная доставка того же update_id не обрабатывается."""
+        update = self.api.add_message(20, '/start')
+        first = self.post_update(update)
+        # Ответ боту - в теле ответа webhook, без отдельного запроса к API
+        self.assertEqual(first.json(), {'method': 'sendMessage', 'chat_id': 20, 'text': SUBSCRIBED_TEXT})
+        
+        with mock.patch('apps.main.views.handle_message') as handle:
+            second = self.post_update(update)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, b'')
+        handle.assert_not_called()
+        self.assertEqual(TelegramUpdate.objects.filter(update_id=update['update_id']).count(), 1)
+    
+    def test_failed_update_retried(self):
+        """Тест: ошибка обработки не запоминает update_id - повтор обработается."""
+        update = self.api.add_message(30, '/start')
+        with mock.patch('apps.main.views.handle_message', side_effect=RuntimeError('db')):
+            with self.assertRaises(RuntimeError):
+                self.post_update(update)
+        self.assertFalse(TelegramUpdate.objects.exists())
+        self.assertEqual(self.post_update(update).status_code, 200)
+        self.assertTrue(TelegramChat.objects.filter(chat_id=30).exists())
+    
+    def test_secret_required(self):
+        """Тест: без верного секрета обновление отклоняется."""
+        update = self.api.add_message(40, '/start')
+        self.assertEqual(self.post_update(update, secret='wrong').status_code, 403)
+        self.assertEqual(self.post_update(update, secret='').status_code, 403)
+        self.assertEqual(self.client.get('/telegram/webhook/').status_code, 405)
+        self.assertEqual(self.post_update({'message': {}}).status_code, 400)
+        with override_settings(TELEGRAM_WEBHOOK_SECRET=''):
+            self.assertEqual(self.post_update(update, secret='').status_code, 404)
+        self.assertFalse(TelegramChat.objects.exists())
@@ -0,0 +1,99 @@
+"""
+Тесты первичных ключей UUID v7.
+"""
+
+import uuid
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from apps.core.utils.uuid7 import uuid7, uuid7_from_datetime, uuid7_timestamp
+from apps.portfolio.models import PortfolioItem
+from apps.portfolio.search import portfolio_index
+from apps.services.models import Service
+from apps.services.search import service_index
+
+
+class UUID7Test(TestCase):
+    """Тесты генератора UUID v7."""
+    
+    def test_version_and_variant(self):
+        """Тест версии и варианта ключа."""
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+    
+    def test_monotonic(self):
+        """Тест строгого возрастания ключей одного процесса."""
+        values = [uuid7() for _ in range(10000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+    
+    def test_from_datetime(self):
+        """Тест ключа со временем из даты."""
+        moment = timezone.now() - timedelta(days=365)
+        value = uuid7_from_datetime(moment)
+        self.assertEqual(uuid7_timestamp(value), int(moment.timestamp() * 1000))
+        self.assertLess(value, uuid7())
+        self.assertIsNone(uuid7_timestamp(uuid.uuid4()))
+    
+    def test_model_default(self):
+        """Тест ключа по умолчанию у моделей."""
+        service = Service.objects.create(name='Вывески', description='')
+        self.assertEqual(service.pk.version, 7)
+
+
+class ConvertUUID7CommandTest(TestCase):
+    """Тесты команды convert_uuid7."""
+    
+    def setUp(self):
+        """Записи со старыми случайными ключами."""
+        self.service = Service.objects.create(uuid=uuid.uuid4(), name='Неоновые вывески', description='')
+        self.item = PortfolioItem.objects.create(
+            uuid=uuid.uuid4(),
+            title='Неон для кафе',
+            description='',
+            image='portfolio/neon.jpg',
+            service=self.service
+        )
+    
+    def test_convert_keeps_references(self):
+        """Тест перевода ключей с сохранением ссылок и поискового индекса."""
+        out = StringIO()
+        call_command('convert_uuid7', 'services.Service', 'portfolio.PortfolioItem', stdout=out)
+        
+        service = Service.objects.get()
+        item = PortfolioItem.objects.select_related('service').get()
+        self.assertEqual(service.pk.version, 7)
+        self.assertEqual(item.pk.version, 7)
+        self.assertEqual(item.service, service)
+        self.assertEqual(uuid7_timestamp(item.pk), int(item.created_at.timestamp() * 1000))
+        
+        found = portfolio_index.search(PortfolioItem.objects.all(), 'неон')
+        self.assertEqual(list(found), [item])
+    
+    def test_index_after_convert(self):
+        """Тест сохранения и удаления объекта после перевода ключа: в поиске ровно одна запись."""
+        call_command('convert_uuid7', 'services.Service', stdout=StringIO())
+        
+        service = Service.objects.get()
+        service.description = 'Неон и контражур'
+        service.save()
+        found = service_index.search(Service.objects.all(), 'неоновые')
+        self.assertEqual(list(found), [service])
+        
+        service.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name("services_service_search")}')
+            self.assertEqual(cursor.fetchone()[0], 0)
+    
+    def test_repeat_is_noop(self):
+        """Тест повторного запуска."""
+        call_command('convert_uuid7', 'services.Service', stdout=StringIO())
+        pk = Service.objects.get().pk
+        out = StringIO()
+        call_command('convert_uuid7', 'services.Service', stdout=out)
+        self.assertEqual(Service.objects.get().pk, pk)
+        self.assertIn('переведено 0', out.getvalue())